@@ -0,0 +1,137 @@
+"""
+Async Scanner I/O - aiohttp transports for the asyncio scan mode
+Yahoo chart downloads and Telegram sends run as concurrent tasks on one
+event loop, sharing the same token buckets as the threaded scanner
+"""
+import asyncio
+import time
+
+import pandas as pd
+
+from lazy import lazy_import
+from market_data import yahoo_limiter, OHLCV_COLUMNS
+
+aiohttp = lazy_import('aiohttp')  # only needed in SCANNER_MODE=async
+
+CHART_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{ticker}"
+TELEGRAM_URL = "https://api.telegram.org/bot{token}/sendMessage"
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+
+def new_session():
+    """Shared HTTP session for one asyncio scanner run"""
+    return aiohttp.ClientSession(headers=HEADERS, timeout=aiohttp.ClientTimeout(total=20))
+
+
+def _chart_to_frame(payload, interval):
+    """Yahoo v8 chart JSON -> auto-adjusted OHLCV DataFrame (same shape as Ticker.history)"""
+    result = (payload.get('chart') or {}).get('result') or []
+    if not result or not result[0].get('timestamp'):
+        return None
+
+    res = result[0]
+    quote = res['indicators']['quote'][0]
+    tz = res.get('meta', {}).get('exchangeTimezoneName', 'America/New_York')
+    index = pd.to_datetime(res['timestamp'], unit='s', utc=True).tz_convert(tz)
+
+    df = pd.DataFrame({c: quote.get(c.lower()) for c in OHLCV_COLUMNS}, index=index, dtype='f8')
+
+    adjclose = res['indicators'].get('adjclose')
+    if adjclose:
+        ratio = pd.Series(adjclose[0]['adjclose'], index=index, dtype='f8') / df['Close']
+        df[['Open', 'High', 'Low']] = df[['Open', 'High', 'Low']].mul(ratio, axis=0)
+        df['Close'] = adjclose[0]['adjclose']
+
+    if interval.endswith(('d', 'wk', 'mo')):
+        df.index = df.index.normalize()
+
+    df = df.dropna(subset=['Close'])
+    return df if not df.empty else None
+
+
+async def fetch_chart(session, ticker, period="2y", interval="1d", start=None, retries=3):
+    """
+    One rate-limited chart request, retried after a back-off on 429s
+
+    Returns:
+        DataFrame[Open, High, Low, Close, Volume] or None
+    """
+    params = {'interval': interval, 'events': 'div,splits', 'includeAdjustedClose': 'true'}
+    if start:
+        params['period1'] = int(pd.Timestamp(start).timestamp())
+        params['period2'] = int(time.time())
+    else:
+        params['range'] = period
+
+    for attempt in range(retries + 1):
+        await yahoo_limiter.acquire_async()
+        try:
+            async with session.get(CHART_URL.format(ticker=ticker), params=params) as r:
+                if r.status == 429:
+                    yahoo_limiter.backoff()
+                    continue
+                if r.status != 200:
+                    return None
+                payload = await r.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+
+        yahoo_limiter.success()
+        try:
+            return _chart_to_frame(payload, interval)
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+    return None
+
+
+async def fetch_charts(session, tickers, **kwargs):
+    """Concurrent fetch_chart() for many tickers - returns {ticker: DataFrame}"""
+    tickers = list(dict.fromkeys(tickers))
+    results = await asyncio.gather(*(fetch_chart(session, t, **kwargs) for t in tickers))
+    return {t: df for t, df in zip(tickers, results) if df is not None}
+
+
+async def sync_bars(store, session, tickers):
+    """BarStore.sync() with the downloads done as concurrent chart requests"""
+    frames, resume, full = await asyncio.to_thread(store.plan, tickers)
+
+    for start, group in resume.items():
+        fresh = await fetch_charts(session, group, start=start)
+        full.extend(await asyncio.to_thread(store.absorb, frames, fresh, True))
+
+    if full:
+        fresh = await fetch_charts(session, full, period=store.history_period)
+        await asyncio.to_thread(store.absorb, frames, fresh, False)
+
+    return frames
+
+
+class AsyncTelegram:
+    """Minimal non-blocking Bot API client, paced by a token bucket"""
+
+    def __init__(self, session, token, limiter):
+        self.session = session
+        self.url = TELEGRAM_URL.format(token=token)
+        self.limiter = limiter
+
+    async def send(self, chat_id, text, parse_mode="Markdown"):
+        """Send a message - returns True when Telegram accepted it"""
+        await self.limiter.acquire_async()
+        try:
+            async with self.session.post(self.url, json={
+                'chat_id': chat_id, 'text': text, 'parse_mode': parse_mode
+            }) as r:
+                if r.status == 429:
+                    self.limiter.backoff()
+                    print("  ⚠️ Telegram rate limited - slowing down")
+                    return False
+                if r.status != 200:
+                    print(f"  ❌ Telegram error {r.status}: {await r.text()}")
+                    return False
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"  ❌ Telegram error: {e}")
+            return False
+
+        self.limiter.success()
+        return True
@@ -0,0 +1,358 @@
+"""
+Backtest - Offline historical replay of the live signal rules
+Runs lean_indicators() -> score_universe() over every stored bar in
+the local BarStore, then simulates the ATR stop/target exits for all
+signals of a ticker at once (no per-day loop)
+
+Usage:
+    python backtest.py --start 2025-01-01 --end 2025-12-31
+    python backtest.py --tickers AAPL MSFT --set bull_min=60 --trades trades.csv
+"""
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore
+from indicators import lean_indicators, LEAN_INDEX
+from market_data import OHLCV_COLUMNS
+from scoring import SCORE_COLUMNS, score_universe, BULL_MIN, ADX_MIN, BEAR_MAX, BEAR_CONFIRMS
+
+# Live thresholds (analyze_universe / build_signal) plus the simulation settings
+DEFAULT_PARAMS = {
+    'bull_min': BULL_MIN,
+    'adx_min': ADX_MIN,
+    'bear_max': BEAR_MAX,
+    'bear_confirms': BEAR_CONFIRMS,
+    'bull_stop_atr': 2.5,
+    'bull_target_atr': 3.5,
+    'bear_stop_atr': 2.0,
+    'bear_target_atr': 4.0,
+    'max_hold': 60,          # bars before an untriggered position is closed at the close
+    'min_bars': 250,         # history needed before the first signal (same as the scanner)
+}
+
+TRADE_COLUMNS = ['ticker', 'direction', 'entry_date', 'entry', 'stop', 'target',
+                 'exit_date', 'exit', 'reason', 'return_pct']
+
+
+# ==========================================
+# PER-TICKER PREPARATION (params independent)
+# ==========================================
+def prepare(df):
+    """
+    Indicators and scores for every bar of one ticker
+
+    Only depends on prices, so a parameter sweep computes it once per ticker.
+
+    Returns:
+        {'dates', 'open', 'high', 'low', 'close', 'atr', 'adx',
+         'bull', 'bear', 'confirms', 'valid'} - one array entry per bar
+        (scores as small ints - a sweep keeps this for every stored ticker)
+    """
+    bars = df[OHLCV_COLUMNS].to_numpy(dtype='f8')
+    ind = lean_indicators(bars)
+    bull, bear, confirms, _, _ = score_universe(ind[:, :len(SCORE_COLUMNS)])
+
+    atr = ind[:, LEAN_INDEX['ATR']].copy()
+    adx = ind[:, LEAN_INDEX['ADX']].copy()
+    rsi = ind[:, LEAN_INDEX['RSI']]
+
+    return {
+        'dates': df.index.values,
+        'open': bars[:, 0].copy(),
+        'high': bars[:, 1].copy(),
+        'low': bars[:, 2].copy(),
+        'close': bars[:, 3].copy(),
+        'atr': atr,
+        'adx': adx,
+        'bull': bull.astype('i2'),
+        'bear': bear.astype('i2'),
+        'confirms': confirms.astype('i1'),
+        # Same scoreability check as analyze_universe()
+        'valid': ~(np.isnan(rsi) | np.isnan(adx) | np.isnan(atr))
+    }
+
+
+def _first_true(hit):
+    """Column of the first True in each row (row length if none)"""
+    return np.where(hit.any(axis=1), hit.argmax(axis=1), hit.shape[1])
+
+
+# ==========================================
+# SIMULATION (vectorized over all signals of a ticker)
+# ==========================================
+def simulate(prep, params, start=None, end=None):
+    """
+    Trades for one prepared ticker
+
+    Every candidate signal's exit is found in one array pass over the
+    next max_hold bars; a short scan over the signals then keeps one
+    position per ticker at a time (like the live alert cooldown).
+
+    Args:
+        prep: prepare() output
+        params: DEFAULT_PARAMS-style dict
+        start, end: numpy datetime64 bounds for entry dates (inclusive)
+
+    Returns:
+        dict of equal-length arrays - entry/exit bar index, direction (+1/-1),
+        entry, stop, target, exit price, reason code (0 stop, 1 target, 2 time, 3 end of data)
+    """
+    n = len(prep['close'])
+    close, atr = prep['close'], prep['atr']
+
+    is_bull = (prep['bull'] >= params['bull_min']) & (prep['adx'] > params['adx_min'])
+    is_bear = ~is_bull & (prep['bear'] <= params['bear_max']) & (prep['confirms'] >= params['bear_confirms'])
+    eligible = prep['valid'] & (np.arange(n) >= params['min_bars'] - 1)
+    if start is not None:
+        eligible &= prep['dates'] >= start
+    if end is not None:
+        eligible &= prep['dates'] <= end
+
+    idx = np.flatnonzero(eligible & (is_bull | is_bear))
+    if len(idx) == 0:
+        return None
+
+    direction = np.where(is_bull[idx], 1, -1)
+    bull = direction == 1
+    entry = close[idx]
+    stop = np.where(bull, entry - atr[idx] * params['bull_stop_atr'],
+                    entry + atr[idx] * params['bear_stop_atr'])
+    target = np.where(bull, entry + atr[idx] * params['bull_target_atr'],
+                      entry - atr[idx] * params['bear_target_atr'])
+
+    # Window of the next max_hold bars for every signal (past the end = NaN)
+    hold = int(params['max_hold'])
+    bars = idx[:, None] + np.arange(1, hold + 1)
+    inside = bars < n
+    bars = np.minimum(bars, n - 1)
+    high = np.where(inside, prep['high'][bars], np.nan)
+    low = np.where(inside, prep['low'][bars], np.nan)
+
+    b = bull[:, None]
+    stop_hit = np.where(b, low <= stop[:, None], high >= stop[:, None])
+    target_hit = np.where(b, high >= target[:, None], low <= target[:, None])
+    first_stop = _first_true(stop_hit)
+    first_target = _first_true(target_hit)
+
+    # Stop wins a tie (both levels inside one bar), like check_exits()
+    by_stop = (first_stop < hold) & (first_stop <= first_target)
+    by_target = ~by_stop & (first_target < hold)
+    offset = np.where(by_stop, first_stop, np.where(by_target, first_target, hold - 1))
+    exit_idx = np.minimum(idx + offset + 1, n - 1)
+
+    # Stops fill at the open when price gaps through them
+    gap_open = prep['open'][exit_idx]
+    stop_fill = np.where(bull, np.minimum(stop, gap_open), np.maximum(stop, gap_open))
+    exit_price = np.where(by_stop, stop_fill, np.where(by_target, target, close[exit_idx]))
+    reason = np.where(by_stop, 0, np.where(by_target, 1, np.where(idx + hold < n, 2, 3)))
+
+    # One position at a time: skip signals fired while the previous trade is open
+    keep = np.zeros(len(idx), dtype=bool)
+    busy_until = -1
+    for i in range(len(idx)):
+        if idx[i] > busy_until:
+            keep[i] = True
+            busy_until = exit_idx[i]
+
+    return {
+        'entry_idx': idx[keep], 'exit_idx': exit_idx[keep], 'direction': direction[keep],
+        'entry': entry[keep], 'stop': stop[keep], 'target': target[keep],
+        'exit': exit_price[keep], 'reason': reason[keep]
+    }
+
+
+REASONS = np.array(['STOP', 'TARGET', 'TIME', 'END'])
+
+
+def trades_frame(ticker, prep, sim):
+    """simulate() arrays -> trade log DataFrame"""
+    if sim is None:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+    return pd.DataFrame({
+        'ticker': ticker,
+        'direction': np.where(sim['direction'] == 1, 'BULL', 'BEAR'),
+        'entry_date': prep['dates'][sim['entry_idx']],
+        'entry': sim['entry'],
+        'stop': sim['stop'],
+        'target': sim['target'],
+        'exit_date': prep['dates'][sim['exit_idx']],
+        'exit': sim['exit'],
+        'reason': REASONS[sim['reason']],
+        'return_pct': (sim['exit'] - sim['entry']) / sim['entry'] * sim['direction'] * 100
+    })
+
+
+# ==========================================
+# PORTFOLIO
+# ==========================================
+def portfolio(trades, capital=25000, position_pct=0.10, commission=2.0):
+    """
+    Size and compound a trade log
+
+    Each trade gets position_pct of the equity realised before its entry
+    (README: 10% positions, $2 commission per trade).
+
+    Returns:
+        trades (with shares/pnl columns), equity Series indexed by date, summary dict
+    """
+    trades = trades.sort_values(['entry_date', 'ticker']).reset_index(drop=True)
+    if trades.empty:
+        equity = pd.Series([float(capital)], name='equity')
+        return trades, equity, summarize(trades, equity, capital)
+
+    entry_dates = trades['entry_date'].to_numpy()
+    exit_dates = trades['exit_date'].to_numpy()
+    entry = trades['entry'].to_numpy()
+    ret = trades['return_pct'].to_numpy() / 100
+
+    exit_order = np.argsort(exit_dates, kind='stable')
+    shares = np.zeros(len(trades), dtype=np.int64)
+    pnl = np.zeros(len(trades))
+
+    realised = float(capital)
+    j = 0
+    for i in range(len(trades)):
+        # Book every trade closed before this entry
+        while j < len(exit_order) and exit_dates[exit_order[j]] < entry_dates[i]:
+            realised += pnl[exit_order[j]]
+            j += 1
+        shares[i] = int(realised * position_pct / entry[i])
+        pnl[i] = shares[i] * entry[i] * ret[i] - commission if shares[i] else 0.0
+
+    trades['shares'] = shares
+    trades['pnl'] = pnl
+    trades = trades[trades['shares'] > 0].reset_index(drop=True)
+
+    daily = trades.groupby('exit_date')['pnl'].sum().sort_index()
+    equity = (capital + daily.cumsum()).rename('equity')
+    equity.index.name = 'date'
+
+    return trades, equity, summarize(trades, equity, capital)
+
+
+def summarize(trades, equity, capital):
+    """Headline numbers in the README's format"""
+    wins = trades[trades['pnl'] > 0] if len(trades) else trades
+    losses = trades[trades['pnl'] <= 0] if len(trades) else trades
+    curve = np.concatenate([[capital], equity.to_numpy(dtype='f8')])
+    peak = np.maximum.accumulate(curve)
+    final = float(curve[-1])
+
+    return {
+        'trades': len(trades),
+        'wins': len(wins),
+        'losses': len(losses),
+        'win_rate': len(wins) / len(trades) * 100 if len(trades) else 0.0,
+        'avg_win': float(wins['pnl'].mean()) if len(wins) else 0.0,
+        'avg_loss': float(-losses['pnl'].mean()) if len(losses) else 0.0,
+        'net_profit': final - capital,
+        'return_pct': (final - capital) / capital * 100,
+        'max_drawdown_pct': float(((peak - curve) / peak).max() * 100),
+        'ending_capital': final
+    }
+
+
+# ==========================================
+# RUNNER
+# ==========================================
+def stored_tickers(store):
+    """Every ticker with history in the bar store"""
+    return sorted(os.path.basename(p)[:-4] for p in glob.glob(os.path.join(store.root, '*.npy')))
+
+
+def load_prepared(store, tickers):
+    """{ticker: prepare() output} for tickers with stored history"""
+    prepared = {}
+    for ticker in tickers:
+        df = store.load(ticker)
+        if df is None or len(df) < 2:
+            continue
+        try:
+            prepared[ticker] = prepare(df)
+        except Exception as e:
+            print(f"  ⚠️ {ticker}: {e}")
+    return prepared
+
+
+def run_backtest(prepared, params=None, start=None, end=None, capital=25000):
+    """
+    Backtest already-prepared tickers
+
+    Returns:
+        trades DataFrame, equity Series, summary dict
+    """
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    start = np.datetime64(start) if start else None
+    end = np.datetime64(end) if end else None
+
+    frames = [trades_frame(t, prep, simulate(prep, params, start, end))
+              for t, prep in prepared.items()]
+    frames = [f for f in frames if len(f)]
+    trades = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TRADE_COLUMNS)
+
+    return portfolio(trades, capital=capital)
+
+
+def parse_overrides(pairs):
+    """['bull_min=60', ...] -> {'bull_min': 60.0, ...}"""
+    params = {}
+    for pair in pairs or []:
+        key, _, value = pair.partition('=')
+        if key not in DEFAULT_PARAMS:
+            raise SystemExit(f"Unknown parameter: {key} (choose from {', '.join(DEFAULT_PARAMS)})")
+        params[key] = float(value)
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline backtest over the local bar store")
+    parser.add_argument('--start', help="First entry date (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last entry date (YYYY-MM-DD)")
+    parser.add_argument('--tickers', nargs='*', help="Tickers to test (default: all stored)")
+    parser.add_argument('--store', default=None, help="Bar store directory")
+    parser.add_argument('--capital', type=float, default=25000)
+    parser.add_argument('--set', nargs='*', metavar='KEY=VALUE', help="Override DEFAULT_PARAMS")
+    parser.add_argument('--trades', help="Write the trade log to this CSV")
+    parser.add_argument('--equity', help="Write the equity curve to this CSV")
+    args = parser.parse_args()
+
+    store = BarStore(args.store) if args.store else BarStore()
+    tickers = args.tickers or stored_tickers(store)
+    if not tickers:
+        print(f"❌ No stored history in {store.root}/ - run the scanner once to fill it")
+        return
+
+    t0 = time.perf_counter()
+    prepared = load_prepared(store, tickers)
+    t1 = time.perf_counter()
+    trades, equity, summary = run_backtest(prepared, parse_overrides(args.set),
+                                           args.start, args.end, args.capital)
+    t2 = time.perf_counter()
+
+    print(f"\n📊 BACKTEST: {len(prepared)} tickers "
+          f"(indicators {t1 - t0:.1f}s, simulation {t2 - t1:.2f}s)")
+    print(f"  Starting Capital:  ${args.capital:,.0f}")
+    print(f"  Ending Capital:    ${summary['ending_capital']:,.0f}")
+    print(f"  Net Profit:        ${summary['net_profit']:+,.0f} ({summary['return_pct']:+.2f}%)")
+    print(f"  Max Drawdown:      {summary['max_drawdown_pct']:.2f}%")
+    print(f"  Win Rate:          {summary['win_rate']:.1f}% "
+          f"({summary['wins']} wins / {summary['trades']} trades)")
+    print(f"  Average Win:       ${summary['avg_win']:,.2f}")
+    print(f"  Average Loss:      ${summary['avg_loss']:,.2f}")
+
+    if args.trades:
+        trades.to_csv(args.trades, index=False)
+        print(f"💾 Trades: {args.trades}")
+    if args.equity:
+        equity.to_csv(args.equity)
+        print(f"💾 Equity curve: {args.equity}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Bar Store - Incremental local price history
+Keeps daily OHLCV per ticker on disk so each scan only downloads
+the bars added since the last stored timestamp
+"""
+import os
+import re
+import tempfile
+import numpy as np
+import pandas as pd
+
+from config import BAR_STORE_DIR
+from market_data import fetch_history_batch, OHLCV_COLUMNS
+
+BAR_DTYPE = np.dtype([('ts', 'i8')] + [(c, 'f8') for c in OHLCV_COLUMNS])
+
+# Tickers become file names - anything else (e.g. '../x' from /check) is refused
+TICKER_RE = re.compile(r'^[A-Z0-9.\-^=]+$')
+
+
+class BarStore:
+    def __init__(self, root=BAR_STORE_DIR, history_period="2y", max_bars=600):
+        """
+        Args:
+            root: Directory holding one .npy record file per ticker (created on first save)
+            history_period: Yahoo period used the first time a ticker is seen
+            max_bars: Bars kept per ticker (older ones are trimmed)
+        """
+        self.root = root
+        self.history_period = history_period
+        self.max_bars = max_bars
+
+    def path(self, ticker):
+        if not TICKER_RE.match(ticker):
+            raise ValueError(f"invalid ticker {ticker!r}")
+        return os.path.join(self.root, f"{ticker}.npy")
+
+    def load(self, ticker):
+        """Read stored bars (memory-mapped) - returns DataFrame or None"""
+        if not TICKER_RE.match(ticker):
+            return None
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            records = np.load(path, mmap_mode='r')
+        except Exception:
+            return None
+
+        if len(records) == 0:
+            return None
+
+        index = pd.DatetimeIndex(records['ts'].astype('datetime64[ns]'), name='Date')
+        return pd.DataFrame({c: np.array(records[c]) for c in OHLCV_COLUMNS}, index=index)
+
+    def save(self, ticker, df):
+        """Atomically replace the stored bars for ticker"""
+        records = np.empty(len(df), dtype=BAR_DTYPE)
+        records['ts'] = df.index.values.astype('datetime64[ns]').astype('i8')
+        for c in OHLCV_COLUMNS:
+            records[c] = df[c].to_numpy(dtype='f8')
+
+        # Unique temp file: the scanner and /check or /scan may save the same ticker at once
+        path = self.path(ticker)
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=f"{ticker}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, records)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def _normalize(self, df):
+        """Keep OHLCV only, with a tz-naive exchange-local index"""
+        df = df[OHLCV_COLUMNS].dropna(subset=['Close']).copy()
+        if df.index.tz is not None:
+            df.index = df.index.tz_localize(None)
+        df.index.name = 'Date'
+        return df
+
+    def _merge(self, stored, fresh):
+        """
+        Append fresh bars to stored ones
+
+        The second-to-last stored bar is complete, so it must match the
+        re-downloaded copy - if it doesn't, Yahoo re-adjusted the series
+        (split/dividend) and the caller falls back to a full download.
+        """
+        anchor = stored.index[-2]
+        if anchor not in fresh.index:
+            return None
+
+        if not np.isclose(stored.at[anchor, 'Close'], fresh.at[anchor, 'Close'], rtol=1e-4):
+            return None
+
+        merged = pd.concat([stored, fresh])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        return merged.iloc[-self.max_bars:]
+
+    def plan(self, tickers):
+        """
+        Work out what to download
+
+        Returns:
+            frames: {ticker: stored DataFrame}
+            resume: {start_date: [tickers]} - known tickers grouped by resume date
+            full: [tickers] needing a full history download
+        """
+        frames = {}
+        resume = {}
+        full = []
+
+        for ticker in dict.fromkeys(tickers):
+            if not TICKER_RE.match(ticker):
+                print(f"⚠️ Skipping invalid ticker {ticker!r}")
+                continue
+            stored = self.load(ticker)
+            if stored is None or len(stored) < 2:
+                full.append(ticker)
+                continue
+            frames[ticker] = stored
+            start = stored.index[-2].strftime('%Y-%m-%d')
+            resume.setdefault(start, []).append(ticker)
+
+        return frames, resume, full
+
+    def absorb(self, frames, fresh, resumed):
+        """
+        Merge downloaded bars into frames and persist them
+
+        Args:
+            frames: Dict from plan(), updated in place
+            fresh: {ticker: DataFrame} as downloaded
+            resumed: True for incremental downloads, False for full ones
+
+        Returns:
+            Tickers whose incremental download revealed re-adjusted prices
+        """
+        reload = []
+
+        for ticker, df in fresh.items():
+            df = self._normalize(df)
+            if resumed:
+                merged = self._merge(frames[ticker], df)
+                if merged is None:
+                    reload.append(ticker)
+                    continue
+            else:
+                merged = df.iloc[-self.max_bars:]
+                if merged.empty:
+                    continue
+            frames[ticker] = merged
+            self.save(ticker, merged)
+
+        return reload
+
+    def sync(self, tickers):
+        """
+        Bring tickers up to date and return their full local history
+
+        Known tickers are grouped by their resume date so one batch
+        covers them; unknown (or re-adjusted) tickers get a full
+        history download.
+
+        Returns:
+            {ticker: DataFrame} - tickers with no data at all are omitted
+        """
+        frames, resume, full = self.plan(tickers)
+
+        for start, group in resume.items():
+            fresh = fetch_history_batch(group, start=start)
+            full.extend(self.absorb(frames, fresh, resumed=True))
+
+        if full:
+            fresh = fetch_history_batch(full, period=self.history_period)
+            self.absorb(frames, fresh, resumed=False)
+
+        return frames
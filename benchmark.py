@@ -0,0 +1,507 @@
+"""
+Benchmark - Offline timings for the scan pipeline
+Runs against recorded (or synthetic) OHLCV + option-chain fixtures with
+yfinance, Telegram and Google Sheets stubbed out, so no network is used.
+Each run appends one JSON line (tagged with the git commit) to the
+results file and is compared with the previous run on the same fixtures.
+
+Usage:
+    python benchmark.py                          # 330 synthetic tickers
+    python benchmark.py --record fixtures/ --tickers AAPL MSFT NVDA   (needs network)
+    python benchmark.py --fixtures fixtures/ --repeat 5
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REGRESSION_PCT = 10.0
+
+
+# ==========================================
+# FIXTURES
+# ==========================================
+def synthetic_bars(n_tickers, n_bars=520, seed=0):
+    """Deterministic random-walk daily bars - {ticker: DataFrame}"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_bars, name='Date')
+    frames = {}
+    for i in range(n_tickers):
+        close = rng.uniform(20, 400) * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_bars)))
+        spread = rng.uniform(0, 0.02, (2, n_bars))
+        frames[f"SYN{i:03d}"] = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.005, n_bars)),
+            'High': close * (1 + spread[0]),
+            'Low': close * (1 - spread[1]),
+            'Close': close,
+            'Volume': rng.uniform(1e6, 8e6, n_bars)
+        }, index=index)
+    return frames
+
+
+def synthetic_options(price, seed=0):
+    """Option fixture around price: {'expiries': [...], 'chains': {expiry: (calls, puts)}}"""
+    rng = np.random.default_rng(seed)
+    today = datetime.now()
+    expiries = [(today + timedelta(days=d)).strftime('%Y-%m-%d') for d in (10, 38, 45, 52, 80)]
+    strikes = np.round(price * np.linspace(0.7, 1.3, 41), 1)
+
+    def side():
+        last = np.abs(rng.normal(price * 0.04, price * 0.01, len(strikes))) + 0.05
+        return pd.DataFrame({
+            'strike': strikes, 'lastPrice': last,
+            'bid': last * 0.97, 'ask': last * 1.03,
+            'volume': rng.integers(0, 500, len(strikes)),
+            'openInterest': rng.integers(0, 5000, len(strikes))
+        })
+
+    return {'expiries': expiries, 'chains': {e: (side(), side()) for e in expiries}}
+
+
+def load_fixtures(path):
+    """Recorded fixtures: bars/ (BarStore files) + options/{ticker}.pkl"""
+    from bar_store import BarStore
+
+    store = BarStore(os.path.join(path, 'bars'))
+    frames = {}
+    for p in sorted(glob.glob(os.path.join(store.root, '*.npy'))):
+        ticker = os.path.basename(p)[:-4]
+        frames[ticker] = store.load(ticker)
+
+    options = {}
+    for p in glob.glob(os.path.join(path, 'options', '*.pkl')):
+        with open(p, 'rb') as f:
+            options[os.path.basename(p)[:-4]] = pickle.load(f)
+
+    return frames, options
+
+
+def record_fixtures(path, tickers):
+    """Download bars and option chains once, for later offline runs"""
+    import yfinance as yf
+    from bar_store import BarStore
+    from market_data import fetch_history_batch
+
+    store = BarStore(os.path.join(path, 'bars'))
+    os.makedirs(os.path.join(path, 'options'), exist_ok=True)
+
+    frames = fetch_history_batch(tickers, period="2y")
+    for ticker, df in frames.items():
+        df = store._normalize(df)
+        store.save(ticker, df)
+
+        try:
+            t = yf.Ticker(ticker)
+            expiries = list(t.options)
+            chains = {}
+            for e in expiries:
+                days = (datetime.strptime(e, "%Y-%m-%d") - datetime.now()).days
+                if 30 <= days <= 60:
+                    chain = t.option_chain(e)
+                    chains[e] = (chain.calls, chain.puts)
+            with open(os.path.join(path, 'options', f"{ticker}.pkl"), 'wb') as f:
+                pickle.dump({'expiries': expiries, 'chains': chains}, f)
+        except Exception as e:
+            print(f"  ⚠️ {ticker} options: {e}")
+
+    print(f"💾 Recorded {len(frames)} tickers to {path}")
+
+
+# ==========================================
+# STUBS (gspread, Telegram, yfinance)
+# ==========================================
+class FakeWorksheet:
+    def __init__(self, title, sheet_id):
+        self.title = title
+        self.id = sheet_id
+        self.rows = []
+
+    def append_row(self, row):
+        self.rows.append(list(row))
+
+    def append_rows(self, rows):
+        first = len(self.rows) + 1
+        self.rows.extend(list(r) for r in rows)
+        return {'updates': {'updatedRange': f"'{self.title}'!A{first}:U{len(self.rows)}"}}
+
+    def format(self, *args, **kwargs):
+        pass
+
+    def get_all_records(self):
+        if not self.rows:
+            return []
+        header = self.rows[0]
+        return [dict(zip(header, r)) for r in self.rows[1:]]
+
+    def col_values(self, col):
+        return [r[col - 1] if len(r) >= col else '' for r in self.rows]
+
+
+class FakeSpreadsheet:
+    title = 'Benchmark'
+
+    def __init__(self):
+        self.sheets = {}
+        self.api_calls = 0
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def worksheet(self, title):
+        if title not in self.sheets:
+            raise KeyError(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        self.sheets[title] = FakeWorksheet(title, len(self.sheets) + 1)
+        return self.sheets[title]
+
+    def values_batch_update(self, body):
+        self.api_calls += 1
+
+    def batch_update(self, body):
+        self.api_calls += 1
+
+
+class FixtureMarket:
+    """Serves fixture bars in place of Yahoo; visible bars can be advanced"""
+
+    def __init__(self, frames, options):
+        self.frames = frames
+        self.options = options
+        self.visible = {t: len(df) for t, df in frames.items()}
+        self.requests = 0
+
+    def history(self, ticker, period="2y", interval="1d", start=None, retries=3):
+        self.requests += 1
+        df = self.frames.get(ticker)
+        if df is None:
+            return None
+        df = df.iloc[:self.visible[ticker]]
+        if start:
+            df = df[df.index >= pd.Timestamp(start)]
+        return df.copy() if len(df) else None
+
+    def download(self, chunk, period="2y", interval="1d", start=None, **kwargs):
+        """Stand-in for market_data.download_chunk (one grouped request)"""
+        frames = {}
+        for t in chunk:
+            df = self.history(t, period, interval, start)
+            if df is not None:
+                frames[t] = df
+        self.requests -= len(chunk) - 1
+        return frames
+
+    def quotes(self, tickers):
+        quotes = {}
+        for t in tickers:
+            df = self.history(t)
+            if df is not None:
+                quotes[t] = {'current': float(df['Close'].iat[-1]),
+                             'high': float(df['High'].iat[-1]), 'low': float(df['Low'].iat[-1])}
+        return quotes
+
+    def ticker(self, symbol):
+        """Stand-in for yf.Ticker (options only)"""
+        fixture = self.options.get(symbol, {'expiries': [], 'chains': {}})
+        chains = fixture['chains']
+        return types.SimpleNamespace(
+            options=tuple(fixture['expiries']),
+            option_chain=lambda e: types.SimpleNamespace(calls=chains[e][0], puts=chains[e][1])
+        )
+
+
+def load_agent(market, workdir):
+    """Import the bot module with every external service stubbed"""
+    os.environ.setdefault('TELEGRAM_TOKEN', '0:benchmark')
+    os.environ.setdefault('TELEGRAM_CHAT_ID', '0')
+    os.environ['BAR_STORE_DIR'] = os.path.join(workdir, 'bar_store')
+    os.environ['SHEET_JOURNAL'] = os.path.join(workdir, 'sheet_journal.jsonl')
+    for key in ('INTRADAY_INTERVAL', 'EXIT_MONITOR', 'COMPUTE_WORKERS', 'SCANNER_MODE'):
+        os.environ.pop(key, None)
+    os.chdir(workdir)
+    sys.path.insert(0, HERE)
+
+    import sheets_handler
+    spreadsheet = FakeSpreadsheet()
+    sheets_handler.get_google_creds = lambda: {}
+    sheets_handler.service_account = types.SimpleNamespace(
+        Credentials=types.SimpleNamespace(from_service_account_info=lambda *a, **k: None))
+    sheets_handler.gspread = types.SimpleNamespace(
+        authorize=lambda creds: types.SimpleNamespace(open_by_key=lambda key: spreadsheet))
+
+    import market_data
+    import options_insights
+    from rate_limit import TokenBucket
+    market_data.download_chunk = market.download
+    options_insights.yf = types.SimpleNamespace(Ticker=market.ticker)
+    options_insights.yahoo_limiter = TokenBucket(rate=1e9)  # fixtures are never throttled
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import claudeFinalStockMarketAgent as agent
+
+    agent.bot.send_message = lambda *args, **kwargs: None
+    agent.telegram_limiter = TokenBucket(rate=1e9)
+    agent.fetch_quotes = market.quotes
+    agent.get_scan_tickers = lambda: list(market.frames)
+    return agent, spreadsheet
+
+
+# ==========================================
+# STAGES
+# ==========================================
+def reset_state(agent, workdir, tag):
+    """Empty bar store, indicator state and caches"""
+    from bar_store import BarStore
+    from cache import TTLCache
+    from indicators import IndicatorEngine
+    import options_insights
+
+    agent.bar_store = BarStore(os.path.join(workdir, f'bar_store_{tag}'))
+    agent.indicator_engine = IndicatorEngine()
+    agent.analysis_cache = TTLCache(maxsize=agent.ANALYSIS_CACHE_SIZE, ttl=agent.ANALYSIS_CACHE_TTL)
+    for name in ('expiry_cache', 'chain_cache'):
+        old = getattr(options_insights, name)
+        setattr(options_insights, name, TTLCache(maxsize=old.maxsize, ttl=old.ttl))
+
+
+def scan_iteration(agent, last_alerts):
+    """One scanner_loop() iteration: sync -> analyze -> dedupe -> dispatch -> exits"""
+    now = datetime.now()
+    tickers = agent.get_scan_tickers()
+    histories = agent.bar_store.sync(tickers)
+    agent.universe.record_liquidity(histories)
+    results = agent.analyze_cached(histories)
+    agent.queue_alerts(tickers, results, last_alerts, now, progress=False)
+    while not agent.alert_queue.empty():
+        agent.dispatch_alert(*agent.alert_queue.get())
+    agent.check_position_exits()
+    return len(histories)
+
+
+def build_stages(agent, market, workdir):
+    """[(name, setup, run)] - setup is untimed; run returns tickers processed"""
+    from indicators import calculate_indicators, lean_indicators
+    from scoring import SCORE_COLUMNS, calculate_scores, score_universe
+    from options_insights import attach_option_insights
+
+    frames = market.frames
+    tickers = list(frames)
+    ind = {t: calculate_indicators(df.copy()) for t, df in frames.items()}
+    rows = [ind[t].iloc[-1] for t in tickers]
+    values = np.array([[r[c] for c in SCORE_COLUMNS] for r in rows], dtype='f8')
+    state = {}
+
+    def indicators():
+        for df in frames.values():
+            calculate_indicators(df.copy())
+        return len(frames)
+
+    def lean():
+        for df in frames.values():
+            lean_indicators(df)
+        return len(frames)
+
+    def scores_rowwise():
+        for row in rows:
+            calculate_scores(row)
+        return len(rows)
+
+    def scores_vectorized():
+        score_universe(values)
+        return len(values)
+
+    def cold_reset():
+        reset_state(agent, workdir, f"cold{time.perf_counter_ns()}")
+
+    def analyze_stock():
+        for t, df in frames.items():
+            agent.analyze_stock(t, strict=False, df=df)
+        return len(frames)
+
+    def options():
+        signals = [agent.build_signal(t, r, (80, 50, 0, [], [])) for t, r in zip(tickers, rows)]
+        for data in signals:
+            if data:
+                attach_option_insights(data)
+        return len(signals)
+
+    def scan_cold_setup():
+        cold_reset()
+        market.visible = {t: len(df) - 1 for t, df in frames.items()}
+        state['alerts'] = {}
+
+    def scan_cold():
+        return scan_iteration(agent, state['alerts'])
+
+    def scan_warm_setup():
+        # Store/engine are warm from a previous scan; one new bar arrives
+        scan_cold_setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scan_iteration(agent, state['alerts'])
+        market.visible = {t: len(df) for t, df in frames.items()}
+
+    def scan_warm():
+        return scan_iteration(agent, state['alerts'])
+
+    return [
+        ('calculate_indicators', None, indicators),
+        ('lean_indicators', None, lean),
+        ('calculate_scores', None, scores_rowwise),
+        ('score_universe', None, scores_vectorized),
+        ('analyze_stock (cold)', cold_reset, analyze_stock),
+        ('options_insights (cold)', cold_reset, options),
+        ('scan iteration (cold store)', scan_cold_setup, scan_cold),
+        ('scan iteration (+1 bar)', scan_warm_setup, scan_warm),
+    ]
+
+
+def measure(setup, run, repeat):
+    """Best-of-N wall time, then one traced run for memory"""
+    times = []
+    count = 0
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if setup:
+                setup()
+            t0 = time.perf_counter()
+            count = run()
+            times.append(time.perf_counter() - t0)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if setup:
+            setup()
+        tracemalloc.start()
+        blocks = sys.getallocatedblocks()
+        run()
+        blocks = sys.getallocatedblocks() - blocks
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        'seconds': round(best, 6),
+        'median_seconds': round(float(np.median(times)), 6),
+        'items': count,
+        'items_per_sec': round(count / best, 1) if best else None,
+        'peak_mb': round(peak / 2**20, 2),
+        'net_blocks': blocks
+    }
+
+
+# ==========================================
+# RESULTS
+# ==========================================
+def git_revision():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=HERE,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ('-dirty' if dirty else '')
+    except Exception:
+        return 'unknown'
+
+
+def previous_run(path, fixture):
+    """Last recorded run on the same fixtures"""
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if run.get('fixture') == fixture:
+                last = run
+    return last
+
+
+def report(result, previous):
+    print(f"\n⏱️  BENCHMARK {result['commit']} - {result['fixture']}")
+    print(f"{'stage':<30} {'best s':>9} {'items/s':>10} {'peak MB':>8} {'vs prev':>9}")
+    for name, stage in result['stages'].items():
+        change = ''
+        old = (previous or {}).get('stages', {}).get(name)
+        if old and old['seconds']:
+            pct = (stage['seconds'] - old['seconds']) / old['seconds'] * 100
+            change = f"{pct:+.1f}%" + (' ⚠️' if pct > REGRESSION_PCT else '')
+        print(f"{name:<30} {stage['seconds']:>9.4f} {stage['items_per_sec'] or 0:>10,.0f} "
+              f"{stage['peak_mb']:>8.1f} {change:>9}")
+    if previous:
+        print(f"\n(compared with {previous['commit']} at {previous['time']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scan pipeline benchmark")
+    parser.add_argument('--fixtures', help="Recorded fixture directory (default: synthetic)")
+    parser.add_argument('--synthetic', type=int, default=330, help="Synthetic tickers")
+    parser.add_argument('--bars', type=int, default=520, help="Bars per synthetic ticker")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default=os.path.join(HERE, 'bench_results.jsonl'))
+    parser.add_argument('--record', metavar='DIR', help="Download fixtures to DIR and exit")
+    parser.add_argument('--tickers', nargs='*', help="Tickers for --record")
+    args = parser.parse_args()
+
+    if args.record:
+        sys.path.insert(0, HERE)
+        record_fixtures(args.record, args.tickers or ['AAPL', 'MSFT', 'NVDA', 'SPY'])
+        return
+
+    if args.fixtures:
+        sys.path.insert(0, HERE)
+        frames, options = load_fixtures(os.path.abspath(args.fixtures))
+        fixture = f"recorded:{os.path.basename(os.path.abspath(args.fixtures))}:{len(frames)}"
+    else:
+        frames = synthetic_bars(args.synthetic, args.bars)
+        options = {t: synthetic_options(float(df['Close'].iat[-1]), i)
+                   for i, (t, df) in enumerate(frames.items())}
+        fixture = f"synthetic:{args.synthetic}x{args.bars}"
+
+    out = os.path.abspath(args.out)
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    market = FixtureMarket(frames, options)
+    agent, spreadsheet = load_agent(market, workdir)
+
+    stages = {}
+    for name, setup, run in build_stages(agent, market, workdir):
+        stages[name] = measure(setup, run, args.repeat)
+        print(f"  ✓ {name}: {stages[name]['seconds']:.4f}s")
+
+    result = {
+        'commit': git_revision(),
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'fixture': fixture,
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+        'stages': stages
+    }
+
+    previous = previous_run(out, fixture)
+    report(result, previous)
+
+    with open(out, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+    print(f"💾 Appended to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,86 @@
+import time
+STARTED = time.perf_counter()  # time-to-ready is measured from here
+
 import os
-import telebot
-import yfinance as yf
-import pandas as pd
-import numpy as np
+import functools
 import threading
-import time
-import requests
+import asyncio
+import queue
+import uuid
 import csv
-from flask import Flask
 from datetime import datetime
 import pytz
+from lazy import lazy_import, LazyObject
+
+# Imported on first use - the bot and web server are built when they start
+telebot = lazy_import('telebot')
+flask = lazy_import('flask')
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
 
 # NEW: Position tracking imports
-from position_tracker import PositionTracker
-from config import get_telegram_token, get_telegram_chat_id
+from position_tracker import LazyPositionTracker
+from config import (get_telegram_token, get_telegram_chat_id, SCANNER_MODE, COMPUTE_WORKERS,
+                    ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL, INTRADAY_INTERVAL, INTRADAY_POLL,
+                    INTRADAY_RECORD, EXIT_MONITOR, EXIT_POLL_SECONDS, STARTUP_TARGET_SECONDS)
 from commands import register_commands
+from bar_store import BarStore
+from market_data import fetch_quotes
+from rate_limit import TokenBucket, is_rate_limit_error
+import async_scanner
+from indicators import IndicatorEngine
+from parallel_compute import compute_latest_rows, start_pool
+from cache import TTLCache, MISSING
+from intraday import IntradayFeed, YahooIntradaySource
+from exit_monitor import ExitMonitor, PollingQuoteSource, WebSocketQuoteSource
+from options_insights import attach_option_insights
+import metrics
+from metrics import STAGE_SECONDS, SCAN_SECONDS, ALERTS, EXITS
+from profiler import ProfileSwitch
+from universe import UniverseManager
+from scoring import (score_universe, render_reasons, SCORE_COLUMNS, BULL_REASONS, BEAR_REASONS,
+                     BULL_MIN, ADX_MIN, BEAR_MAX, BEAR_CONFIRMS)
 
 # ==========================================
 # 🔐 SECURE CONFIGURATION (from environment variables)
 # ==========================================
-print("\n🔐 Loading credentials securely...")
-API_TOKEN = get_telegram_token()
-YOUR_CHAT_ID = get_telegram_chat_id()
-print("✅ All credentials loaded from environment\n")
+# Read on first use so the module imports without them (tests, benchmark);
+# __main__ loads both up front and still fails fast when one is missing
+@functools.cache
+def api_token():
+    return get_telegram_token()
+
+@functools.cache
+def your_chat_id():
+    return get_telegram_chat_id()
 # ==========================================
 
-bot = telebot.TeleBot(API_TOKEN)
-app = Flask(__name__)
+# Built on first use - handlers and routes registered below are replayed onto them
+bot = LazyObject(lambda: telebot.TeleBot(api_token()), deferred=['message_handler'])
+app = LazyObject(lambda: flask.Flask(__name__), deferred=['route'])
+
+# NEW: Position tracker - Google Sheets connects on first use (started in the background in __main__)
+position_tracker = LazyPositionTracker()
+update_activity = register_commands(bot, position_tracker)  # ← ADD THIS
+
+# Scan universes - lists and movers cached locally, refreshed in the background
+universe = UniverseManager()
 
-# NEW: Initialize position tracker
-position_tracker = PositionTracker()
-update_activity = register_commands(bot, position_tracker, YOUR_CHAT_ID)  # ← ADD THIS
+# Local price history - scans only download bars added since the last run
+bar_store = BarStore()
+
+# Streaming indicator state - each scan only folds in the new bars
+indicator_engine = IndicatorEngine()
+
+# Analysis results keyed on the newest bar - shared by scanner, /check and /scan
+analysis_cache = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+
+# Sampling profiler - wraps the next scan when PROFILE_SCAN is set or /profile was sent
+profile_switch = ProfileSwitch()
+
+# Intraday mode - today's forming daily bar rebuilt from 1m/5m bars between scans
+intraday_feed = (IntradayFeed(bar_store, YahooIntradaySource(INTRADAY_INTERVAL), INTRADAY_RECORD or None)
+                 if INTRADAY_INTERVAL else None)
 
 # ==========================================
 # ULTIMATE HYBRID: SHARES EXECUTION + OPTIONS INSIGHTS + POSITION TRACKING
@@ -50,342 +100,217 @@ def log_trade_to_csv(trade_data):
 
 def get_sp300_tickers():
     """Get S&P 500 top 300 (cached)"""
-    try:
-        cache_file = 'sp300_cache.txt'
-        if os.path.exists(cache_file):
-            mod_time = os.path.getmtime(cache_file)
-            if time.time() - mod_time < 86400:
-                with open(cache_file, 'r') as f:
-                    return f.read().strip().split(',')
-        
-        url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-        tables = pd.read_html(url)
-        tickers = [t.replace('.', '-') for t in tables[0]['Symbol'].tolist()]
-        sp300 = tickers[:300]
-        
-        with open(cache_file, 'w') as f:
-            f.write(','.join(sp300))
-        
-        return sp300
-    except:
-        return ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "TSLA", 
-                "AMD", "NFLX", "SPY", "QQQ"]
+    return universe.tickers('sp300')
 
 def get_yahoo_top_movers():
-    """Yahoo most active top 30"""
-    try:
-        url = "https://finance.yahoo.com/most-active"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        r = requests.get(url, headers=headers, timeout=10)
-        if r.status_code == 200:
-            df = pd.read_html(r.text)[0]
-            movers = [t for t in df['Symbol'].tolist() if "-" not in t and len(t) < 6]
-            return movers[:30]
-    except:
-        pass
-    return []
+    """Yahoo most active top 30 (cached, refreshed in the background)"""
+    return universe.movers()
 
 def get_scan_tickers():
-    """Combined S&P 300 + Yahoo top 30"""
-    sp300 = get_sp300_tickers()
-    movers = get_yahoo_top_movers()
-    all_tickers = list(set(sp300 + movers))
-    return all_tickers
-
-# ==========================================
-# INDICATORS (PROVEN FROM SHARES BACKTEST)
-# ==========================================
-def calculate_indicators(df):
-    df['SMA50'] = df['Close'].rolling(50).mean()
-    df['SMA200'] = df['Close'].rolling(200).mean()
-    df['EMA20'] = df['Close'].ewm(span=20).mean()
-    
-    delta = df['Close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(14).mean()
-    loss = -delta.where(delta < 0, 0).rolling(14).mean()
-    df['RSI'] = 100 - (100 / (1 + gain / loss))
-    
-    high_low = df['High'] - df['Low']
-    ranges = pd.concat([high_low, abs(df['High'] - df['Close'].shift()), 
-                       abs(df['Low'] - df['Close'].shift())], axis=1)
-    df['ATR'] = np.max(ranges, axis=1).rolling(14).mean()
-    
-    plus_dm = df['High'].diff()
-    minus_dm = -df['Low'].diff()
-    plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
-    minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
-    
-    atr_safe = df['ATR'].replace(0, np.nan)
-    plus_di = 100 * (plus_dm.rolling(14).mean() / atr_safe)
-    minus_di = 100 * (minus_dm.rolling(14).mean() / atr_safe)
-    dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
-    df['ADX'] = dx.rolling(14).mean()
-    df['Plus_DI'] = plus_di
-    df['Minus_DI'] = minus_di
-    
-    df['BB_Mid'] = df['Close'].rolling(20).mean()
-    df['BB_Std'] = df['Close'].rolling(20).std()
-    df['BB_Upper'] = df['BB_Mid'] + (df['BB_Std'] * 2)
-    df['BB_Lower'] = df['BB_Mid'] - (df['BB_Std'] * 2)
-    bb_range = (df['BB_Upper'] - df['BB_Lower']).replace(0, np.nan)
-    df['BB_Position'] = (df['Close'] - df['BB_Lower']) / bb_range
-    
-    df['Vol_Avg'] = df['Volume'].rolling(20).mean()
-    df['Vol_Ratio'] = df['Volume'] / df['Vol_Avg']
-    df['ROC_5'] = ((df['Close'] - df['Close'].shift(5)) / df['Close'].shift(5)) * 100
-    
-    return df
-
-# ==========================================
-# SCORING (PROVEN THRESHOLDS: 65/40/20)
-# ==========================================
-def calculate_scores(row):
-    """Returns bull_score, bear_score, bear_confirms, reasons"""
-    bull = 50
-    bull_reasons = []
-    
-    # Trend
-    if row['Close'] > row['SMA50'] > row['SMA200']:
-        bull += 15
-        bull_reasons.append("Strong Uptrend")
-    elif row['Close'] > row['SMA50']:
-        bull += 10
-        bull_reasons.append("Above SMA50")
-    elif row['Close'] > row['EMA20']:
-        bull += 5
-    
-    if row['ADX'] > 25:
-        bull += 10
-        bull_reasons.append(f"ADX Strong ({row['ADX']:.0f})")
-    elif row['ADX'] > 20:
-        bull += 5
-    
-    if row['Plus_DI'] > row['Minus_DI'] + 5:
-        bull += 5
-        bull_reasons.append("Bullish Momentum")
-    
-    # RSI
-    if row['RSI'] < 30:
-        bull += 20
-        bull_reasons.append(f"Oversold (RSI {row['RSI']:.0f})")
-    elif row['RSI'] < 40:
-        bull += 12
-        bull_reasons.append(f"RSI Favorable ({row['RSI']:.0f})")
-    elif row['RSI'] > 60:
-        bull -= 8
-    
-    if row['ROC_5'] > 2:
-        bull += 5
-        bull_reasons.append("Positive Momentum")
-    
-    # Bollinger
-    if row['BB_Position'] < 0.2:
-        bull += 10
-        bull_reasons.append("BB Oversold")
-    elif row['BB_Position'] < 0.4:
-        bull += 5
-    
-    # Volume
-    if row['Vol_Ratio'] > 1.5:
-        bull += 8
-        bull_reasons.append(f"High Volume ({row['Vol_Ratio']:.1f}x)")
-    elif row['Vol_Ratio'] > 1.2:
-        bull += 4
-    
-    # Bear
-    bear = 50
-    confirms = 0
-    bear_reasons = []
-    
-    if row['Close'] < row['SMA50']:
-        bear -= 12
-        confirms += 1
-        bear_reasons.append("Below SMA50")
-    
-    if row['ADX'] > 25:
-        bear -= 8
-        confirms += 1
-        bear_reasons.append(f"Strong Trend (ADX {row['ADX']:.0f})")
-    
-    if row['Minus_DI'] > row['Plus_DI'] + 10:
-        bear -= 10
-        confirms += 1
-        bear_reasons.append("Bearish Momentum")
-    
-    if row['RSI'] > 70:
-        bear -= 15
-        confirms += 1
-        bear_reasons.append(f"Overbought (RSI {row['RSI']:.0f})")
-    
-    if row['BB_Position'] > 0.9:
-        bear -= 10
-        confirms += 1
-        bear_reasons.append("BB Overbought")
-    
-    if row['Vol_Ratio'] > 2.0:
-        bear -= 12
-        confirms += 1
-        bear_reasons.append(f"High Volume ({row['Vol_Ratio']:.1f}x)")
-    
-    if confirms < 3:
-        bear += 15
-    
-    bull = max(0, min(100, bull))
-    bear = max(0, min(100, bear))
-    
-    return bull, bear, confirms, bull_reasons, bear_reasons
+    """Configured universes (default S&P 300) + Yahoo top 30, illiquid names dropped"""
+    tickers = universe.scan_tickers()
+    if universe.skipped:
+        print(f"🚫 Skipped {len(universe.skipped)} illiquid tickers (dollar volume/price below minimum)")
+    return tickers
 
 # ==========================================
-# OPTIONS INSIGHTS (NOT FOR EXECUTION, JUST INFO)
+# MAIN ANALYSIS
 # ==========================================
-def get_option_insights(ticker, direction, atr, current_price):
-    """Get options details for user information"""
+def analyze_stock(ticker, strict=True, df=None):
+    """Analyze stock and return signal data (df: prefetched 2y history, synced if None)"""
     try:
-        stock = yf.Ticker(ticker)
-        exps = stock.options
-        if not exps:
-            return None
-        
-        today = datetime.now()
-        target_dte = 45
-        best_expiry = None
-        
-        valid = {}
-        for e in exps:
-            try:
-                edate = datetime.strptime(e, "%Y-%m-%d")
-                days = (edate - today).days
-                if 30 <= days <= 60:
-                    valid[e] = abs(days - target_dte)
-            except:
-                pass
-        
-        if not valid:
-            return None
+        if df is None:
+            df = bar_store.sync([ticker]).get(ticker, pd.DataFrame())
         
-        best_expiry = min(valid, key=valid.get)
-        expiry_date = datetime.strptime(best_expiry, "%Y-%m-%d")
-        dte = (expiry_date - today).days
-        
-        move = atr * 1.5
-        target_strike = current_price + move if direction == "CALL" else current_price - move
-        
-        opt = stock.option_chain(best_expiry)
-        chain = opt.calls if direction == "CALL" else opt.puts
-        
-        chain = chain[(chain['openInterest'] > 50) | (chain['volume'] > 10)]
-        
-        if chain.empty:
-            return None
-        
-        chain['diff'] = abs(chain['strike'] - target_strike)
-        best = chain.sort_values('diff').iloc[0]
-        
-        spread = best['ask'] - best['bid']
-        spread_pct = (spread / best['lastPrice'] * 100) if best['lastPrice'] > 0 else 999
-        
-        if spread_pct > 25:
+        if len(df) < 250:
             return None
         
-        return {
-            "type": direction,
-            "strike": best['strike'],
-            "expiry": best_expiry,
-            "dte": dte,
-            "last_price": best['lastPrice'],
-            "bid": best['bid'],
-            "ask": best['ask'],
-            "volume": int(best['volume']),
-            "oi": int(best['openInterest']),
-            "spread_pct": spread_pct,
-            "contracts_1k": int(1000 / (best['lastPrice'] * 100)),
-            "contracts_2.5k": int(2500 / (best['lastPrice'] * 100))
-        }
+        data = analyze_cached({ticker: df}).get(ticker)
+        return strict_signal(data) if strict else data
     
     except Exception as e:
         return None
 
-# ==========================================
-# MAIN ANALYSIS
-# ==========================================
-def analyze_stock(ticker, strict=True):
-    """Analyze stock and return signal data"""
-    try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period="2y")
-        
-        if len(df) < 250:
-            return None
-        
-        df = calculate_indicators(df)
-        latest = df.iloc[-1]
-        
+def bar_key(ticker, df):
+    """
+    Analysis cache key: ticker + the newest bar's timestamp and state
+    
+    Close/volume are included because today's daily bar keeps changing
+    under the same timestamp until the close.
+    """
+    return (ticker, df.index[-1], float(df['Close'].iat[-1]), float(df['Volume'].iat[-1]))
+
+def strict_signal(data):
+    """Non-strict analysis result -> strict one (NEUTRAL counts as no signal)"""
+    if data and data['direction'] != "NEUTRAL":
+        return data
+    return None
+
+def analyze_cached(histories):
+    """
+    analyze_universe() behind the shared analysis cache
+    
+    Only tickers whose newest bar changed since they were last analyzed
+    are recomputed, whatever the wall clock says.
+    
+    Returns:
+        {ticker: non-strict signal data or None}
+    """
+    results = {}
+    misses = {}
+    
+    for ticker, df in histories.items():
+        if df.empty:
+            continue
+        key = bar_key(ticker, df)
+        data = analysis_cache.get(key, MISSING)
+        if data is MISSING:
+            misses[ticker] = (key, df)
+        else:
+            results[ticker] = data
+    
+    if misses:
+        fresh = analyze_universe({t: df for t, (_, df) in misses.items()})
+        for ticker, (key, _) in misses.items():
+            data = fresh.get(ticker)
+            analysis_cache.set(key, data)
+            results[ticker] = data
+    
+    return results
+
+def analyze_universe(histories):
+    """
+    Analysis for a whole scan in one vectorized scoring pass
+    
+    Args:
+        histories: {ticker: DataFrame} from bar_store.sync()
+    
+    Returns:
+        {ticker: signal data} - BULL/BEAR setups, NEUTRAL for everything else scoreable
+    """
+    histories = {t: df for t, df in histories.items() if len(df) >= 250}
+    
+    with STAGE_SECONDS.time(stage='indicators'):
+        latest_rows = None
+        if COMPUTE_WORKERS > 0:
+            # Process pool: full recompute, prices shared through a memory-mapped file
+            latest_rows = compute_latest_rows(histories, COMPUTE_WORKERS)
+        if latest_rows is None:
+            latest_rows = {}
+            for ticker, df in histories.items():
+                try:
+                    latest_rows[ticker] = indicator_engine.latest(ticker, df)
+                except Exception:
+                    continue
+    
+    with STAGE_SECONDS.time(stage='scoring'):
+        return score_rows(latest_rows)
+
+def score_rows(latest_rows):
+    """Latest indicator rows -> {ticker: signal data} (one score_universe() pass)"""
+    tickers = []
+    rows = []
+    
+    for ticker, latest in latest_rows.items():
         if pd.isna(latest['RSI']) or pd.isna(latest['ADX']) or pd.isna(latest['ATR']):
-            return None
-        
-        bull, bear, confirms, bull_reasons, bear_reasons = calculate_scores(latest)
-        
-        direction = None
-        reasons = []
-        shares_stop = 0
-        shares_target = 0
-        
-        if bull >= 65 and latest['ADX'] > 20:
-            direction = "BULL"
-            reasons = bull_reasons
-            shares_stop = latest['Close'] - (latest['ATR'] * 2.5)
-            shares_target = latest['Close'] + (latest['ATR'] * 3.5)
-        
-        elif bear <= 40 and confirms >= 3:
-            direction = "BEAR"
-            reasons = bear_reasons
-            shares_stop = latest['Close'] + (latest['ATR'] * 2.0)
-            shares_target = latest['Close'] - (latest['ATR'] * 4.0)
-        
-        if not strict and not direction:
-            return {
-                "ticker": ticker,
-                "price": round(latest['Close'], 2),
-                "direction": "NEUTRAL",
-                "score": int(bull),
-                "reasons": ["No setup found"],
-                "shares_trade": None,
-                "options_insight": None
-            }
-        
-        if direction:
-            position_size_10pct = 2500
-            shares = int(position_size_10pct / latest['Close'])
-            
-            shares_trade = {
-                "action": "BUY" if direction == "BULL" else "SHORT",
-                "shares": shares,
-                "price": latest['Close'],
-                "capital": shares * latest['Close'],
-                "stop": shares_stop,
-                "target": shares_target,
-                "risk_pct": abs((shares_stop - latest['Close']) / latest['Close'] * 100),
-                "reward_pct": abs((shares_target - latest['Close']) / latest['Close'] * 100)
-            }
-            
-            opt_type = "CALL" if direction == "BULL" else "PUT"
-            options_insight = get_option_insights(ticker, opt_type, latest['ATR'], latest['Close'])
-            
-            return {
-                "ticker": ticker,
-                "price": round(latest['Close'], 2),
-                "direction": direction,
-                "score": int(bull if direction == "BULL" else (100 - bear)),
-                "reasons": reasons,
-                "atr": latest['ATR'],
-                "adx": latest['ADX'],
-                "rsi": latest['RSI'],
-                "shares_trade": shares_trade,
-                "options_insight": options_insight
-            }
+            continue
+        tickers.append(ticker)
+        rows.append(latest)
     
-    except Exception as e:
-        return None
+    if not rows:
+        return {}
+    
+    values = np.array([[row[c] for c in SCORE_COLUMNS] for row in rows], dtype='f8')
+    bull, bear, confirms, bull_mask, bear_mask = score_universe(values)
+    adx = values[:, SCORE_COLUMNS.index('ADX')]
+    hits = np.flatnonzero(((bull >= BULL_MIN) & (adx > ADX_MIN))
+                          | ((bear <= BEAR_MAX) & (confirms >= BEAR_CONFIRMS)))
+    hit_set = set(hits.tolist())
+    
+    signals = {}
+    for i in range(len(tickers)):
+        if i in hit_set:
+            # Reasons are only rendered for tickers that crossed a threshold
+            scores = (
+                int(bull[i]), int(bear[i]), int(confirms[i]),
+                render_reasons(bull_mask[i], values[i], BULL_REASONS),
+                render_reasons(bear_mask[i], values[i], BEAR_REASONS)
+            )
+        else:
+            scores = (int(bull[i]), int(bear[i]), int(confirms[i]), [], [])
+        try:
+            data = build_signal(tickers[i], rows[i], scores, strict=False)
+        except Exception:
+            continue
+        if data:
+            signals[tickers[i]] = data
+    
+    return signals
+
+def build_signal(ticker, latest, scores, strict=True):
+    """
+    Turn an indicator row + calculate_scores() output into signal data
+    
+    options_insight is left empty - attach_option_insights() fills it in
+    only for alerts that are actually sent.
+    """
+    bull, bear, confirms, bull_reasons, bear_reasons = scores
+    
+    direction = None
+    reasons = []
+    shares_stop = 0
+    shares_target = 0
+    
+    if bull >= BULL_MIN and latest['ADX'] > ADX_MIN:
+        direction = "BULL"
+        reasons = bull_reasons
+        shares_stop = latest['Close'] - (latest['ATR'] * 2.5)
+        shares_target = latest['Close'] + (latest['ATR'] * 3.5)
+    
+    elif bear <= BEAR_MAX and confirms >= BEAR_CONFIRMS:
+        direction = "BEAR"
+        reasons = bear_reasons
+        shares_stop = latest['Close'] + (latest['ATR'] * 2.0)
+        shares_target = latest['Close'] - (latest['ATR'] * 4.0)
+    
+    if not strict and not direction:
+        return {
+            "ticker": ticker,
+            "price": round(latest['Close'], 2),
+            "direction": "NEUTRAL",
+            "score": int(bull),
+            "reasons": ["No setup found"],
+            "shares_trade": None,
+            "options_insight": None
+        }
+    
+    if direction:
+        position_size_10pct = 2500
+        shares = int(position_size_10pct / latest['Close'])
+        
+        shares_trade = {
+            "action": "BUY" if direction == "BULL" else "SHORT",
+            "shares": shares,
+            "price": latest['Close'],
+            "capital": shares * latest['Close'],
+            "stop": shares_stop,
+            "target": shares_target,
+            "risk_pct": abs((shares_stop - latest['Close']) / latest['Close'] * 100),
+            "reward_pct": abs((shares_target - latest['Close']) / latest['Close'] * 100)
+        }
+        
+        return {
+            "ticker": ticker,
+            "price": round(latest['Close'], 2),
+            "direction": direction,
+            "score": int(bull if direction == "BULL" else (100 - bear)),
+            "reasons": reasons,
+            "atr": latest['ATR'],
+            "adx": latest['ADX'],
+            "rsi": latest['RSI'],
+            "shares_trade": shares_trade,
+            "options_insight": None
+        }
     
     return None
 
@@ -411,6 +336,7 @@ def generate_alert_message(data):
         stars = "⭐⭐"
     
     icon = "🚀" if data['direction'] == "BULL" else "🐻"
+    alert_id_line = f"🆔 Alert ID: {data['alert_id']}\n" if data.get('alert_id') else ""
     color = "🟢" if data['direction'] == "BULL" else "🔴"
     
     reasons = "\n".join([f"• {r}" for r in data['reasons'][:4]])
@@ -477,6 +403,7 @@ def generate_alert_message(data):
         f"**{data['ticker']}** @ ${data['price']:.2f}\n"
         f"Score: {data['score']}/100 {stars}\n"
         f"ADX: {data['adx']:.0f} | RSI: {data['rsi']:.0f}\n"
+        f"{alert_id_line}"
         f"━━━━━━━━━━━━━━━━━━━━━━━━\n"
         f"**📊 Why:**\n{reasons}\n\n"
         f"{shares_section}\n\n"
@@ -487,43 +414,63 @@ def generate_alert_message(data):
 # ==========================================
 # NEW: EXIT ALERT FUNCTIONS
 # ==========================================
+# Scanner and exit monitor can both spot the same hit - only the first one closes it
+exit_lock = threading.Lock()
+
 def check_position_exits():
     """Check if any positions hit stop/target"""
     try:
+        # One sheet read, one batched quote request
         open_positions = position_tracker.sheets.get_open_positions()
         
         if not open_positions:
             return
         
-        current_prices = {}
+        current_prices = fetch_quotes({pos['Ticker'] for pos in open_positions})
         
-        for pos in open_positions:
-            ticker = pos['Ticker']
-            if ticker not in current_prices:
-                try:
-                    stock = yf.Ticker(ticker)
-                    hist = stock.history(period='1d')
-                    
-                    if not hist.empty:
-                        current_prices[ticker] = {
-                            'current': float(hist['Close'].iloc[-1]),
-                            'high': float(hist['High'].iloc[-1]),
-                            'low': float(hist['Low'].iloc[-1])
-                        }
-                except:
-                    continue
-        
-        exits = position_tracker.check_exits(current_prices)
+        exits = position_tracker.check_exits(current_prices, open_positions)
         
         if exits:
-            exit_alerts = position_tracker.process_exits(exits)
-            
-            for alert in exit_alerts:
-                send_exit_alert(alert)
+            handle_exits(exits)
     
     except Exception as e:
         print(f"❌ Error checking exits: {e}")
 
+def handle_exits(exits):
+    """Close still-open positions in the sheets and send their exit alerts"""
+    with exit_lock:
+        store = position_tracker.sheets.store
+        exits = [e for e in exits
+                 if (store.get(e['position']['ID'], e['position'].get('sheet_type', 'bot')) or {})
+                 .get('Status') == 'OPEN']
+        if not exits:
+            return
+        exit_alerts = position_tracker.process_exits(exits)
+    
+    for e in exits:
+        EXITS.inc(reason=e['exit_reason'])
+    
+    for alert in exit_alerts:
+        send_exit_alert(alert)
+
+def start_exit_monitor():
+    """Event-driven exit checks between scans (EXIT_MONITOR=poll|websocket)"""
+    if EXIT_MONITOR == 'websocket':
+        source = WebSocketQuoteSource()
+    else:
+        source = PollingQuoteSource(interval=EXIT_POLL_SECONDS)
+    
+    monitor = ExitMonitor(position_tracker, source, on_exits=handle_exits)
+    
+    def run():
+        try:
+            monitor.run()
+        except Exception as e:
+            print(f"❌ Exit monitor stopped: {e}")
+    
+    threading.Thread(target=run, daemon=True).start()
+    return monitor
+
 def send_exit_alert(exit_data):
     """Send Telegram alert for position exit"""
     icon = "🎯" if exit_data['reason'] == 'TARGET' else "🛑"
@@ -547,7 +494,7 @@ Reason: {exit_data['reason']}
 """
     
     try:
-        bot.send_message(YOUR_CHAT_ID, msg, parse_mode="Markdown")
+        bot.send_message(your_chat_id(), msg, parse_mode="Markdown")
         print(f"  📤 Exit alert sent: {exit_data['ticker']} {exit_data['pnl']['dollar']:+.2f}")
     except Exception as e:
         print(f"  ❌ Failed to send exit alert: {e}")
@@ -567,6 +514,9 @@ def manual_check(message):
         
         data = analyze_stock(ticker, strict=False)
         
+        if data and data['direction'] != "NEUTRAL":
+            data = attach_option_insights(data)
+        
         if data:
             bot.send_message(message.chat.id, generate_alert_message(data), parse_mode="Markdown")
         else:
@@ -579,11 +529,13 @@ def manual_check(message):
 def manual_scan(message):
     bot.reply_to(message, "🦅 Force-scanning top movers...")
     movers = get_yahoo_top_movers()[:20]
+    results = analyze_cached(bar_store.sync(movers))
     found = 0
     
     for ticker in movers:
-        data = analyze_stock(ticker, strict=True)
+        data = strict_signal(results.get(ticker))
         if data:
+            data = attach_option_insights(data)
             bot.send_message(message.chat.id, generate_alert_message(data), parse_mode="Markdown")
             found += 1
             time.sleep(1)
@@ -591,6 +543,14 @@ def manual_scan(message):
     if found == 0:
         bot.reply_to(message, "😴 No setups in top movers.")
 
+@bot.message_handler(commands=['profile'])
+def request_profile(message):
+    """Profile the next scan cycle (admin chat only)"""
+    if str(message.chat.id) != str(your_chat_id()):
+        return
+    profile_switch.request(message.chat.id)
+    bot.reply_to(message, "🔬 Next scan will be profiled - summary follows when it completes.")
+
 @bot.message_handler(commands=['stats'])
 def show_stats(message):
     try:
@@ -896,17 +856,14 @@ def manual_close(message):
 def show_performance(message):
     """Show detailed performance comparison"""
     try:
-        bot_perf = position_tracker.sheets.bot_performance.get_all_records()
-        my_perf = position_tracker.sheets.my_performance.get_all_records()
+        # Running totals kept in memory - no sheet download
+        bot_latest = position_tracker.sheets.performance.latest('bot')
+        my_latest = position_tracker.sheets.performance.latest('my')
         
-        if not bot_perf and not my_perf:
+        if not bot_latest and not my_latest:
             bot.reply_to(message, "📊 No performance data yet")
             return
         
-        # Latest data
-        bot_latest = bot_perf[-1] if bot_perf else {}
-        my_latest = my_perf[-1] if my_perf else {}
-        
         msg = (
             f"📊 **PERFORMANCE COMPARISON**\n\n"
             f"🤖 **Bot Performance (All Alerts):**\n"
@@ -925,27 +882,231 @@ def show_performance(message):
     except Exception as e:
         bot.reply_to(message, f"Error: {e}")
 
+# ==========================================
+# ALERT DISPATCH (runs beside the scanner)
+# ==========================================
+# Scanner queues (data, alert_reason, last_alerts, scan_time); the dispatcher
+# sends, tracks and logs at Telegram's pace so scans never wait on it
+alert_queue = queue.Queue()
+telegram_limiter = TokenBucket(rate=0.5, capacity=1)  # 1 message / 2s per chat
+
+def dispatch_alert(data, alert_reason, last_alerts, scan_time):
+    """Send one entry alert, then track and log it"""
+    ticker = data['ticker']
+    
+    # Copy (cached dicts stay untouched) + options lookup only now that it will be sent
+    with STAGE_SECONDS.time(stage='options'):
+        data = attach_option_insights(dict(data, alert_id=str(uuid.uuid4())[:8]))
+    
+    try:
+        telegram_limiter.acquire()
+        with STAGE_SECONDS.time(stage='telegram'):
+            bot.send_message(your_chat_id(), generate_alert_message(data), parse_mode="Markdown")
+    except Exception as e:
+        # Not delivered - let the next scan retry it
+        last_alerts.pop(ticker, None)
+        if is_rate_limit_error(e):
+            telegram_limiter.backoff()
+        ALERTS.inc(result='failed')
+        print(f"  ❌ Telegram error ({ticker}): {e}")
+        return
+    
+    telegram_limiter.success()
+    ALERTS.inc(result='sent')
+    record_alert(data, alert_reason, scan_time)
+
+def record_alert(data, alert_reason, scan_time):
+    """Track a sent alert in Google Sheets and the CSV log"""
+    ticker = data['ticker']
+    
+    try:
+        position_id = position_tracker.track_bot_alert({
+            'alert_id': data['alert_id'],
+            'ticker': data['ticker'],
+            'direction': data['direction'],
+            'price': data['price'],
+            'stop': data['shares_trade']['stop'],
+            'target': data['shares_trade']['target'],
+            'shares': data['shares_trade']['shares'],
+            'score': data['score'],
+            'reasons': data['reasons']
+        })
+        
+        if position_id:
+            print(f"  📝 Position tracked: {position_id}")
+    except Exception as e:
+        print(f"  ❌ Tracking error ({ticker}): {e}")
+    
+    log_trade_to_csv({
+        "Time": scan_time.strftime("%Y-%m-%d %H:%M"),
+        "Ticker": ticker,
+        "Direction": data['direction'],
+        "Price": data['price'],
+        "Score": data['score'],
+        "Reasons": "; ".join(data['reasons'][:3]),
+        "Alert_Reason": alert_reason
+    })
+    
+    print(f"  ✅ Sent {ticker} {data['direction']} ({data['score']}) - {alert_reason}")
+
+def alert_dispatcher():
+    """Drain alert_queue forever"""
+    while True:
+        item = alert_queue.get()
+        try:
+            dispatch_alert(*item)
+        except Exception as e:
+            print(f"❌ Dispatcher error: {e}")
+        finally:
+            alert_queue.task_done()
+
 #==========================================
 # AUTO SCANNER
 # ==========================================
+def decide_alert(ticker, data, last_alerts):
+    """Duplicate alert prevention - returns the alert reason, or None to skip"""
+    if ticker not in last_alerts:
+        return "NEW"
+    
+    last = last_alerts[ticker]
+    
+    if last['direction'] != data['direction']:
+        return f"🔄 {last['direction']}→{data['direction']}"
+    
+    if abs(last['score'] - data['score']) >= 10:
+        return f"📊 Score {last['score']}→{data['score']}"
+    
+    if time.time() - last['time'] > 14400:
+        return "⏰ Stale (>4hrs)"
+    
+    return None
+
+def scan_schedule(now):
+    """Scan interval for the current EST time - (seconds, label), or (None, None) when closed"""
+    if now.weekday() >= 5:
+        return None, None
+    if 6 <= now.hour < 9:
+        return 3600, "60 min"
+    if 9 <= now.hour < 16:
+        return 1800, "30 min"
+    if 16 <= now.hour < 17:
+        return 2700, "45 min"
+    return None, None
+
+def queue_alerts(tickers, results, last_alerts, now, progress=True):
+    """
+    Dedupe scan results and queue the new alerts for the dispatcher
+    
+    Returns:
+        (alerts_queued, duplicates_skipped, errors)
+    """
+    alerts_queued = 0
+    duplicates_skipped = 0
+    errors = 0
+    
+    for idx, ticker in enumerate(tickers, 1):
+        try:
+            data = strict_signal(results.get(ticker))
+            
+            if data:
+                # DUPLICATE ALERT PREVENTION
+                alert_reason = decide_alert(ticker, data, last_alerts)
+                
+                if alert_reason is None:
+                    duplicates_skipped += 1
+                    ALERTS.inc(result='duplicate')
+                else:
+                    last_alerts[ticker] = {
+                        'direction': data['direction'],
+                        'score': data['score'],
+                        'time': time.time()
+                    }
+                    alert_queue.put((data, alert_reason, last_alerts, now))
+                    alerts_queued += 1
+                    ALERTS.inc(result='queued')
+                    print(f"  [{idx}/{len(tickers)}] 📨 {ticker} {data['direction']} ({data['score']}) - {alert_reason}")
+            
+            if progress and idx % 50 == 0:
+                print(f"\n  📊 Progress: {idx}/{len(tickers)} ({idx/len(tickers)*100:.1f}%)")
+                print(f"  📨 Queued: {alerts_queued} | ⏭️  Skipped: {duplicates_skipped} | ❌ Errors: {errors}\n")
+        
+        except Exception as e:
+            errors += 1
+            ALERTS.inc(result='error')
+            continue
+    
+    return alerts_queued, duplicates_skipped, errors
+
+def record_scan(scan_start, scan_interval, tickers, histories, results):
+    """Scan duration + ticker counts for /metrics"""
+    elapsed = time.perf_counter() - scan_start
+    SCAN_SECONDS.observe(elapsed)
+    metrics.LAST_SCAN.set(round(elapsed, 3))
+    metrics.LAST_SCAN_TIME.set(round(time.time()))
+    metrics.SCAN_INTERVAL.set(scan_interval)
+    metrics.SCAN_TICKERS.set(len(tickers), state='requested')
+    metrics.SCAN_TICKERS.set(len(histories), state='with_history')
+    metrics.SCAN_TICKERS.set(sum(1 for d in results.values() if strict_signal(d)), state='signals')
+    
+    if elapsed > 0.8 * scan_interval:
+        print(f"⚠️ Scan took {elapsed:.0f}s - {elapsed / scan_interval:.0%} of the {scan_interval}s interval")
+
+def report_profile(profiler):
+    """Write a finished scan profile; reply with the summary if /profile asked for it"""
+    try:
+        summary, path, chat_id = profile_switch.end(profiler)
+        if chat_id:
+            bot.send_message(chat_id, f"🔬 Scan profile ({os.path.basename(path)})\n\n{summary[:3500]}")
+    except Exception as e:
+        print(f"❌ Profile error: {e}")
+
+def market_open(now):
+    """Regular session (9:30 AM - 4:00 PM EST, weekdays)"""
+    return now.weekday() < 5 and (9, 30) <= (now.hour, now.minute) < (16, 0)
+
+def intraday_pass(tickers, last_alerts):
+    """Rescore from the live partial daily bar - no daily history is downloaded"""
+    now = datetime.now(pytz.timezone('US/Eastern'))
+    if not market_open(now):
+        return
+    
+    histories = intraday_feed.refresh(tickers)
+    results = analyze_cached(histories)
+    alerts_queued, duplicates_skipped, errors = queue_alerts(tickers, results, last_alerts, now,
+                                                             progress=False)
+    print(f"⚡ Intraday {INTRADAY_INTERVAL} update at {now.strftime('%H:%M')}: "
+          f"{len(histories)} tickers | 📨 {alerts_queued} queued | ⏭️  {duplicates_skipped} skipped")
+
+def wait_for_next_scan(scan_interval, tickers, last_alerts):
+    """Sleep until the next full scan, running intraday passes meanwhile (if enabled)"""
+    deadline = time.time() + scan_interval
+    
+    while intraday_feed and time.time() + INTRADAY_POLL < deadline:
+        time.sleep(INTRADAY_POLL)
+        try:
+            intraday_pass(tickers, last_alerts)
+        except Exception as e:
+            print(f"❌ Intraday error: {e}")
+    
+    time.sleep(max(0, deadline - time.time()))
+
 def scanner_loop():
     print("="*70)
     print("🚀 ULTIMATE TRADING BOT v2.0 (Smart Alerts + Daily Reset + Position Tracking)")
     print("="*70)
     print("📊 Execution: SHARES (proven 89% return)")
     print("⚡ Insights: OPTIONS (manual consideration)")
-    print("🎯 Thresholds: Bull ≥65, Bear ≤40, ADX >20")
+    print(f"🎯 Thresholds: Bull ≥{BULL_MIN}, Bear ≤{BEAR_MAX}, ADX >{ADX_MIN}")
     print("⏰ Active: 6:00 AM - 5:00 PM EST")
-    print("📈 Scanning: S&P 300 + Yahoo Top 30")
+    print(f"📈 Scanning: {', '.join(universe.names)} + Yahoo Top {universe.movers_count}")
     print("🔔 Smart Alerts: Only on direction changes or significant score moves")
     print("⏱️  Timing: 6-9 AM (60min) | 9 AM-4 PM (30min) | 4-5 PM (45min)")
     print("🌅 Daily Reset: Memory clears at midnight EST (fresh start)")
     print("📝 Position Tracking: Google Sheets with stop/target alerts")
+    if intraday_feed:
+        print(f"⚡ Intraday: {INTRADAY_INTERVAL} bars every {INTRADAY_POLL // 60} min between scans")
     print("="*70 + "\n")
     
-    analysis_cache = {}
-    cache_expiry = 900
-    
     last_alerts = {}
     
     tz = pytz.timezone('US/Eastern')
@@ -972,141 +1133,49 @@ def scanner_loop():
                 last_alerts = {}
                 current_day = today
             
-            # Determine scan interval
-            if 6 <= now.hour < 9:
-                scan_interval = 3600
-                interval_name = "60 min"
-            elif 9 <= now.hour < 16:
-                scan_interval = 1800
-                interval_name = "30 min"
-            elif 16 <= now.hour < 17:
-                scan_interval = 2700
-                interval_name = "45 min"
-            else:
-                scan_interval = None
+            # Determine scan interval (6 AM - 5 PM EST, weekdays)
+            scan_interval, interval_name = scan_schedule(now)
             
-            # 6 AM - 5 PM EST
-            if 6 <= now.hour < 17 and now.weekday() < 5:
-                tickers = get_scan_tickers()
+            if scan_interval:
+                profiler = profile_switch.begin()
+                scan_start = time.perf_counter()
+                with STAGE_SECONDS.time(stage='tickers'):
+                    tickers = get_scan_tickers()
                 print(f"🔍 Scan at {now.strftime('%H:%M')} EST | {len(tickers)} tickers | Next: {interval_name}")
                 print(f"📊 Tracking {len(last_alerts)} stocks for duplicates\n")
                 
-                alerts_sent = 0
-                duplicates_skipped = 0
-                errors = 0
+                # Incremental fetch: only bars newer than the local store
+                with STAGE_SECONDS.time(stage='history'):
+                    histories = bar_store.sync(tickers)
+                universe.record_liquidity(histories)
+                print(f"📥 History ready for {len(histories)}/{len(tickers)} tickers\n")
                 
-                for idx, ticker in enumerate(tickers, 1):
-                    try:
-                        time.sleep(0.5)
-                        
-                        cache_key = f"{ticker}_{now.strftime('%Y%m%d%H%M')[:11]}"
-                        if cache_key in analysis_cache:
-                            cached_time, cached_data = analysis_cache[cache_key]
-                            if time.time() - cached_time < cache_expiry:
-                                data = cached_data
-                            else:
-                                data = analyze_stock(ticker, strict=True)
-                                analysis_cache[cache_key] = (time.time(), data)
-                        else:
-                            data = analyze_stock(ticker, strict=True)
-                            analysis_cache[cache_key] = (time.time(), data)
-                        
-                        if data:
-                            # DUPLICATE ALERT PREVENTION
-                            should_alert = False
-                            alert_reason = ""
-                            
-                            if ticker not in last_alerts:
-                                should_alert = True
-                                alert_reason = "NEW"
-                            else:
-                                last = last_alerts[ticker]
-                                
-                                if last['direction'] != data['direction']:
-                                    should_alert = True
-                                    alert_reason = f"🔄 {last['direction']}→{data['direction']}"
-                                
-                                elif abs(last['score'] - data['score']) >= 10:
-                                    should_alert = True
-                                    alert_reason = f"📊 Score {last['score']}→{data['score']}"
-                                
-                                elif time.time() - last['time'] > 14400:
-                                    should_alert = True
-                                    alert_reason = "⏰ Stale (>4hrs)"
-                                
-                                else:
-                                    should_alert = False
-                                    duplicates_skipped += 1
-                            
-                            if should_alert:
-                                try:
-                                    bot.send_message(YOUR_CHAT_ID, generate_alert_message(data), parse_mode="Markdown")
-                                    
-                                    # NEW: Track position in Google Sheets
-                                    position_id = position_tracker.track_entry({
-                                        'ticker': data['ticker'],
-                                        'direction': data['direction'],
-                                        'price': data['price'],
-                                        'stop': data['shares_trade']['stop'],
-                                        'target': data['shares_trade']['target'],
-                                        'shares': data['shares_trade']['shares'],
-                                        'score': data['score'],
-                                        'reasons': data['reasons']
-                                    }, trade_type='SHARES')
-                                    
-                                    if position_id:
-                                        print(f"  📝 Position tracked: {position_id}")
-                                    
-                                    last_alerts[ticker] = {
-                                        'direction': data['direction'],
-                                        'score': data['score'],
-                                        'time': time.time()
-                                    }
-                                    
-                                    log_entry = {
-                                        "Time": now.strftime("%Y-%m-%d %H:%M"),
-                                        "Ticker": ticker,
-                                        "Direction": data['direction'],
-                                        "Price": data['price'],
-                                        "Score": data['score'],
-                                        "Reasons": "; ".join(data['reasons'][:3]),
-                                        "Alert_Reason": alert_reason
-                                    }
-                                    log_trade_to_csv(log_entry)
-                                    
-                                    alerts_sent += 1
-                                    print(f"  [{idx}/{len(tickers)}] ✅ {ticker} {data['direction']} ({data['score']}) - {alert_reason}")
-                                    time.sleep(2)
-                                
-                                except Exception as e:
-                                    print(f"  [{idx}/{len(tickers)}] ❌ Telegram error: {e}")
-                                    errors += 1
-                        
-                        if idx % 50 == 0:
-                            print(f"\n  📊 Progress: {idx}/{len(tickers)} ({idx/len(tickers)*100:.1f}%)")
-                            print(f"  ✅ Sent: {alerts_sent} | ⏭️  Skipped: {duplicates_skipped} | ❌ Errors: {errors}\n")
-                    
-                    except Exception as e:
-                        errors += 1
-                        if "429" in str(e):
-                            print(f"  ⚠️ Rate limited! Sleeping 60s...")
-                            time.sleep(60)
-                        continue
+                # Vectorized scoring - only tickers with a new/changed bar
+                results = analyze_cached(histories)
                 
-                # NEW: Check for position exits
-                check_position_exits()
+                alerts_queued, duplicates_skipped, errors = queue_alerts(tickers, results, last_alerts, now)
+                
+                # NEW: Check for position exits (the exit monitor covers this when enabled)
+                if not EXIT_MONITOR:
+                    with STAGE_SECONDS.time(stage='exits'):
+                        check_position_exits()
+                
+                record_scan(scan_start, scan_interval, tickers, histories, results)
+                if profiler:
+                    report_profile(profiler)
                 
                 # Clean cache
-                current_time = time.time()
-                analysis_cache = {k: v for k, v in analysis_cache.items() 
-                                if current_time - v[0] < cache_expiry}
+                analysis_cache.purge()
+                cache_stats = analysis_cache.stats()
                 
                 print(f"\n💤 Scan complete at {now.strftime('%H:%M')}")
-                print(f"   ✅ New alerts sent: {alerts_sent}")
+                print(f"   📨 New alerts queued: {alerts_queued} ({alert_queue.qsize()} still sending)")
                 print(f"   ⏭️  Duplicates skipped: {duplicates_skipped}")
                 print(f"   ❌ Errors: {errors}")
+                print(f"   🗃️  Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses / "
+                      f"{cache_stats['evictions']} evicted ({cache_stats['size']} entries)")
                 print(f"   ⏱️  Next scan in {interval_name}\n")
-                time.sleep(scan_interval)
+                wait_for_next_scan(scan_interval, tickers, last_alerts)
             
             else:
                 next_scan = "6:00 AM" if now.hour < 6 else "tomorrow 6:00 AM"
@@ -1116,6 +1185,162 @@ def scanner_loop():
             print(f"❌ Scanner error: {e}")
             time.sleep(60)
 
+# ==========================================
+# ASYNC SCANNER (SCANNER_MODE=async)
+# ==========================================
+async def attach_option_insights_async(data):
+    """attach_option_insights() run off the event loop"""
+    return await asyncio.to_thread(attach_option_insights, data)
+
+async def async_alert_sender(telegram, sends):
+    """Drain the async alert queue at Telegram's pace"""
+    while True:
+        data, alert_reason, last_alerts, scan_time = await sends.get()
+        try:
+            data = dict(data, alert_id=str(uuid.uuid4())[:8])
+            if await telegram.send(your_chat_id(), generate_alert_message(data)):
+                await asyncio.to_thread(record_alert, data, alert_reason, scan_time)
+            else:
+                last_alerts.pop(data['ticker'], None)
+        except Exception as e:
+            print(f"❌ Async sender error: {e}")
+        finally:
+            sends.task_done()
+
+async def async_queue_alerts(results, last_alerts, now, sends):
+    """
+    queue_alerts() for the async scanner - options are looked up for all
+    new alerts at once, then they go to the sender queue
+    
+    Returns:
+        (alerts_queued, duplicates_skipped)
+    """
+    queued = []
+    duplicates_skipped = 0
+    for ticker, data in results.items():
+        data = strict_signal(data)
+        if not data:
+            continue
+        alert_reason = decide_alert(ticker, data, last_alerts)
+        if alert_reason is None:
+            duplicates_skipped += 1
+            ALERTS.inc(result='duplicate')
+            continue
+        last_alerts[ticker] = {
+            'direction': data['direction'],
+            'score': data['score'],
+            'time': time.time()
+        }
+        queued.append((data, alert_reason))
+        ALERTS.inc(result='queued')
+    
+    # Options only for alerts that will actually be sent, all at once
+    with STAGE_SECONDS.time(stage='options'):
+        with_options = await asyncio.gather(*(attach_option_insights_async(data) for data, _ in queued))
+    
+    for data, (_, alert_reason) in zip(with_options, queued):
+        await sends.put((data, alert_reason, last_alerts, now))
+    return len(queued), duplicates_skipped
+
+async def async_intraday_pass(tickers, last_alerts, sends):
+    """intraday_pass() for the async scanner"""
+    now = datetime.now(pytz.timezone('US/Eastern'))
+    if not market_open(now):
+        return
+    
+    histories = await asyncio.to_thread(intraday_feed.refresh, tickers)
+    results = await asyncio.to_thread(analyze_cached, histories)
+    alerts_queued, duplicates_skipped = await async_queue_alerts(results, last_alerts, now, sends)
+    print(f"⚡ Intraday {INTRADAY_INTERVAL} update at {now.strftime('%H:%M')}: "
+          f"{len(histories)} tickers | 📨 {alerts_queued} queued | ⏭️  {duplicates_skipped} skipped")
+
+async def async_wait_for_next_scan(scan_interval, tickers, last_alerts, sends):
+    """wait_for_next_scan() for the async scanner - the sender keeps draining meanwhile"""
+    deadline = time.time() + scan_interval
+    
+    while intraday_feed and time.time() + INTRADAY_POLL < deadline:
+        await asyncio.sleep(INTRADAY_POLL)
+        try:
+            await async_intraday_pass(tickers, last_alerts, sends)
+        except Exception as e:
+            print(f"❌ Intraday error: {e}")
+    
+    await asyncio.sleep(max(0, deadline - time.time()))
+
+async def async_scanner_loop():
+    """
+    Same scan as scanner_loop(), on one event loop
+    
+    Chart downloads, options lookups and Telegram sends are concurrent
+    tasks; alerts go through an asyncio.Queue so the next scan never
+    waits for messages to drain. Stage/scan metrics, the profiler and
+    intraday passes between scans work as in threaded mode.
+    """
+    print("🚀 Scanner running in asyncio mode\n")
+    if intraday_feed:
+        print(f"⚡ Intraday: {INTRADAY_INTERVAL} bars every {INTRADAY_POLL // 60} min between scans\n")
+    
+    tz = pytz.timezone('US/Eastern')
+    current_day = datetime.now(tz).date()
+    last_alerts = {}
+    sends = asyncio.Queue()
+    
+    async with async_scanner.new_session() as session:
+        telegram = async_scanner.AsyncTelegram(session, api_token(), telegram_limiter)
+        sender = asyncio.create_task(async_alert_sender(telegram, sends))
+        try:
+            while True:
+                try:
+                    now = datetime.now(tz)
+                
+                    if now.date() != current_day:
+                        print(f"\n🌅 NEW TRADING DAY: {now.date().strftime('%Y-%m-%d')} - alert memory reset\n")
+                        last_alerts = {}
+                        current_day = now.date()
+                
+                    scan_interval, interval_name = scan_schedule(now)
+                
+                    if not scan_interval:
+                        await asyncio.sleep(600)
+                        continue
+                
+                    profiler = profile_switch.begin()
+                    scan_start = time.perf_counter()
+                    with STAGE_SECONDS.time(stage='tickers'):
+                        tickers = await asyncio.to_thread(get_scan_tickers)
+                    print(f"🔍 Scan at {now.strftime('%H:%M')} EST | {len(tickers)} tickers | Next: {interval_name}")
+                
+                    with STAGE_SECONDS.time(stage='history'):
+                        histories = await async_scanner.sync_bars(bar_store, session, tickers)
+                    universe.record_liquidity(histories)
+                    print(f"📥 History ready for {len(histories)}/{len(tickers)} tickers")
+                
+                    results = await asyncio.to_thread(analyze_cached, histories)
+                    analysis_cache.purge()
+                
+                    alerts_queued, duplicates_skipped = await async_queue_alerts(results, last_alerts, now, sends)
+                
+                    if not EXIT_MONITOR:
+                        with STAGE_SECONDS.time(stage='exits'):
+                            await asyncio.to_thread(check_position_exits)
+                
+                    record_scan(scan_start, scan_interval, tickers, histories, results)
+                    if profiler:
+                        report_profile(profiler)
+                
+                    print(f"\n💤 Scan complete at {datetime.now(tz).strftime('%H:%M')}")
+                    print(f"   📨 New alerts queued: {alerts_queued} ({sends.qsize()} still sending)")
+                    print(f"   ⏭️  Duplicates skipped: {duplicates_skipped}")
+                    print(f"   ⏱️  Next scan in {interval_name}\n")
+                    await async_wait_for_next_scan(scan_interval, tickers, last_alerts, sends)
+            
+                except Exception as e:
+                    print(f"❌ Async scanner error: {e}")
+                    await asyncio.sleep(60)
+        finally:
+            # Loop cancelled (shutdown) - stop the sender before the session closes
+            sender.cancel()
+
 # ==========================================
 # FLASK SERVER
 # ==========================================
@@ -1125,10 +1350,24 @@ def index():
 
 @app.route('/health')
 def health():
-    return {"status": "healthy", "version": "2.0", "features": ["signals", "position_tracking"]}
+    return {"status": "healthy", "version": "2.0", "features": ["signals", "position_tracking"],
+            "startup_seconds": metrics.STARTUP.value(), "sheets_ready": position_tracker.ready,
+            "sheets_connect_seconds": position_tracker.connect_seconds,
+            "last_scan_seconds": metrics.LAST_SCAN.value()}
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint (stage timings, scan duration, alert counters)"""
+    return flask.Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 def run_server():
     port = int(os.environ.get("PORT", 8080))
+    
+    startup = time.perf_counter() - STARTED
+    metrics.STARTUP.set(round(startup, 3))
+    flag = "✅" if startup <= STARTUP_TARGET_SECONDS else "⚠️ over target"
+    print(f"⏱️  Ready to serve /health in {startup:.2f}s ({flag} {STARTUP_TARGET_SECONDS:.1f}s)")
+    
     app.run(host='0.0.0.0', port=port)
 
 # ==========================================
@@ -1137,9 +1376,30 @@ def run_server():
 if __name__ == "__main__":
     print("\n🚀 Starting Ultimate Trading Bot v2.0...\n")
     
-    t_scan = threading.Thread(target=scanner_loop, daemon=True)
+    print("🔐 Loading credentials securely...")
+    api_token(), your_chat_id()
+    print("✅ All credentials loaded from environment\n")
+    
+    # Worker processes are forked before any thread exists
+    if COMPUTE_WORKERS > 0:
+        start_pool(COMPUTE_WORKERS)
+    
+    # Sheets handshake runs alongside everything else; the first caller that needs it waits
+    position_tracker.connect_in_background()
+    universe.start()
+    
+    if SCANNER_MODE == 'async':
+        t_scan = threading.Thread(target=lambda: asyncio.run(async_scanner_loop()), daemon=True)
+    else:
+        t_scan = threading.Thread(target=scanner_loop, daemon=True)
     t_scan.start()
     
+    t_alerts = threading.Thread(target=alert_dispatcher, name='alert-dispatcher', daemon=True)
+    t_alerts.start()
+    
+    if EXIT_MONITOR:
+        start_exit_monitor()
+    
     t_bot = threading.Thread(target=bot.infinity_polling, daemon=True)
     t_bot.start()
     
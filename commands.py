@@ -5,14 +5,13 @@ All Telegram bot command handlers in one place
 
 from datetime import datetime
 
-def register_commands(bot, position_tracker, YOUR_CHAT_ID):
+def register_commands(bot, position_tracker):
     """
     Register all bot commands
     
     Args:
         bot: Telebot instance
         position_tracker: PositionTracker instance
-        YOUR_CHAT_ID: Your Telegram chat ID
     """
     
     print("🔧 Registering command handlers...")
@@ -81,6 +80,7 @@ Example: `/close NVDA 982`
 /positions - See all open positions
 /stats - Trading statistics
 /performance - Bot vs You comparison
+/profile - Profile the next scan (admin chat)
 
 ━━━━━━━━━━━━━━━━━━━━━━━━
 💡 **EXAMPLES**
@@ -386,16 +386,14 @@ Need help? Type /help anytime!
     def show_performance(message):
         """Show performance comparison"""
         try:
-            bot_perf = position_tracker.sheets.bot_performance.get_all_records()
-            my_perf = position_tracker.sheets.my_performance.get_all_records()
+            # Running totals kept in memory - no sheet download
+            bot_latest = position_tracker.sheets.performance.latest('bot')
+            my_latest = position_tracker.sheets.performance.latest('my')
             
-            if not bot_perf and not my_perf:
+            if not bot_latest and not my_latest:
                 bot.reply_to(message, "📊 No performance data yet")
                 return
             
-            bot_latest = bot_perf[-1] if bot_perf else {}
-            my_latest = my_perf[-1] if my_perf else {}
-            
             msg = (
                 f"📊 **PERFORMANCE COMPARISON**\n\n"
                 f"🤖 **Bot (All Alerts):**\n"
@@ -15,6 +15,58 @@ except:
 # Google Sheets Configuration
 SHEET_ID = os.environ.get('SHEET_ID', '1ZiXVVJ5yGXKgbQJhHbLdiw2Z8DYSxKEfTHVwWJwVbhM')
 
+# Unsent Google Sheets writes survive restarts here
+SHEET_JOURNAL = os.environ.get('SHEET_JOURNAL', 'sheet_journal.jsonl')
+
+# Local price-history store (one binary file per ticker)
+BAR_STORE_DIR = os.environ.get('BAR_STORE_DIR', 'bar_store')
+
+# Yahoo Finance fetch pipeline
+FETCH_WORKERS = int(os.environ.get('FETCH_WORKERS', 8))   # download threads inside each 100-ticker batch
+YAHOO_REQUESTS_PER_SEC = float(os.environ.get('YAHOO_REQUESTS_PER_SEC', 5))
+
+# Scanner core: 'threads' (default) or 'async' (aiohttp + asyncio)
+SCANNER_MODE = os.environ.get('SCANNER_MODE', 'threads').lower()
+
+# Indicator compute stage: 0 = in-process incremental engine, N = N worker processes
+COMPUTE_WORKERS = int(os.environ.get('COMPUTE_WORKERS', 0))
+
+# Analysis cache (keyed on ticker + newest bar)
+ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', 4096))
+ANALYSIS_CACHE_TTL = int(os.environ.get('ANALYSIS_CACHE_TTL', 900))
+
+# Intraday mode: '' = off, or a bar size ('1m', '5m') polled between full scans
+INTRADAY_INTERVAL = os.environ.get('INTRADAY_INTERVAL', '')
+INTRADAY_POLL = int(os.environ.get('INTRADAY_POLL', 300))
+INTRADAY_RECORD = os.environ.get('INTRADAY_RECORD', '')  # CSV to record bars for replays
+
+# Exit monitor between scans: '' = off, 'poll' (batched quotes) or 'websocket' (price stream)
+EXIT_MONITOR = os.environ.get('EXIT_MONITOR', '').lower()
+EXIT_POLL_SECONDS = int(os.environ.get('EXIT_POLL_SECONDS', 15))
+
+# Sampling profiler for scan cycles: '' = off, 'once' (first scan) or 'always' (/profile also works)
+PROFILE_SCAN = os.environ.get('PROFILE_SCAN', '').lower()
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 5))
+PROFILE_TOP = int(os.environ.get('PROFILE_TOP', 25))
+
+# Startup budget: seconds from import to /health serving (a warning is printed when over)
+STARTUP_TARGET_SECONDS = float(os.environ.get('STARTUP_TARGET_SECONDS', 3))
+
+# Scan universes: comma-separated sp300 / sp500 / nasdaq100 / russell1000 / custom:A+B / file:path
+SCAN_UNIVERSES = os.environ.get('SCAN_UNIVERSES', 'sp300')
+UNIVERSE_CACHE = os.environ.get('UNIVERSE_CACHE', 'universe_cache.json')
+UNIVERSE_TTL = int(os.environ.get('UNIVERSE_TTL', 86400))      # index lists refreshed daily
+MOVERS_COUNT = int(os.environ.get('MOVERS_COUNT', 30))          # Yahoo most-active added to the scan
+MOVERS_REFRESH = int(os.environ.get('MOVERS_REFRESH', 900))     # seconds (0 = no movers)
+# Liquidity filter (off by default): 20-day average dollar volume and last close
+MIN_DOLLAR_VOLUME = float(os.environ.get('MIN_DOLLAR_VOLUME', 0))  # e.g. 20000000 (0 = off)
+MIN_PRICE = float(os.environ.get('MIN_PRICE', 0))                  # e.g. 5 (0 = off)
+LIQUIDITY_TTL = int(os.environ.get('LIQUIDITY_TTL', 86400))        # skipped names re-checked daily
+
+# Option expiry/chain cache lifetime (seconds)
+OPTIONS_CACHE_TTL = int(os.environ.get('OPTIONS_CACHE_TTL', 300))
+
 def get_google_creds():
     """Get Google credentials (local file or cloud env var)"""
     # Cloud: environment variable
@@ -0,0 +1,197 @@
+"""
+Exit Monitor - Event-driven stop/target checks between scans
+A pluggable quote source pushes price changes; only the triggers of
+tickers whose price changed are looked up (bisect in a TriggerIndex)
+
+Sources:
+    PollingQuoteSource  - batched Yahoo quotes every few seconds
+    WebSocketQuoteSource - Yahoo streaming prices (yfinance WebSocket)
+    ReplayQuoteSource   - recorded quotes from a CSV (offline tests)
+"""
+import threading
+import time
+
+import pandas as pd
+
+from lazy import lazy_import
+from market_data import fetch_quotes
+from trigger_index import TriggerIndex, position_key
+
+yf = lazy_import('yfinance')
+
+
+# ==========================================
+# QUOTE SOURCES
+# ==========================================
+# run(get_tickers, on_quotes, stop): call on_quotes({ticker: {'current', 'high', 'low'}})
+# with changed tickers only, until stop (a threading.Event) is set
+
+def _wait_any(events, timeout, step=0.5):
+    """Wait until one of events is set (True) or timeout passes (False)"""
+    deadline = time.monotonic() + timeout
+    while not any(e.is_set() for e in events):
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return False
+        events[0].wait(min(step, left))
+    return True
+
+
+class PollingQuoteSource:
+    def __init__(self, interval=15):
+        self.interval = interval
+
+    def run(self, get_tickers, on_quotes, stop):
+        last = {}
+        while not stop.is_set():
+            tickers = get_tickers()
+            if tickers:
+                try:
+                    quotes = fetch_quotes(tickers)
+                except Exception as e:
+                    print(f"❌ Quote poll error: {e}")
+                    quotes = {}
+                changed = {t: q for t, q in quotes.items() if last.get(t) != q}
+                last.update(changed)
+                if changed:
+                    on_quotes(changed)
+            stop.wait(self.interval)
+
+
+class WebSocketQuoteSource:
+    """Yahoo price stream - each tick is checked as both the high and the low"""
+
+    def __init__(self, resubscribe=30):
+        self.resubscribe = resubscribe
+
+    def run(self, get_tickers, on_quotes, stop):
+        delay = 1
+        while not stop.is_set():
+            ws = yf.WebSocket(verbose=False)
+            subscribed = set()
+            closed = threading.Event()  # this connection only - set before reconnecting
+
+            def sync_subscriptions():
+                while not (stop.is_set() or closed.is_set()):
+                    wanted = set(get_tickers())
+                    try:
+                        if wanted - subscribed:
+                            ws.subscribe(sorted(wanted - subscribed))
+                        if subscribed - wanted:
+                            ws.unsubscribe(sorted(subscribed - wanted))
+                    except Exception:
+                        break  # connection gone - listen() fails too and we reconnect
+                    subscribed.clear()
+                    subscribed.update(wanted)
+                    _wait_any((closed, stop), self.resubscribe)
+                ws.close()
+
+            def handle(message):
+                price = message.get('price')
+                if message.get('id') and price:
+                    on_quotes({message['id']: {'current': price, 'high': price, 'low': price}})
+
+            sync = threading.Thread(target=sync_subscriptions, name='ws-subscriptions', daemon=True)
+            sync.start()
+            try:
+                ws.listen(handle)
+                delay = 1
+            except Exception as e:
+                if stop.is_set():
+                    return
+                print(f"⚠️ Price stream dropped ({e}) - reconnecting in {delay}s")
+            finally:
+                # One subscription thread per connection - retire it before the next one
+                closed.set()
+                sync.join(timeout=10)
+            stop.wait(delay)
+            delay = min(delay * 2, 60)
+
+
+class ReplayQuoteSource:
+    """
+    Recorded quotes, one timestamp at a time
+
+    File format (CSV): Datetime, Ticker, Price [, High, Low]
+    """
+
+    def __init__(self, path, speed=0.0):
+        """
+        Args:
+            path: CSV of recorded quotes
+            speed: Seconds to sleep between timestamps (0 = as fast as possible)
+        """
+        self.quotes = pd.read_csv(path, parse_dates=['Datetime']).sort_values('Datetime')
+        self.speed = speed
+
+    def run(self, get_tickers, on_quotes, stop):
+        for _, group in self.quotes.groupby('Datetime', sort=True):
+            if stop.is_set():
+                return
+            wanted = set(get_tickers())
+            quotes = {}
+            for row in group.itertuples(index=False):
+                if row.Ticker in wanted:
+                    quotes[row.Ticker] = {
+                        'current': row.Price,
+                        'high': getattr(row, 'High', row.Price),
+                        'low': getattr(row, 'Low', row.Price)
+                    }
+            if quotes:
+                on_quotes(quotes)
+            if self.speed:
+                time.sleep(self.speed)
+
+
+# ==========================================
+# MONITOR
+# ==========================================
+class ExitMonitor:
+    def __init__(self, tracker, source, on_exits, refresh=30):
+        """
+        Args:
+            tracker: PositionTracker (positions come from its local store)
+            source: One of the quote sources above
+            on_exits: Callback given check_exits() results
+            refresh: Seconds between re-reads of the open positions
+        """
+        self.tracker = tracker
+        self.source = source
+        self.on_exits = on_exits
+        self.refresh = refresh
+
+        self.index = TriggerIndex()
+        self.loaded_at = 0.0
+        self.checks = 0
+        self._lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def _reload(self):
+        self.index.sync(self.tracker.sheets.get_open_positions())
+        self.loaded_at = time.monotonic()
+
+    def tickers(self):
+        """Tickers with open positions (re-read from the store every refresh seconds)"""
+        with self._lock:
+            if time.monotonic() - self.loaded_at >= self.refresh:
+                self._reload()
+            return self.index.tickers()
+
+    def on_quotes(self, quotes):
+        """Look up only the triggers crossed by this update"""
+        with self._lock:
+            exits = []
+            for ticker, quote in quotes.items():
+                self.checks += 1
+                for pos, is_stop, level in self.index.crossed(ticker, quote.get('high'), quote.get('low')):
+                    exits.append(self.tracker.make_exit(pos, is_stop, level))
+                    # Exited positions stop being watched straight away
+                    self.index.remove(position_key(pos))
+
+        if exits:
+            self.on_exits(exits)
+
+    def run(self):
+        """Blocking - run in its own thread"""
+        print(f"👁️  Exit monitor running ({type(self.source).__name__})")
+        self.source.run(self.tickers, self.on_quotes, self.stop)
@@ -0,0 +1,398 @@
+"""
+Indicators - Full-frame (pandas), lean (NumPy) and incremental (streaming) versions
+calculate_indicators() recomputes every row; lean_indicators() computes
+only the columns scoring reads into one compact array; IndicatorEngine
+keeps per-ticker state and only advances it by the bars added since last time
+"""
+import math
+import threading
+from array import array
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scoring import SCORE_COLUMNS
+
+NAN = float('nan')
+
+# Everything read after the indicator stage: scoring inputs + ATR (stops/targets)
+LEAN_COLUMNS = SCORE_COLUMNS + ['ATR']
+LEAN_INDEX = {c: i for i, c in enumerate(LEAN_COLUMNS)}
+
+# ==========================================
+# INDICATORS (PROVEN FROM SHARES BACKTEST)
+# ==========================================
+def calculate_indicators(df):
+    df['SMA50'] = df['Close'].rolling(50).mean()
+    df['SMA200'] = df['Close'].rolling(200).mean()
+    df['EMA20'] = df['Close'].ewm(span=20).mean()
+
+    delta = df['Close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = -delta.where(delta < 0, 0).rolling(14).mean()
+    df['RSI'] = 100 - (100 / (1 + gain / loss))
+
+    high_low = df['High'] - df['Low']
+    ranges = pd.concat([high_low, abs(df['High'] - df['Close'].shift()),
+                       abs(df['Low'] - df['Close'].shift())], axis=1)
+    df['ATR'] = np.max(ranges, axis=1).rolling(14).mean()
+
+    plus_dm = df['High'].diff()
+    minus_dm = -df['Low'].diff()
+    plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
+    minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
+
+    atr_safe = df['ATR'].replace(0, np.nan)
+    plus_di = 100 * (plus_dm.rolling(14).mean() / atr_safe)
+    minus_di = 100 * (minus_dm.rolling(14).mean() / atr_safe)
+    dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
+    df['ADX'] = dx.rolling(14).mean()
+    df['Plus_DI'] = plus_di
+    df['Minus_DI'] = minus_di
+
+    df['BB_Mid'] = df['Close'].rolling(20).mean()
+    df['BB_Std'] = df['Close'].rolling(20).std()
+    df['BB_Upper'] = df['BB_Mid'] + (df['BB_Std'] * 2)
+    df['BB_Lower'] = df['BB_Mid'] - (df['BB_Std'] * 2)
+    bb_range = (df['BB_Upper'] - df['BB_Lower']).replace(0, np.nan)
+    df['BB_Position'] = (df['Close'] - df['BB_Lower']) / bb_range
+
+    df['Vol_Avg'] = df['Volume'].rolling(20).mean()
+    df['Vol_Ratio'] = df['Volume'] / df['Vol_Avg']
+    df['ROC_5'] = ((df['Close'] - df['Close'].shift(5)) / df['Close'].shift(5)) * 100
+
+    return df
+
+# ==========================================
+# LEAN PATH (same formulas, no intermediate columns kept)
+# ==========================================
+def _rolling_mean(x, window):
+    """pandas rolling(window).mean() - NaN until window valid values"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).mean(axis=1)
+    return out
+
+
+def _rolling_std(x, window):
+    """pandas rolling(window).std() - exactly 0 for a window of equal values"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        windows = sliding_window_view(x, window)
+        std = windows.std(axis=1, ddof=1)
+        std[np.ptp(windows, axis=1) == 0] = 0.0
+        out[window - 1:] = std
+    return out
+
+
+def _shift(x, n=1):
+    out = np.full(len(x), np.nan)
+    out[n:] = x[:-n]
+    return out
+
+
+def lean_indicators(bars):
+    """
+    calculate_indicators() for just the LEAN_COLUMNS, as one compact array
+
+    Intermediates (BB_Mid/BB_Std/Vol_Avg, DI sums, ...) are locals that are
+    freed on return instead of DataFrame columns that stay alive.
+
+    Args:
+        bars: (n, 5) OHLCV array (or DataFrame with OHLCV columns)
+
+    Returns:
+        (n, len(LEAN_COLUMNS)) array - column i is LEAN_COLUMNS[i]
+    """
+    if isinstance(bars, pd.DataFrame):
+        bars = bars[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype='f8')
+    bars = np.asarray(bars, dtype='f8')
+    high, low, close, volume = bars[:, 1], bars[:, 2], bars[:, 3], bars[:, 4]
+    out = np.empty((len(bars), len(LEAN_COLUMNS)))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[:, LEAN_INDEX['Close']] = close
+        out[:, LEAN_INDEX['SMA50']] = _rolling_mean(close, 50)
+        out[:, LEAN_INDEX['SMA200']] = _rolling_mean(close, 200)
+        out[:, LEAN_INDEX['EMA20']] = pd.Series(close).ewm(span=20).mean().to_numpy()
+
+        prev_close = _shift(close)
+        delta = close - prev_close
+        gain = _rolling_mean(np.where(delta > 0, delta, 0.0), 14)
+        loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), 14)
+        out[:, LEAN_INDEX['RSI']] = 100 - (100 / (1 + gain / loss))
+
+        # fmax skips the NaN previous close on the first bar, like DataFrame.max
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        atr = _rolling_mean(tr, 14)
+        out[:, LEAN_INDEX['ATR']] = atr
+
+        up = high - _shift(high)
+        down = _shift(low) - low
+        plus = np.where((up > down) & (up > 0), up, 0.0)
+        minus = np.where((down > plus) & (down > 0), down, 0.0)
+        atr_safe = np.where(atr == 0, np.nan, atr)
+        plus_di = 100 * (_rolling_mean(plus, 14) / atr_safe)
+        minus_di = 100 * (_rolling_mean(minus, 14) / atr_safe)
+        dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
+        out[:, LEAN_INDEX['ADX']] = _rolling_mean(dx, 14)
+        out[:, LEAN_INDEX['Plus_DI']] = plus_di
+        out[:, LEAN_INDEX['Minus_DI']] = minus_di
+
+        bb_mid = _rolling_mean(close, 20)
+        bb_std = _rolling_std(close, 20)
+        bb_lower = bb_mid - bb_std * 2
+        bb_range = (bb_mid + bb_std * 2) - bb_lower
+        out[:, LEAN_INDEX['BB_Position']] = (close - bb_lower) / np.where(bb_range == 0, np.nan, bb_range)
+
+        out[:, LEAN_INDEX['Vol_Ratio']] = volume / _rolling_mean(volume, 20)
+        prior = _shift(close, 5)
+        out[:, LEAN_INDEX['ROC_5']] = ((close - prior) / prior) * 100
+
+    return out
+
+# ==========================================
+# INCREMENTAL ENGINE (same formulas, O(1) per bar)
+# ==========================================
+def _div(a, b):
+    """Float division with pandas/IEEE semantics (x/0 -> ±inf, 0/0 -> nan)"""
+    if b == 0:
+        if a != a or a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _Rolling:
+    """
+    Fixed window with running sum/sum-of-squares (min_periods = window, like pandas)
+
+    The window is a ring of raw doubles (8 bytes a value) rather than a
+    deque of float objects (~32) - this state is kept for every ticker.
+    """
+    __slots__ = ('size', 'values', 'head', 'count', 'total', 'total_sq', 'valid', 'last', 'same')
+
+    def __init__(self, size):
+        self.size = size
+        self.values = array('d', bytes(8 * size))
+        self.head = 0    # oldest value once the window is full
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.valid = 0
+        self.last = NAN
+        self.same = 0    # trailing run of values equal to last
+
+    def _with(self, x):
+        """Window totals after appending x (state untouched)"""
+        total, total_sq, valid = self.total, self.total_sq, self.valid
+        if x == x:
+            total += x
+            total_sq += x * x
+            valid += 1
+        if self.count == self.size:
+            old = self.values[self.head]
+            if old == old:
+                total -= old
+                total_sq -= old * old
+                valid -= 1
+        return total, total_sq, valid
+
+    def mean(self, x):
+        total, _, valid = self._with(x)
+        return total / valid if valid == self.size else NAN
+
+    def std(self, x):
+        total, total_sq, valid = self._with(x)
+        if valid != self.size:
+            return NAN
+        # A window of equal values is exactly 0 in pandas (the running sums leave ~1e-8)
+        if x == self.last and self.same + 1 >= self.size:
+            return 0.0
+        var = (total_sq - total * total / valid) / (valid - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def back(self, n):
+        """n-th most recent pushed value (NaN until n values were pushed)"""
+        if n > self.count:
+            return NAN
+        return self.values[(self.head - n) % self.size]
+
+    def push(self, x):
+        self.total, self.total_sq, self.valid = self._with(x)
+        self.same = self.same + 1 if x == self.last else 1
+        self.last = x
+        self.values[self.head] = x
+        self.head = (self.head + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+
+class _Ema:
+    """pandas ewm(span, adjust=True) as a weighted-sum recursion"""
+    __slots__ = ('decay', 'num', 'den')
+
+    def __init__(self, span):
+        self.decay = 1 - 2 / (span + 1)
+        self.num = 0.0
+        self.den = 0.0
+
+    def value(self, x):
+        return (x + self.decay * self.num) / (1 + self.decay * self.den)
+
+    def push(self, x):
+        self.num = x + self.decay * self.num
+        self.den = 1 + self.decay * self.den
+
+
+class IncrementalIndicators:
+    """Streaming state for one ticker - mirrors calculate_indicators() row by row"""
+
+    def __init__(self):
+        self.sma50 = _Rolling(50)
+        self.sma200 = _Rolling(200)
+        self.ema20 = _Ema(20)
+        self.gain = _Rolling(14)
+        self.loss = _Rolling(14)
+        self.tr = _Rolling(14)
+        self.plus_dm = _Rolling(14)
+        self.minus_dm = _Rolling(14)
+        self.dx = _Rolling(14)
+        self.bb = _Rolling(20)
+        self.vol = _Rolling(20)
+        self.prev = None  # (high, low, close) of last committed bar
+        self.last_ts = None
+        self.bars = 0
+
+    def update(self, bar, commit=True, ts=None):
+        """
+        Compute indicators for a new bar
+
+        Args:
+            bar: (open, high, low, close, volume)
+            commit: False evaluates a provisional (still-forming) bar
+                    without advancing the state
+            ts: Bar timestamp, remembered on commit
+
+        Returns:
+            Dict with the same keys as a calculate_indicators() row
+        """
+        o, h, l, c, v = bar
+
+        if self.prev is None:
+            delta = NAN
+            tr = h - l
+            up = down = NAN
+        else:
+            ph, pl, pc = self.prev
+            delta = c - pc
+            tr = max(h - l, abs(h - pc), abs(l - pc))
+            up = h - ph
+            down = pl - l
+
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        plus = up if (up > down and up > 0) else 0.0
+        minus = down if (down > plus and down > 0) else 0.0
+
+        avg_gain = self.gain.mean(gain)
+        avg_loss = self.loss.mean(loss)
+        rsi = 100 - _div(100, 1 + _div(avg_gain, avg_loss))
+
+        atr = self.tr.mean(tr)
+        atr_safe = NAN if atr == 0 else atr
+        plus_di = 100 * _div(self.plus_dm.mean(plus), atr_safe)
+        minus_di = 100 * _div(self.minus_dm.mean(minus), atr_safe)
+        dx = _div(abs(plus_di - minus_di), plus_di + minus_di) * 100
+        adx = self.dx.mean(dx)
+
+        bb_mid = self.bb.mean(c)
+        bb_std = self.bb.std(c)
+        bb_upper = bb_mid + bb_std * 2
+        bb_lower = bb_mid - bb_std * 2
+        bb_range = bb_upper - bb_lower
+        bb_position = _div(c - bb_lower, NAN if bb_range == 0 else bb_range)
+
+        vol_avg = self.vol.mean(v)
+        prior = self.sma50.back(5)  # close 5 bars ago (ROC_5)
+
+        row = {
+            'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v,
+            'SMA50': self.sma50.mean(c),
+            'SMA200': self.sma200.mean(c),
+            'EMA20': self.ema20.value(c),
+            'RSI': rsi,
+            'ATR': atr,
+            'ADX': adx,
+            'Plus_DI': plus_di,
+            'Minus_DI': minus_di,
+            'BB_Mid': bb_mid,
+            'BB_Std': bb_std,
+            'BB_Upper': bb_upper,
+            'BB_Lower': bb_lower,
+            'BB_Position': bb_position,
+            'Vol_Avg': vol_avg,
+            'Vol_Ratio': _div(v, vol_avg),
+            'ROC_5': _div(c - prior, prior) * 100
+        }
+
+        if commit:
+            self.sma50.push(c)
+            self.sma200.push(c)
+            self.ema20.push(c)
+            self.gain.push(gain)
+            self.loss.push(loss)
+            self.tr.push(tr)
+            self.plus_dm.push(plus)
+            self.minus_dm.push(minus)
+            self.dx.push(dx)
+            self.bb.push(c)
+            self.vol.push(v)
+            self.prev = (h, l, c)
+            self.last_ts = ts
+            self.bars += 1
+
+        return row
+
+
+class IndicatorEngine:
+    """
+    Per-ticker incremental indicators
+
+    All bars except the newest are committed into the state; the newest
+    one may still be forming, so it is evaluated without committing.
+    A ticker is re-seeded from scratch when its stored history no longer
+    lines up with the state (gap or re-adjusted prices).
+    """
+
+    def __init__(self):
+        self.states = {}
+        self._lock = threading.Lock()
+
+    def latest(self, ticker, df):
+        """Indicator values for the last row of df (same keys as calculate_indicators)"""
+        with self._lock:
+            bars = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype='f8')
+            index = df.index
+            state = self.states.get(ticker)
+            start = None
+
+            if state is not None and state.last_ts is not None and state.last_ts in index:
+                pos = index.get_loc(state.last_ts)
+                if isinstance(pos, int) and pos < len(index) - 1 and bars[pos][3] == state.prev[2]:
+                    start = pos + 1
+
+            if start is None:
+                state = IncrementalIndicators()
+                self.states[ticker] = state
+                start = 0
+
+            for i in range(start, len(bars) - 1):
+                state.update(bars[i], ts=index[i])
+
+            return state.update(bars[-1], commit=False)
+
+    def drop(self, ticker):
+        with self._lock:
+            self.states.pop(ticker, None)
@@ -0,0 +1,238 @@
+"""
+Intraday Mode - Live partial daily bar built from 1m/5m bars
+Today's intraday bars are aggregated into one forming daily bar and put
+after the stored (completed) daily history, so the IndicatorEngine only
+re-evaluates that last bar - no daily history is downloaded again
+
+Replay a recorded session offline:
+    python intraday.py --replay session_5m.csv --store bar_store
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore
+from market_data import fetch_history_batch, OHLCV_COLUMNS
+
+INTRADAY_INTERVALS = ('1m', '2m', '5m', '15m', '30m')
+
+
+# ==========================================
+# AGGREGATION
+# ==========================================
+def session_bar(bars):
+    """
+    Latest session's intraday bars -> one daily OHLCV bar
+
+    Args:
+        bars: Intraday DataFrame (tz-aware or exchange-local index)
+
+    Returns:
+        (session_date, [open, high, low, close, volume]) or None
+    """
+    bars = bars.dropna(subset=['Close'])
+    if bars.empty:
+        return None
+
+    index = bars.index.tz_localize(None) if bars.index.tz is not None else bars.index
+    days = index.normalize()
+    today = days[-1]
+    session = bars[days == today]
+
+    return today, [
+        float(session['Open'].iat[0]),
+        float(session['High'].max()),
+        float(session['Low'].min()),
+        float(session['Close'].iat[-1]),
+        float(session['Volume'].sum())
+    ]
+
+
+def with_partial_bar(daily, day, bar):
+    """Completed daily history + today's forming bar (replaces a stored bar for that day)"""
+    history = daily[daily.index < day]
+    partial = pd.DataFrame([bar], columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([day], name='Date'))
+    return pd.concat([history, partial])
+
+
+# ==========================================
+# BAR SOURCES
+# ==========================================
+class YahooIntradaySource:
+    """Today's intraday bars from Yahoo (one small request per ticker)"""
+
+    def __init__(self, interval='5m'):
+        self.interval = interval
+
+    def fetch(self, tickers):
+        return fetch_history_batch(tickers, period="1d", interval=self.interval)
+
+
+class ReplaySource:
+    """
+    Recorded intraday bars played back one bar per fetch()
+
+    File format (CSV): Ticker, Datetime, Open, High, Low, Close, Volume
+    """
+
+    def __init__(self, path):
+        bars = pd.read_csv(path, parse_dates=['Datetime'])
+        bars = bars.sort_values('Datetime')
+        self.frames = {t: g.set_index('Datetime')[OHLCV_COLUMNS]
+                       for t, g in bars.groupby('Ticker')}
+        self.clock = np.sort(bars['Datetime'].unique())
+        self.step = 0
+
+    def done(self):
+        return self.step >= len(self.clock)
+
+    def now(self):
+        return self.clock[min(self.step, len(self.clock)) - 1] if self.step else None
+
+    def fetch(self, tickers):
+        """Everything up to the next recorded timestamp"""
+        if self.done():
+            return {}
+        cutoff = self.clock[self.step]
+        self.step += 1
+
+        frames = {}
+        for ticker in tickers:
+            df = self.frames.get(ticker)
+            if df is None:
+                continue
+            df = df[df.index <= cutoff]
+            if not df.empty:
+                frames[ticker] = df
+        return frames
+
+
+def record_bars(frames, path):
+    """Append fetched intraday bars to a replay file"""
+    rows = []
+    for ticker, df in frames.items():
+        df = df[OHLCV_COLUMNS].copy()
+        if df.index.tz is not None:
+            df.index = df.index.tz_localize(None)
+        df.index.name = 'Datetime'
+        df.insert(0, 'Ticker', ticker)
+        rows.append(df.reset_index())
+
+    if rows:
+        out = pd.concat(rows, ignore_index=True)
+        out.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+
+# ==========================================
+# FEED
+# ==========================================
+class IntradayFeed:
+    def __init__(self, store, source, record_path=None):
+        """
+        Args:
+            store: BarStore with the completed daily history
+            source: Object with fetch(tickers) -> {ticker: intraday DataFrame}
+            record_path: Optional CSV every fetch is appended to (for replays)
+        """
+        self.store = store
+        self.source = source
+        self.record_path = record_path
+        self.daily = {}   # ticker -> ((session day, store file mtime), completed daily bars before it)
+
+    def _completed(self, ticker, day):
+        """
+        Stored daily bars before day - read from disk again only when the
+        session day changes or BarStore rewrites the file (e.g. re-adjusted
+        for a split or dividend mid-session)
+        """
+        try:
+            key = (day, os.stat(self.store.path(ticker)).st_mtime_ns)
+        except (OSError, ValueError):
+            return None
+
+        cached = self.daily.get(ticker)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        stored = self.store.load(ticker)
+        if stored is None:
+            return None
+        completed = stored[stored.index < day]
+        self.daily[ticker] = (key, completed)
+        return completed
+
+    def refresh(self, tickers):
+        """
+        Fetch the latest intraday bars
+
+        Returns:
+            {ticker: daily DataFrame ending in today's partial bar}
+        """
+        frames = self.source.fetch(tickers)
+        if self.record_path and frames:
+            record_bars(frames, self.record_path)
+
+        histories = {}
+        for ticker, bars in frames.items():
+            latest = session_bar(bars)
+            if latest is None:
+                continue
+            day, bar = latest
+            completed = self._completed(ticker, day)
+            if completed is None or completed.empty:
+                continue
+            histories[ticker] = with_partial_bar(completed, day, bar)
+
+        return histories
+
+
+# ==========================================
+# OFFLINE REPLAY
+# ==========================================
+def main():
+    from indicators import IndicatorEngine
+    from scoring import (SCORE_COLUMNS, score_universe, BULL_MIN, ADX_MIN, BEAR_MAX,
+                         BEAR_CONFIRMS)
+
+    parser = argparse.ArgumentParser(description="Replay recorded intraday bars through the scorer")
+    parser.add_argument('--replay', required=True, help="CSV written by record_bars()")
+    parser.add_argument('--store', default=None, help="Bar store directory")
+    parser.add_argument('--tickers', nargs='*', help="Subset of the recorded tickers")
+    args = parser.parse_args()
+
+    source = ReplaySource(args.replay)
+    feed = IntradayFeed(BarStore(args.store) if args.store else BarStore(), source)
+    engine = IndicatorEngine()
+    tickers = args.tickers or sorted(source.frames)
+    last = {}
+
+    print(f"⏯️  Replaying {len(source.clock)} bars for {len(tickers)} tickers")
+
+    while not source.done():
+        histories = feed.refresh(tickers)
+        rows = {t: engine.latest(t, df) for t, df in histories.items() if len(df) >= 250}
+        if not rows:
+            continue
+
+        names = list(rows)
+        values = np.array([[rows[t][c] for c in SCORE_COLUMNS] for t in names], dtype='f8')
+        bull, bear, confirms, _, _ = score_universe(values)
+        adx = values[:, SCORE_COLUMNS.index('ADX')]
+
+        for i, ticker in enumerate(names):
+            if bull[i] >= BULL_MIN and adx[i] > ADX_MIN:
+                state = 'BULL'
+            elif bear[i] <= BEAR_MAX and confirms[i] >= BEAR_CONFIRMS:
+                state = 'BEAR'
+            else:
+                state = 'NEUTRAL'
+            if last.get(ticker) != state:
+                print(f"  {pd.Timestamp(source.now()):%H:%M} {ticker}: {state} "
+                      f"(bull {bull[i]}, bear {bear[i]}, close {values[i][0]:.2f})")
+                last[ticker] = state
+
+
+if __name__ == "__main__":
+    main()
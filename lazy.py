@@ -0,0 +1,86 @@
+"""
+Lazy Imports - Heavy modules are imported on first attribute access
+Keeps `import claudeFinalStockMarketAgent` (and /health coming up) fast;
+yfinance, gspread and aiohttp load the first time they are actually used
+
+Usage:
+    yf = lazy_import('yfinance')
+    yf.Ticker('AAPL')          # yfinance is imported here
+
+    bot = LazyObject(lambda: telebot.TeleBot(token()), deferred=['message_handler'])
+    @bot.message_handler(commands=['help'])   # recorded, the bot isn't built yet
+    bot.send_message(chat_id, 'hi')           # built here, handlers replayed onto it
+"""
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Worker threads can hit the first use together - import once
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        module = self._module or self._load()
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """The module itself if it is already imported, else a LazyModule"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+class LazyObject:
+    """
+    Object built by factory() on first attribute access. Decorator factories
+    named in `deferred` (bot.message_handler, app.route) called before then
+    are recorded and replayed onto the object once it exists
+    """
+    def __init__(self, factory, deferred=()):
+        self._factory = factory
+        self._deferred = frozenset(deferred)
+        self._registrations = []
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._obj is None:
+                obj = self._factory()
+                for name, args, kwargs, func in self._registrations:
+                    getattr(obj, name)(*args, **kwargs)(func)
+                self._obj = obj
+        return self._obj
+
+    def _recorder(self, name):
+        def decorator(*args, **kwargs):
+            def register(func):
+                with self._lock:
+                    if self._obj is None:
+                        self._registrations.append((name, args, kwargs, func))
+                        return func
+                return getattr(self._obj, name)(*args, **kwargs)(func)
+            return register
+        return decorator
+
+    def __getattr__(self, attr):
+        if self._obj is None and attr in self._deferred:
+            return self._recorder(attr)
+        return getattr(self._obj or self._load(), attr)
+
+    def __repr__(self):
+        state = 'built' if self._obj is not None else 'not built'
+        return f"<lazy object ({state})>"
@@ -0,0 +1,165 @@
+"""
+Market Data - Batched, rate-limited Yahoo Finance downloads
+The ticker universe is pulled in grouped yf.download() calls of up to
+BATCH_SIZE symbols instead of one Ticker.history() round-trip each.
+Chunks run one at a time, because yf.download keeps its results in
+module-level state, and each chunk goes through one shared token bucket
+that backs off on 429s.
+"""
+import pandas as pd
+
+from config import FETCH_WORKERS, YAHOO_REQUESTS_PER_SEC
+from lazy import lazy_import
+from rate_limit import TokenBucket, is_rate_limit_error
+
+yf = lazy_import('yfinance')
+yf_data = lazy_import('yfinance.data')
+yf_shared = lazy_import('yfinance.shared')
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+BATCH_SIZE = 100  # tickers per grouped download
+QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+QUOTE_BATCH_SIZE = 100  # symbols per quote request
+
+# Shared by every Yahoo request in the process
+yahoo_limiter = TokenBucket(rate=YAHOO_REQUESTS_PER_SEC)
+
+
+def _split_download(raw, tickers):
+    """Split a grouped yf.download() frame into {ticker: DataFrame}"""
+    frames = {}
+
+    if raw is None or raw.empty:
+        return frames
+
+    if isinstance(raw.columns, pd.MultiIndex):
+        available = set(raw.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker not in available:
+                continue
+            df = raw[ticker][OHLCV_COLUMNS].dropna(how='all')
+            if not df.empty:
+                frames[ticker] = df
+    elif len(tickers) == 1:
+        df = raw[OHLCV_COLUMNS].dropna(how='all')
+        if not df.empty:
+            frames[tickers[0]] = df
+
+    return frames
+
+
+def download_chunk(chunk, period="2y", interval="1d", start=None, retries=3, threads=FETCH_WORKERS):
+    """
+    One grouped download, retrying the rate-limited tickers after a back-off
+
+    yf.download() reports per-ticker failures in yfinance.shared._ERRORS
+    instead of raising, so 429s are picked out of there.
+
+    Returns:
+        {ticker: DataFrame[Open, High, Low, Close, Volume]} - failed tickers are omitted
+    """
+    window = {'start': start} if start else {'period': period}
+    frames = {}
+
+    for attempt in range(retries + 1):
+        # A grouped call bursts one request per symbol - charge up to a full bucket
+        yahoo_limiter.acquire(len(chunk))
+        try:
+            raw = yf.download(chunk, interval=interval, group_by='ticker', auto_adjust=True,
+                              threads=threads, progress=False, **window)
+        except Exception as e:
+            if is_rate_limit_error(e) and attempt < retries:
+                yahoo_limiter.backoff()
+                continue
+            print(f"  ⚠️ Batch download failed ({len(chunk)} tickers): {e}")
+            return frames
+
+        frames.update(_split_download(raw, chunk))
+        errors = getattr(yf_shared, '_ERRORS', None) or {}
+        limited = [t for t in chunk if t not in frames and is_rate_limit_error(errors.get(t, ''))]
+        if limited and attempt < retries:
+            yahoo_limiter.backoff()
+            chunk = limited
+            continue
+
+        yahoo_limiter.success()
+        return frames
+
+    return frames
+
+
+def fetch_history_batch(tickers, period="2y", interval="1d", start=None, batch_size=BATCH_SIZE):
+    """
+    Download OHLCV for many tickers in grouped requests
+
+    Args:
+        tickers: List of symbols
+        period: Yahoo period string (ignored when start is given)
+        interval: Bar size ('1d', '5m', ...)
+        start: Optional start date for incremental downloads
+        batch_size: Tickers per grouped request
+
+    Returns:
+        {ticker: DataFrame[Open, High, Low, Close, Volume]} - failed tickers are omitted
+    """
+    tickers = list(dict.fromkeys(tickers))
+    frames = {}
+
+    for i in range(0, len(tickers), batch_size):
+        frames.update(download_chunk(tickers[i:i + batch_size], period, interval, start))
+
+    if yahoo_limiter.throttled:
+        print(f"  ⚠️ Yahoo rate limited {yahoo_limiter.throttled}x so far "
+              f"(now {yahoo_limiter.rate:.1f} req/s)")
+
+    return frames
+
+
+def fetch_quotes(tickers, batch_size=QUOTE_BATCH_SIZE):
+    """
+    Latest price + today's high/low for many tickers, one request per batch
+
+    Uses Yahoo's multi-symbol quote endpoint through yfinance's shared
+    (cookie/crumb-aware) session; falls back to 1-day history downloads
+    for any batch the endpoint refuses.
+
+    Returns:
+        {ticker: {'current': float, 'high': float, 'low': float}}
+    """
+    tickers = list(dict.fromkeys(tickers))
+    quotes = {}
+
+    for i in range(0, len(tickers), batch_size):
+        chunk = tickers[i:i + batch_size]
+        yahoo_limiter.acquire()
+        try:
+            payload = yf_data.YfData().get_raw_json(QUOTE_URL, params={
+                'symbols': ','.join(chunk), 'formatted': 'false'
+            })
+            results = (payload.get('quoteResponse') or {}).get('result') or []
+        except Exception as e:
+            if is_rate_limit_error(e):
+                yahoo_limiter.backoff()
+            results = None
+
+        if results is None:
+            for ticker, df in fetch_history_batch(chunk, period="1d").items():
+                quotes[ticker] = {
+                    'current': float(df['Close'].iloc[-1]),
+                    'high': float(df['High'].iloc[-1]),
+                    'low': float(df['Low'].iloc[-1])
+                }
+            continue
+
+        yahoo_limiter.success()
+        for q in results:
+            try:
+                quotes[q['symbol']] = {
+                    'current': float(q['regularMarketPrice']),
+                    'high': float(q['regularMarketDayHigh']),
+                    'low': float(q['regularMarketDayLow'])
+                }
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    return quotes
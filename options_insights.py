@@ -0,0 +1,114 @@
+"""
+Options Insights - Option chain lookups for alert messages (info only)
+Expiry lists and chains are cached per ticker for a few minutes, and
+lookups only happen for alerts that are actually going to be sent
+"""
+from datetime import datetime
+
+from cache import TTLCache, MISSING
+from config import OPTIONS_CACHE_TTL
+from lazy import lazy_import
+from market_data import yahoo_limiter
+
+yf = lazy_import('yfinance')
+
+expiry_cache = TTLCache(maxsize=512, ttl=OPTIONS_CACHE_TTL)  # ticker -> expiry dates
+chain_cache = TTLCache(maxsize=512, ttl=OPTIONS_CACHE_TTL)   # (ticker, expiry) -> chain
+
+
+def get_expiries(ticker):
+    """Listed expiry dates (cached)"""
+    exps = expiry_cache.get(ticker, MISSING)
+    if exps is MISSING:
+        yahoo_limiter.acquire()
+        exps = yf.Ticker(ticker).options
+        expiry_cache.set(ticker, exps)
+    return exps
+
+
+def get_chain(ticker, expiry):
+    """Option chain (calls + puts) for one expiry (cached)"""
+    key = (ticker, expiry)
+    chain = chain_cache.get(key, MISSING)
+    if chain is MISSING:
+        yahoo_limiter.acquire()
+        chain = yf.Ticker(ticker).option_chain(expiry)
+        chain_cache.set(key, chain)
+    return chain
+
+
+# ==========================================
+# OPTIONS INSIGHTS (NOT FOR EXECUTION, JUST INFO)
+# ==========================================
+def get_option_insights(ticker, direction, atr, current_price):
+    """Get options details for user information"""
+    try:
+        exps = get_expiries(ticker)
+        if not exps:
+            return None
+
+        today = datetime.now()
+        target_dte = 45
+        best_expiry = None
+
+        valid = {}
+        for e in exps:
+            try:
+                edate = datetime.strptime(e, "%Y-%m-%d")
+                days = (edate - today).days
+                if 30 <= days <= 60:
+                    valid[e] = abs(days - target_dte)
+            except:
+                pass
+
+        if not valid:
+            return None
+
+        best_expiry = min(valid, key=valid.get)
+        expiry_date = datetime.strptime(best_expiry, "%Y-%m-%d")
+        dte = (expiry_date - today).days
+
+        move = atr * 1.5
+        target_strike = current_price + move if direction == "CALL" else current_price - move
+
+        opt = get_chain(ticker, best_expiry)
+        chain = opt.calls if direction == "CALL" else opt.puts
+
+        chain = chain[(chain['openInterest'] > 50) | (chain['volume'] > 10)].copy()
+
+        if chain.empty:
+            return None
+
+        chain['diff'] = abs(chain['strike'] - target_strike)
+        best = chain.sort_values('diff').iloc[0]
+
+        spread = best['ask'] - best['bid']
+        spread_pct = (spread / best['lastPrice'] * 100) if best['lastPrice'] > 0 else 999
+
+        if spread_pct > 25:
+            return None
+
+        return {
+            "type": direction,
+            "strike": best['strike'],
+            "expiry": best_expiry,
+            "dte": dte,
+            "last_price": best['lastPrice'],
+            "bid": best['bid'],
+            "ask": best['ask'],
+            "volume": int(best['volume']),
+            "oi": int(best['openInterest']),
+            "spread_pct": spread_pct,
+            "contracts_1k": int(1000 / (best['lastPrice'] * 100)),
+            "contracts_2.5k": int(2500 / (best['lastPrice'] * 100))
+        }
+
+    except Exception as e:
+        return None
+
+
+def attach_option_insights(data):
+    """Copy of a BULL/BEAR signal with options_insight filled in"""
+    opt_type = "CALL" if data['direction'] == "BULL" else "PUT"
+    insight = get_option_insights(data['ticker'], opt_type, data['atr'], data['shares_trade']['price'])
+    return dict(data, options_insight=insight)
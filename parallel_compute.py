@@ -0,0 +1,136 @@
+"""
+Parallel Compute - Process-pool indicator stage for large universes
+Price arrays reach the workers through one memory-mapped file instead of
+pickled DataFrames; each worker runs the lean indicator path and sends
+back only the latest row
+
+Workers are forked. start_pool() forks them at startup, before the bot
+starts any threads, so no lock another thread holds can be inherited in
+a locked state. ProcessPoolExecutor forks all workers on the first
+submit and never re-forks on its own.
+"""
+import os
+import tempfile
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from indicators import lean_indicators, LEAN_COLUMNS
+from market_data import OHLCV_COLUMNS
+
+_pool = None
+_pool_workers = 0
+
+
+def _get_pool(workers):
+    """Long-lived worker pool (re-created only if the size changes)"""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        # fork: spawn/forkserver would re-import the bot's __main__ module
+        # (credentials, Telegram, Google Sheets) in every worker
+        _pool = ProcessPoolExecutor(max_workers=workers,
+                                    mp_context=multiprocessing.get_context('fork'))
+        _pool_workers = workers
+    return _pool
+
+
+def start_pool(workers):
+    """Fork the worker processes now (call before any thread is started)"""
+    pool = _get_pool(workers)
+    pool.submit(os.getpid).result()  # with fork, the first submit starts every worker
+    return pool
+
+
+def _reset_pool():
+    """
+    Forget a broken pool - the next scan forks a fresh one
+
+    That re-fork happens with threads running. It is acceptable because a
+    worker only runs _latest_rows (NumPy over a memory-mapped file) and
+    never takes a lock owned by the bot's threads. CPython re-initialises
+    its import lock in the child and glibc its malloc locks.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def _shared_dir():
+    """RAM-backed directory when available"""
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+def _latest_rows(path, total_rows, spans):
+    """Worker: latest lean indicator row for each (ticker, start, end) span"""
+    prices = np.memmap(path, dtype='f8', mode='r', shape=(total_rows, len(OHLCV_COLUMNS)))
+    rows = {}
+
+    for ticker, start, end in spans:
+        try:
+            latest = lean_indicators(prices[start:end])[-1]
+        except Exception:
+            continue
+        rows[ticker] = dict(zip(LEAN_COLUMNS, latest.tolist()))
+
+    del prices
+    return rows
+
+
+def compute_latest_rows(histories, workers, chunks_per_worker=4):
+    """
+    Indicators for many tickers across a process pool
+
+    Args:
+        histories: {ticker: DataFrame with OHLCV columns}
+        workers: Number of worker processes
+        chunks_per_worker: Tasks per worker (smaller tasks balance better)
+
+    Returns:
+        {ticker: {column: value}} - the LEAN_COLUMNS of the latest row,
+        or None if a worker died (the caller computes in-process instead)
+    """
+    histories = {t: df for t, df in histories.items() if len(df)}
+    if not histories:
+        return {}
+
+    total_rows = sum(len(df) for df in histories.values())
+    path = os.path.join(_shared_dir(), f"scan_prices_{uuid.uuid4().hex}.f8")
+
+    try:
+        prices = np.memmap(path, dtype='f8', mode='w+', shape=(total_rows, len(OHLCV_COLUMNS)))
+        spans = []
+        offset = 0
+        for ticker, df in histories.items():
+            end = offset + len(df)
+            prices[offset:end] = df[OHLCV_COLUMNS].to_numpy(dtype='f8')
+            spans.append((ticker, offset, end))
+            offset = end
+        prices.flush()
+        del prices
+
+        n_chunks = max(1, min(len(spans), workers * chunks_per_worker))
+        chunks = [spans[i::n_chunks] for i in range(n_chunks)]
+
+        try:
+            pool = _get_pool(workers)
+            futures = [pool.submit(_latest_rows, path, total_rows, chunk) for chunk in chunks]
+
+            rows = {}
+            for future in futures:
+                rows.update(future.result())
+            return rows
+        except BrokenProcessPool as e:
+            # A worker was killed (OOM, signal) - the executor is unusable from here on
+            print(f"⚠️ Compute pool broken ({e}) - computing in-process this scan")
+            _reset_pool()
+            return None
+
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,116 @@
+"""
+Performance Aggregator - Running daily P&L stats per sheet type
+Updated in O(1) as each exit is recorded; only the days that changed
+are written back to Bot_Performance / My_Performance
+"""
+import threading
+
+PERFORMANCE_HEADERS = ['Date', 'Total_Trades', 'Wins', 'Losses', 'Win_Rate%',
+                       'Gross_Profit', 'Gross_Loss', 'Net_PnL']
+
+
+def _new_day():
+    return {'trades': 0, 'wins': 0, 'losses': 0, 'gross_profit': 0.0, 'gross_loss': 0.0}
+
+
+class PerformanceAggregator:
+    def __init__(self):
+        self.days = {'bot': {}, 'my': {}}       # sheet_type -> {date: totals}
+        self.rows = {'bot': {}, 'my': {}}       # sheet_type -> {date: performance sheet row}
+        self.next_row = {'bot': 2, 'my': 2}
+        self.dirty = set()                      # (sheet_type, date) not yet written
+        self._lock = threading.Lock()
+
+    def load(self, sheet_type, closed_records, perf_dates):
+        """
+        Rebuild one sheet type's totals
+
+        Args:
+            sheet_type: 'bot' or 'my'
+            closed_records: Closed position records (Exit_Date, PnL_Dollar)
+            perf_dates: Column A of the performance sheet (header included)
+        """
+        with self._lock:
+            self.days[sheet_type] = {}
+            for record in closed_records:
+                try:
+                    pnl = float(record.get('PnL_Dollar'))
+                except (TypeError, ValueError):
+                    continue
+                self._add(sheet_type, str(record.get('Exit_Date', ''))[:10], pnl, 1)
+
+            self.rows[sheet_type] = {d: i + 1 for i, d in enumerate(perf_dates) if i > 0 and d}
+            self.next_row[sheet_type] = len(perf_dates) + 1
+
+    def confirm_rows(self, sheet_type, rows_at):
+        """Record where appended days really are - {date: row number}"""
+        with self._lock:
+            for date, row in rows_at.items():
+                if date in self.rows[sheet_type]:
+                    self.rows[sheet_type][date] = row
+            self.next_row[sheet_type] = max(self.next_row[sheet_type], max(rows_at.values()) + 1)
+
+    def _add(self, sheet_type, date, pnl, sign):
+        if not date:
+            return
+        day = self.days[sheet_type].setdefault(date, _new_day())
+        day['trades'] += sign
+        if pnl > 0:
+            day['wins'] += sign
+            day['gross_profit'] += sign * pnl
+        else:
+            day['losses'] += sign
+            day['gross_loss'] += sign * pnl
+        self.dirty.add((sheet_type, date))
+
+    def record_exit(self, sheet_type, exit_date, pnl_dollar, undo=False):
+        """
+        Count one closed position (undo=True removes an earlier count)
+
+        Args:
+            exit_date: 'YYYY-MM-DD HH:MM' (or just the date)
+            pnl_dollar: Realised P&L
+        """
+        with self._lock:
+            self._add(sheet_type, str(exit_date)[:10], float(pnl_dollar), -1 if undo else 1)
+
+    def row(self, sheet_type, date):
+        """Performance sheet row for one day (same format as before)"""
+        day = self.days[sheet_type].get(date, _new_day())
+        trades = day['trades']
+        return [
+            date, trades, day['wins'], day['losses'],
+            f"{day['wins']/trades*100:.1f}%" if trades else "0%",
+            f"${day['gross_profit']:.2f}", f"${day['gross_loss']:.2f}",
+            f"${day['gross_profit'] + day['gross_loss']:.2f}"
+        ]
+
+    def latest(self, sheet_type):
+        """Newest day as a performance-sheet record - {} if nothing closed yet"""
+        with self._lock:
+            dates = [d for d, day in self.days[sheet_type].items() if day['trades']]
+            if not dates:
+                return {}
+            return dict(zip(PERFORMANCE_HEADERS, self.row(sheet_type, max(dates))))
+
+    def drain(self):
+        """
+        Take the changed days
+
+        Returns:
+            updates: [(sheet_type, row_number, row)] for days already in the sheet
+            appends: {sheet_type: [row]} for new days (row numbers are reserved)
+        """
+        with self._lock:
+            updates = []
+            appends = {}
+            for sheet_type, date in sorted(self.dirty):
+                row = self.row(sheet_type, date)
+                if date in self.rows[sheet_type]:
+                    updates.append((sheet_type, self.rows[sheet_type][date], row))
+                elif self.days[sheet_type][date]['trades']:
+                    self.rows[sheet_type][date] = self.next_row[sheet_type]
+                    self.next_row[sheet_type] += 1
+                    appends.setdefault(sheet_type, []).append(row)
+            self.dirty.clear()
+            return updates, appends
@@ -0,0 +1,132 @@
+"""
+Position Store - In-memory copy of the Bot_Alerts / My_Trades worksheets
+Loaded once at startup, then kept in step with every write so position
+lookups never download the sheets again
+"""
+import threading
+
+POSITION_HEADERS = [
+    'ID', 'Entry_Date', 'Ticker', 'Direction', 'Type',
+    'Entry_Price', 'Stop', 'Target', 'Quantity',
+    'Strike', 'Expiry', 'Premium', 'Score', 'Status',
+    'Exit_Price', 'Exit_Date', 'Exit_Reason',
+    'PnL_Dollar', 'PnL_Percent', 'Days_Held', 'Reasons'
+]
+
+SHEET_TYPES = ('bot', 'my')
+
+
+class PositionStore:
+    def __init__(self):
+        # Per sheet type: ID -> record (record['_row'] is its worksheet row)
+        self.records = {s: {} for s in SHEET_TYPES}
+        # Per sheet type: ID -> record, OPEN positions only (insertion = sheet order)
+        self.open = {s: {} for s in SHEET_TYPES}
+        # Per sheet type: ticker -> [IDs of OPEN positions]
+        self.by_ticker = {s: {} for s in SHEET_TYPES}
+        # Row numbers of new rows are guessed from here and corrected by confirm_rows()
+        self.next_row = {s: 2 for s in SHEET_TYPES}
+        # Set when a write was dropped - the sheets must be re-read
+        self.stale = False
+        self._lock = threading.RLock()
+
+    def load(self, sheet_type, records):
+        """
+        Replace one sheet's contents
+
+        Args:
+            sheet_type: 'bot' or 'my'
+            records: worksheet.get_all_records() output (row 2 onwards)
+        """
+        with self._lock:
+            self.records[sheet_type] = {}
+            self.open[sheet_type] = {}
+            self.by_ticker[sheet_type] = {}
+            for i, record in enumerate(records):
+                self._index(sheet_type, dict(record), row=i + 2)
+            self.next_row[sheet_type] = len(records) + 2
+            self.stale = False
+
+    def _index(self, sheet_type, record, row):
+        record['_row'] = row
+        record['sheet_type'] = sheet_type
+        position_id = str(record.get('ID', ''))
+        if not position_id:
+            return
+        self.records[sheet_type][position_id] = record
+        if record.get('Status') == 'OPEN':
+            self.open[sheet_type][position_id] = record
+            self.by_ticker[sheet_type].setdefault(record.get('Ticker'), []).append(position_id)
+
+    def _unindex_open(self, sheet_type, position_id):
+        record = self.open[sheet_type].pop(position_id, None)
+        if record is None:
+            return
+        ids = self.by_ticker[sheet_type].get(record.get('Ticker'), [])
+        if position_id in ids:
+            ids.remove(position_id)
+        if not ids:
+            self.by_ticker[sheet_type].pop(record.get('Ticker'), None)
+
+    def add(self, sheet_type, row_values):
+        """Add a row appended to the worksheet - returns its row number"""
+        with self._lock:
+            row = self.next_row[sheet_type]
+            self.next_row[sheet_type] += 1
+            self._index(sheet_type, dict(zip(POSITION_HEADERS, row_values)), row)
+            return row
+
+    def confirm_rows(self, sheet_type, rows_at):
+        """
+        Record where rows really are in the worksheet
+
+        Args:
+            rows_at: {ID: row number} read back from the Sheets API
+        """
+        with self._lock:
+            for position_id, row in rows_at.items():
+                record = self.records[sheet_type].get(str(position_id))
+                if record is not None:
+                    record['_row'] = row
+            self.next_row[sheet_type] = max(self.next_row[sheet_type], max(rows_at.values()) + 1)
+
+    def get(self, position_id, sheet_type='bot'):
+        """Record for ID (a copy), or None"""
+        with self._lock:
+            record = self.records[sheet_type].get(str(position_id))
+            return dict(record) if record else None
+
+    def update(self, position_id, fields, sheet_type='bot'):
+        """
+        Apply column changes to a stored record
+
+        Returns:
+            Updated record (a copy), or None if the ID is unknown
+        """
+        position_id = str(position_id)
+        with self._lock:
+            record = self.records[sheet_type].get(position_id)
+            if record is None:
+                return None
+            was_open = record.get('Status') == 'OPEN'
+            record.update(fields)
+            if was_open and record.get('Status') != 'OPEN':
+                self._unindex_open(sheet_type, position_id)
+            return dict(record)
+
+    def open_positions(self, sheet_type='both'):
+        """OPEN positions (copies) - Bot_Alerts first, like the sheet reads"""
+        types = SHEET_TYPES if sheet_type == 'both' else (sheet_type,)
+        with self._lock:
+            return [dict(r) for s in types for r in self.open[s].values()]
+
+    def find_open_by_ticker(self, ticker, sheet_type='my'):
+        """First OPEN position for ticker (a copy), or None"""
+        with self._lock:
+            ids = self.by_ticker[sheet_type].get(ticker)
+            return dict(self.open[sheet_type][ids[0]]) if ids else None
+
+    def closed(self, sheet_type='bot'):
+        """All closed positions (copies)"""
+        with self._lock:
+            return [dict(r) for r in self.records[sheet_type].values() if r.get('Status') != 'OPEN']
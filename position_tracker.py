@@ -4,7 +4,17 @@ Handles both bot alerts and your manual trades
 """
 from sheets_handler import PositionSheet
 from datetime import datetime
+import threading
+import time
 import uuid
+import numpy as np
+
+def _to_float(value):
+    """Sheet cell -> float (blank/garbled cells become NaN and never trigger)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
 
 class PositionTracker:
     def __init__(self):
@@ -127,83 +137,68 @@ class PositionTracker:
         self.sheets.add_position(position, sheet_type='my')
         return position_id
     
-    def check_exits(self, current_prices):
+    def check_exits(self, current_prices, open_positions=None, verbose=True):
         """
         Check if any open positions hit stop/target
         Checks BOTH Bot_Alerts and My_Trades sheets
+        
+        Args:
+            current_prices: {ticker: {'current', 'high', 'low'}}
+            open_positions: Already-loaded positions (skips a second sheet read)
+            verbose: Print the per-check summary lines (hits are always printed)
         """
         exits = []
-        open_positions = self.sheets.get_open_positions(sheet_type='both')
+        if open_positions is None:
+            open_positions = self.sheets.get_open_positions(sheet_type='both')
         
         if not open_positions:
             return exits
         
-        print(f"\n🔍 Checking {len(open_positions)} open positions...")
+        if verbose:
+            print(f"\n🔍 Checking {len(open_positions)} open positions...")
         
-        for pos in open_positions:
-            ticker = pos['Ticker']
-            if ticker not in current_prices:
-                continue
-            
-            price = current_prices[ticker]
-            entry = float(pos['Entry_Price'])
-            stop = float(pos['Stop'])
-            target = float(pos['Target'])
-            
-            if pos['Direction'] == 'BULL':
-                if price['low'] <= stop:
-                    exits.append({
-                        'position': pos,
-                        'exit_price': stop,
-                        'exit_reason': 'STOP',
-                        'status': 'CLOSED_LOSS'
-                    })
-                    sheet_type = pos.get('sheet_type', 'bot')
-                    sheet_name = "Bot_Alerts" if sheet_type == 'bot' else "My_Trades"
-                    print(f"  🛑 {ticker} STOP hit: ${stop:.2f} ({sheet_name})")
-                
-                elif price['high'] >= target:
-                    exits.append({
-                        'position': pos,
-                        'exit_price': target,
-                        'exit_reason': 'TARGET',
-                        'status': 'CLOSED_PROFIT'
-                    })
-                    sheet_type = pos.get('sheet_type', 'bot')
-                    sheet_name = "Bot_Alerts" if sheet_type == 'bot' else "My_Trades"
-                    print(f"  🎯 {ticker} TARGET hit: ${target:.2f} ({sheet_name})")
-            
-            elif pos['Direction'] == 'BEAR':
-                if price['high'] >= stop:
-                    exits.append({
-                        'position': pos,
-                        'exit_price': stop,
-                        'exit_reason': 'STOP',
-                        'status': 'CLOSED_LOSS'
-                    })
-                    sheet_type = pos.get('sheet_type', 'bot')
-                    sheet_name = "Bot_Alerts" if sheet_type == 'bot' else "My_Trades"
-                    print(f"  🛑 {ticker} STOP hit: ${stop:.2f} ({sheet_name})")
-                
-                elif price['low'] <= target:
-                    exits.append({
-                        'position': pos,
-                        'exit_price': target,
-                        'exit_reason': 'TARGET',
-                        'status': 'CLOSED_PROFIT'
-                    })
-                    sheet_type = pos.get('sheet_type', 'bot')
-                    sheet_name = "Bot_Alerts" if sheet_type == 'bot' else "My_Trades"
-                    print(f"  🎯 {ticker} TARGET hit: ${target:.2f} ({sheet_name})")
-        
-        if not exits:
+        # One vectorized comparison over all positions (stop wins if both hit)
+        nan = float('nan')
+        prices = [current_prices.get(pos['Ticker'], {}) for pos in open_positions]
+        high = np.array([p.get('high', nan) for p in prices], dtype='f8')
+        low = np.array([p.get('low', nan) for p in prices], dtype='f8')
+        stop = np.array([_to_float(pos['Stop']) for pos in open_positions], dtype='f8')
+        target = np.array([_to_float(pos['Target']) for pos in open_positions], dtype='f8')
+        bull = np.array([pos['Direction'] == 'BULL' for pos in open_positions])
+        bear = np.array([pos['Direction'] == 'BEAR' for pos in open_positions])
+        
+        stop_hit = (bull & (low <= stop)) | (bear & (high >= stop))
+        target_hit = ~stop_hit & ((bull & (high >= target)) | (bear & (low <= target)))
+        
+        for i in np.flatnonzero(stop_hit | target_hit):
+            is_stop = bool(stop_hit[i])
+            exits.append(self.make_exit(open_positions[i], is_stop, stop[i] if is_stop else target[i]))
+        
+        if not exits and verbose:
             print("  ✓ All positions in range")
         
         return exits
     
+    def make_exit(self, pos, is_stop, level):
+        """Exit record for a position whose stop (or target) was hit"""
+        sheet_type = pos.get('sheet_type', 'bot')
+        sheet_name = "Bot_Alerts" if sheet_type == 'bot' else "My_Trades"
+        if is_stop:
+            print(f"  🛑 {pos['Ticker']} STOP hit: ${level:.2f} ({sheet_name})")
+        else:
+            print(f"  🎯 {pos['Ticker']} TARGET hit: ${level:.2f} ({sheet_name})")
+        
+        return {
+            'position': pos,
+            'exit_price': float(level),
+            'exit_reason': 'STOP' if is_stop else 'TARGET',
+            'status': 'CLOSED_LOSS' if is_stop else 'CLOSED_PROFIT'
+        }
+    
     def process_exits(self, exits):
         """Process exits and return alert data"""
         alerts = []
+        updates = []
         
         for exit in exits:
             pos = exit['position']
@@ -228,7 +223,7 @@ class PositionTracker:
                 'pnl_percent': pnl['percent']
             }
             
-            self.sheets.update_exit(pos['ID'], exit_data, sheet_type=sheet_type)
+            updates.append((pos['ID'], exit_data, sheet_type))
             
             # Alert data
             alerts.append({
@@ -244,9 +239,11 @@ class PositionTracker:
             })
         
         if exits:
-            # Update both performance sheets
-            self.sheets.update_performance(sheet_type='bot')
-            self.sheets.update_performance(sheet_type='my')
+            # All sheet rows in one batch
+            self.sheets.update_exits_batch(updates)
+            
+            # Changed days on both performance sheets
+            self.sheets.flush_performance()
         
         return alerts
     
@@ -304,7 +301,47 @@ class PositionTracker:
         success = self.sheets.update_exit(pos['ID'], exit_data, sheet_type=sheet_type)
         
         if success:
-            self.sheets.update_performance(sheet_type=sheet_type)
+            self.sheets.flush_performance()
             return pnl, None
         else:
-            return None, "Failed to update sheet"
\ No newline at end of file
+            return None, "Failed to update sheet"
+
+
+class LazyPositionTracker:
+    """
+    PositionTracker that connects to Google Sheets on first use
+    
+    connect_in_background() starts the connection at startup without
+    holding up anything else; the first caller that needs the sheets
+    waits for it. A failed connect is retried on the next use.
+    """
+    
+    def __init__(self):
+        self._tracker = None
+        self._lock = threading.Lock()
+        self.connect_seconds = None
+    
+    @property
+    def ready(self):
+        return self._tracker is not None
+    
+    def get(self):
+        if self._tracker is None:
+            with self._lock:
+                if self._tracker is None:
+                    start = time.perf_counter()
+                    self._tracker = PositionTracker()
+                    self.connect_seconds = round(time.perf_counter() - start, 3)
+        return self._tracker
+    
+    def connect_in_background(self):
+        def connect():
+            try:
+                self.get()
+            except Exception as e:
+                print(f"❌ Google Sheets connect failed (retried on first use): {e}")
+        
+        threading.Thread(target=connect, name='sheets-connect', daemon=True).start()
+    
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
@@ -0,0 +1,212 @@
+"""
+Profiler - Sampling profile of one scan cycle
+A background thread snapshots the scanning thread's stack every few ms
+(sys._current_frames - no tracing hooks, so the scan runs at full speed)
+and writes:
+    profiles/scan_YYYYmmdd_HHMMSS.collapsed  - flamegraph.pl / speedscope input
+    profiles/scan_YYYYmmdd_HHMMSS.txt        - top functions by self and total time
+
+Live: PROFILE_SCAN=once|always, or /profile in Telegram (next scan only)
+Offline (recorded or synthetic fixtures, no network):
+    python profiler.py --fixtures fixtures/
+    python profiler.py --synthetic 330 --warm
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from config import PROFILE_SCAN, PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_TOP
+
+
+def _frame_name(code):
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+
+
+class SamplingProfiler:
+    def __init__(self, interval=PROFILE_INTERVAL_MS / 1000, thread_id=None):
+        """
+        Args:
+            interval: Seconds between samples
+            thread_id: Thread to sample (default: the thread calling start())
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()   # root-first tuple of frame names -> samples
+        self.samples = 0
+        self.started = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._names = {}          # code object -> frame name
+
+    def _stack(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            name = self._names.get(code)
+            if name is None:
+                name = self._names[code] = _frame_name(code)
+            names.append(name)
+            frame = frame.f_back
+        return tuple(reversed(names))
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._stack(frame)] += 1
+                self.samples += 1
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name='scan-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def collapsed(self):
+        """Brendan Gregg collapsed-stack lines: 'root;caller;callee count'"""
+        return [f"{';'.join(stack)} {n}" for stack, n in self.stacks.most_common()]
+
+    def top(self, n=PROFILE_TOP):
+        """
+        Returns:
+            (by_self, by_total) - [(frame name, samples)] each, largest first
+        """
+        self_time = Counter()
+        total_time = Counter()
+        for stack, count in self.stacks.items():
+            self_time[stack[-1]] += count
+            # Recursive frames count once per sample
+            for name in set(stack):
+                total_time[name] += count
+        return self_time.most_common(n), total_time.most_common(n)
+
+    def summary(self, n=PROFILE_TOP):
+        by_self, by_total = self.top(n)
+        ms = self.elapsed / self.samples * 1000 if self.samples else 0
+        lines = [f"Scan profile: {self.elapsed:.2f}s wall, {self.samples} samples (~{ms:.1f} ms each)", ""]
+        for title, rows in (("SELF", by_self), ("TOTAL (incl. callees)", by_total)):
+            lines.append(f"Top {len(rows)} by {title}:")
+            for name, count in rows:
+                pct = count / self.samples * 100 if self.samples else 0
+                lines.append(f"  {pct:5.1f}%  {count * ms / 1000:7.2f}s  {name}")
+            lines.append("")
+        return '\n'.join(lines)
+
+    def write(self, directory=PROFILE_DIR, prefix='scan'):
+        """Write the .collapsed and .txt files - returns (collapsed_path, summary_path)"""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        with open(base + '.collapsed', 'w') as f:
+            f.write('\n'.join(self.collapsed()) + '\n')
+        with open(base + '.txt', 'w') as f:
+            f.write(self.summary())
+        return base + '.collapsed', base + '.txt'
+
+
+# ==========================================
+# SCAN SWITCH (env var / Telegram)
+# ==========================================
+class ProfileSwitch:
+    """Decides whether the next scan runs under the profiler"""
+
+    def __init__(self, mode=PROFILE_SCAN):
+        self.always = mode == 'always'
+        self.pending = mode in ('once', '1', 'true')
+        self.reply_to = None   # chat that asked with /profile
+        self._lock = threading.Lock()
+
+    def request(self, chat_id=None):
+        with self._lock:
+            self.pending = True
+            self.reply_to = chat_id
+
+    def begin(self):
+        """Started profiler for this scan, or None"""
+        with self._lock:
+            if not (self.always or self.pending):
+                return None
+            self.pending = False
+        return SamplingProfiler().start()
+
+    def end(self, profiler):
+        """
+        Stop and write the profile
+
+        Returns:
+            (summary text, collapsed path, chat to reply to or None)
+        """
+        profiler.stop()
+        collapsed_path, summary_path = profiler.write()
+        with self._lock:
+            chat_id, self.reply_to = self.reply_to, None
+        print(f"🔬 Scan profile written: {collapsed_path} / {summary_path}")
+        return profiler.summary(), collapsed_path, chat_id
+
+
+# ==========================================
+# OFFLINE
+# ==========================================
+def main():
+    import contextlib
+    import io
+    import tempfile
+
+    import benchmark
+
+    parser = argparse.ArgumentParser(description="Profile one scan iteration offline")
+    parser.add_argument('--fixtures', help="Recorded fixture directory (default: synthetic)")
+    parser.add_argument('--synthetic', type=int, default=330, help="Synthetic tickers")
+    parser.add_argument('--warm', action='store_true', help="Profile a +1 bar scan on a warm store")
+    parser.add_argument('--out', default=PROFILE_DIR)
+    parser.add_argument('--top', type=int, default=PROFILE_TOP)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        frames, options = benchmark.load_fixtures(os.path.abspath(args.fixtures))
+    else:
+        frames = benchmark.synthetic_bars(args.synthetic)
+        options = {t: benchmark.synthetic_options(float(df['Close'].iat[-1]), i)
+                   for i, (t, df) in enumerate(frames.items())}
+
+    out = os.path.abspath(args.out)
+    market = benchmark.FixtureMarket(frames, options)
+    agent, _ = benchmark.load_agent(market, tempfile.mkdtemp(prefix='profile_'))
+    last_alerts = {}
+
+    if args.warm:
+        market.visible = {t: len(df) - 1 for t, df in frames.items()}
+        with contextlib.redirect_stdout(io.StringIO()):
+            benchmark.scan_iteration(agent, last_alerts)
+        market.visible = {t: len(df) for t, df in frames.items()}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with SamplingProfiler() as profiler:
+            benchmark.scan_iteration(agent, last_alerts)
+
+    collapsed_path, summary_path = profiler.write(out)
+    print(profiler.summary(args.top))
+    print(f"💾 {collapsed_path}\n💾 {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
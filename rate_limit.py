@@ -0,0 +1,89 @@
+"""
+Rate Limiting - Shared token bucket for outbound API calls
+Adapts to HTTP 429s: halves the refill rate and pauses briefly on a hit,
+then creeps back toward the configured rate on every success
+"""
+import asyncio
+import threading
+import time
+
+
+def is_rate_limit_error(e):
+    """True for Yahoo/Telegram/Sheets 'too many requests' style errors"""
+    text = str(e)
+    return ('429' in text or 'Too Many Requests' in text or 'RATE_LIMIT' in text
+            or type(e).__name__ == 'YFRateLimitError')
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None, min_rate=None, recovery=0.05, pause=5.0):
+        """
+        Args:
+            rate: Target requests per second
+            capacity: Burst size (defaults to one second of requests)
+            min_rate: Floor the rate can be cut to after repeated 429s
+            recovery: Fraction of the target rate regained per success
+            pause: Seconds all callers wait after a 429
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 16
+        self.capacity = float(capacity) if capacity else max(1.0, self.max_rate)
+        self.recovery = recovery
+        self.pause = pause
+
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self, tokens):
+        """Take tokens if available - returns 0, or seconds to wait before retrying"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.resume_at:
+                return self.resume_at - now
+            self._refill(now)
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until tokens are available"""
+        tokens = min(tokens, self.capacity)
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """asyncio version of acquire() - yields to the event loop while waiting"""
+        tokens = min(tokens, self.capacity)
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def backoff(self):
+        """Called on a 429 - cut the rate in half and pause everyone"""
+        with self._lock:
+            now = time.monotonic()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.updated = now + self.pause
+            self.resume_at = now + self.pause
+            self.throttled += 1
+
+    def success(self):
+        """Called after a successful request - recover toward the target rate"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * self.recovery)
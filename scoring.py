@@ -0,0 +1,216 @@
+"""
+Scoring - Per-row and vectorized (whole universe) signal scores
+calculate_scores() scores one indicator row; score_universe() scores a
+tickers × SCORE_COLUMNS array in one NumPy pass with identical results
+"""
+import numpy as np
+
+# ==========================================
+# SCORING (PROVEN THRESHOLDS: 65/40/20)
+# ==========================================
+# Signal thresholds - the scanner, intraday replay and backtest defaults all use these
+BULL_MIN = 65        # bull score >= this ...
+ADX_MIN = 20         # ... and ADX > this
+BEAR_MAX = 40        # bear score <= this ...
+BEAR_CONFIRMS = 3    # ... with at least this many confirmations
+
+def calculate_scores(row):
+    """Returns bull_score, bear_score, bear_confirms, reasons"""
+    bull = 50
+    bull_reasons = []
+
+    # Trend
+    if row['Close'] > row['SMA50'] > row['SMA200']:
+        bull += 15
+        bull_reasons.append("Strong Uptrend")
+    elif row['Close'] > row['SMA50']:
+        bull += 10
+        bull_reasons.append("Above SMA50")
+    elif row['Close'] > row['EMA20']:
+        bull += 5
+
+    if row['ADX'] > 25:
+        bull += 10
+        bull_reasons.append(f"ADX Strong ({row['ADX']:.0f})")
+    elif row['ADX'] > 20:
+        bull += 5
+
+    if row['Plus_DI'] > row['Minus_DI'] + 5:
+        bull += 5
+        bull_reasons.append("Bullish Momentum")
+
+    # RSI
+    if row['RSI'] < 30:
+        bull += 20
+        bull_reasons.append(f"Oversold (RSI {row['RSI']:.0f})")
+    elif row['RSI'] < 40:
+        bull += 12
+        bull_reasons.append(f"RSI Favorable ({row['RSI']:.0f})")
+    elif row['RSI'] > 60:
+        bull -= 8
+
+    if row['ROC_5'] > 2:
+        bull += 5
+        bull_reasons.append("Positive Momentum")
+
+    # Bollinger
+    if row['BB_Position'] < 0.2:
+        bull += 10
+        bull_reasons.append("BB Oversold")
+    elif row['BB_Position'] < 0.4:
+        bull += 5
+
+    # Volume
+    if row['Vol_Ratio'] > 1.5:
+        bull += 8
+        bull_reasons.append(f"High Volume ({row['Vol_Ratio']:.1f}x)")
+    elif row['Vol_Ratio'] > 1.2:
+        bull += 4
+
+    # Bear
+    bear = 50
+    confirms = 0
+    bear_reasons = []
+
+    if row['Close'] < row['SMA50']:
+        bear -= 12
+        confirms += 1
+        bear_reasons.append("Below SMA50")
+
+    if row['ADX'] > 25:
+        bear -= 8
+        confirms += 1
+        bear_reasons.append(f"Strong Trend (ADX {row['ADX']:.0f})")
+
+    if row['Minus_DI'] > row['Plus_DI'] + 10:
+        bear -= 10
+        confirms += 1
+        bear_reasons.append("Bearish Momentum")
+
+    if row['RSI'] > 70:
+        bear -= 15
+        confirms += 1
+        bear_reasons.append(f"Overbought (RSI {row['RSI']:.0f})")
+
+    if row['BB_Position'] > 0.9:
+        bear -= 10
+        confirms += 1
+        bear_reasons.append("BB Overbought")
+
+    if row['Vol_Ratio'] > 2.0:
+        bear -= 12
+        confirms += 1
+        bear_reasons.append(f"High Volume ({row['Vol_Ratio']:.1f}x)")
+
+    if confirms < 3:
+        bear += 15
+
+    bull = max(0, min(100, bull))
+    bear = max(0, min(100, bear))
+
+    return bull, bear, confirms, bull_reasons, bear_reasons
+
+# ==========================================
+# VECTORIZED SCORING (same rules, all tickers at once)
+# ==========================================
+SCORE_COLUMNS = ['Close', 'SMA50', 'SMA200', 'EMA20', 'ADX', 'Plus_DI', 'Minus_DI',
+                 'RSI', 'ROC_5', 'BB_Position', 'Vol_Ratio']
+
+# Reason bit -> template, in the order calculate_scores() appends them
+BULL_REASONS = [
+    "Strong Uptrend",
+    "Above SMA50",
+    "ADX Strong ({ADX:.0f})",
+    "Bullish Momentum",
+    "Oversold (RSI {RSI:.0f})",
+    "RSI Favorable ({RSI:.0f})",
+    "Positive Momentum",
+    "BB Oversold",
+    "High Volume ({Vol_Ratio:.1f}x)",
+]
+
+BEAR_REASONS = [
+    "Below SMA50",
+    "Strong Trend (ADX {ADX:.0f})",
+    "Bearish Momentum",
+    "Overbought (RSI {RSI:.0f})",
+    "BB Overbought",
+    "High Volume ({Vol_Ratio:.1f}x)",
+]
+
+
+def _mask(flags):
+    """Pack a list of boolean arrays into one integer bitmask per ticker"""
+    mask = np.zeros(len(flags[0]), dtype=np.int64)
+    for bit, flag in enumerate(flags):
+        mask |= flag.astype(np.int64) << bit
+    return mask
+
+
+def score_universe(values):
+    """
+    Score every ticker in one pass
+
+    Args:
+        values: 2-D array, one row per ticker, columns in SCORE_COLUMNS order
+
+    Returns:
+        bull, bear, confirms, bull_mask, bear_mask (1-D arrays, one entry per ticker)
+    """
+    values = np.asarray(values, dtype='f8')
+    (close, sma50, sma200, ema20, adx, plus_di, minus_di,
+     rsi, roc, bb, vol) = values.T
+
+    # Bull
+    strong = (close > sma50) & (sma50 > sma200)
+    above = ~strong & (close > sma50)
+    above_ema = ~strong & ~above & (close > ema20)
+    adx_strong = adx > 25
+    adx_ok = ~adx_strong & (adx > 20)
+    momentum = plus_di > minus_di + 5
+    oversold = rsi < 30
+    favorable = ~oversold & (rsi < 40)
+    stretched = ~oversold & ~favorable & (rsi > 60)
+    positive = roc > 2
+    bb_low = bb < 0.2
+    bb_mid = ~bb_low & (bb < 0.4)
+    vol_high = vol > 1.5
+    vol_up = ~vol_high & (vol > 1.2)
+
+    bull = (50 + 15 * strong + 10 * above + 5 * above_ema
+            + 10 * adx_strong + 5 * adx_ok + 5 * momentum
+            + 20 * oversold + 12 * favorable - 8 * stretched
+            + 5 * positive + 10 * bb_low + 5 * bb_mid
+            + 8 * vol_high + 4 * vol_up)
+
+    bull_mask = _mask([strong, above, adx_strong, momentum, oversold,
+                       favorable, positive, bb_low, vol_high])
+
+    # Bear
+    bear_flags = [close < sma50, adx_strong, minus_di > plus_di + 10,
+                  rsi > 70, bb > 0.9, vol > 2.0]
+    confirms = np.sum(bear_flags, axis=0)
+
+    bear = (50 - 12 * bear_flags[0] - 8 * bear_flags[1] - 10 * bear_flags[2]
+            - 15 * bear_flags[3] - 10 * bear_flags[4] - 12 * bear_flags[5]
+            + 15 * (confirms < 3))
+
+    bear_mask = _mask(bear_flags)
+
+    bull = np.clip(bull, 0, 100).astype(np.int64)
+    bear = np.clip(bear, 0, 100).astype(np.int64)
+
+    return bull, bear, confirms.astype(np.int64), bull_mask, bear_mask
+
+
+def render_reasons(mask, row, templates):
+    """
+    Expand a reason bitmask into text (only called for tickers that alert)
+
+    Args:
+        mask: Bitmask from score_universe()
+        row: One row of the values array (SCORE_COLUMNS order)
+        templates: BULL_REASONS or BEAR_REASONS
+    """
+    fields = dict(zip(SCORE_COLUMNS, (float(x) for x in row)))
+    return [t.format(**fields) for bit, t in enumerate(templates) if int(mask) >> bit & 1]
@@ -0,0 +1,350 @@
+"""
+Sheet Writer - Background queue for every Google Sheets mutation
+Adjacent appends to the same worksheet are coalesced into one append_rows
+call, quota errors are retried with backoff, and unsent writes are kept in
+a local journal so they are replayed after a restart
+
+Appends are idempotent: each row is identified by its column A value
+(position ID / performance date), and a retried or replayed append skips
+rows already in the sheet. Where appends actually land is read back from
+the API response and reported, so stored row numbers never drift.
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+
+from config import SHEET_JOURNAL
+from metrics import STAGE_SECONDS
+from rate_limit import is_rate_limit_error
+
+MAX_BATCH = 500
+
+# op kind -> keys it must have (journal lines without them are skipped)
+OP_KEYS = {
+    'append': ('sheet', 'rows'),
+    'exits': ('data', 'formats'),
+    'values': ('data',),
+}
+
+FIRST_ROW_RE = re.compile(r'![A-Z]+(\d+)')
+
+
+def _json_default(value):
+    """numpy scalars -> plain Python values"""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def _first_row(response):
+    """First row an append landed on, from the API's updates.updatedRange"""
+    try:
+        match = FIRST_ROW_RE.search(response['updates']['updatedRange'])
+    except (TypeError, KeyError):
+        return None
+    return int(match.group(1)) if match else None
+
+
+def _with_row(range_str, row):
+    """"'Sheet'!N5:T5" -> same columns on another row"""
+    title, _, cells = range_str.rpartition('!')
+    return f"{title}!{re.sub(r'[0-9]+', str(row), cells)}"
+
+
+class SheetWriter:
+    def __init__(self, spreadsheet, journal_path=SHEET_JOURNAL, max_retries=5,
+                 base_delay=2.0, max_delay=60.0, on_rows=None, on_drop=None):
+        """
+        Args:
+            spreadsheet: gspread Spreadsheet the writes go to
+            journal_path: JSONL file holding writes not yet confirmed by Google
+            max_retries: Attempts for non-quota errors before a write is dropped
+            base_delay: First retry delay in seconds (doubles each attempt)
+            max_delay: Longest retry delay
+            on_rows: Called as on_rows(sheet_title, {column A value: row}) with the
+                     rows that appends (and relocated exits) really occupy
+            on_drop: Called as on_drop(op) when a write is given up on - the
+                     local copy no longer matches the sheet
+        """
+        self.spreadsheet = spreadsheet
+        self.journal_path = journal_path
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_rows = on_rows
+        self.on_drop = on_drop
+
+        self._queue = queue.Queue()
+        self._pending = []  # submitted, not yet sent (same order as the journal)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._worksheets = {}
+
+        self.sent = 0
+        self.calls = 0
+        self.retries = 0
+        self.dropped = 0
+
+        self.replayed = self._load_journal()
+        if self.replayed:
+            print(f"📒 Replaying {self.replayed} unsent sheet writes")
+
+        threading.Thread(target=self._run, name='sheet-writer', daemon=True).start()
+
+    # ========================================
+    # JOURNAL
+    # ========================================
+
+    def _load_journal(self):
+        """Queue writes left over from the last run"""
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        with open(self.journal_path) as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                keys = OP_KEYS.get(op.get('op')) if isinstance(op, dict) else None
+                if keys is None or any(k not in op for k in keys):
+                    print(f"  ⚠️ Skipping malformed journal entry: {line.strip()[:80]}")
+                    continue
+                # A crash mid-send may have left this append in the sheet already
+                if op['op'] == 'append':
+                    op['verify'] = True
+                self._pending.append(op)
+                self._queue.put(op)
+
+        return len(self._pending)
+
+    def _rewrite_journal(self):
+        """Journal = pending writes only (called with the lock held)"""
+        if not self._pending:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            return
+
+        tmp = self.journal_path + '.tmp'
+        with open(tmp, 'w') as f:
+            for op in self._pending:
+                f.write(json.dumps(op, default=_json_default) + '\n')
+        os.replace(tmp, self.journal_path)
+
+    # ========================================
+    # PUBLIC API
+    # ========================================
+
+    def submit(self, op):
+        """
+        Queue a write - returns immediately
+
+        Args:
+            op: {'op': 'append', 'sheet': title, 'rows': [[...]]}
+                    (column A of each row is its client ID - unique per sheet)
+                {'op': 'exits', 'data': [value ranges], 'formats': [requests],
+                 'checks': [{'sheet', 'id', 'row'}]}   (one check per value range)
+                {'op': 'values', 'data': [value ranges]}
+        """
+        line = json.dumps(op, default=_json_default)
+        op = json.loads(line)  # what is sent is exactly what would be replayed
+
+        # Queued under the same lock so queue order == pending/journal order
+        with self._lock:
+            self._pending.append(op)
+            with open(self.journal_path, 'a') as f:
+                f.write(line + '\n')
+            self._queue.put(op)
+
+    def flush(self, timeout=None):
+        """Block until every submitted write has been sent - returns True if drained"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'sent': self.sent,
+                'calls': self.calls,
+                'retries': self.retries,
+                'dropped': self.dropped
+            }
+
+    # ========================================
+    # WORKER
+    # ========================================
+
+    def _worksheet(self, title):
+        if title not in self._worksheets:
+            self._worksheets[title] = self.spreadsheet.worksheet(title)
+        return self._worksheets[title]
+
+    def _coalesce(self, ops):
+        """Merge adjacent ops of the same kind (order across kinds is kept)"""
+        merged = []
+        for op in ops:
+            last = merged[-1] if merged else None
+            if last and op['op'] == 'append' and last['op'] == 'append' and op['sheet'] == last['sheet']:
+                last['rows'] = last['rows'] + op['rows']
+                last['verify'] = last.get('verify') or op.get('verify')
+            elif last and op['op'] == 'values' and last['op'] == 'values':
+                last['data'] = last['data'] + op['data']
+            elif (last and op['op'] == 'exits' and last['op'] == 'exits'
+                  and bool(op.get('checks')) == bool(last.get('checks'))):
+                last['data'] = last['data'] + op['data']
+                last['formats'] = last['formats'] + op['formats']
+                if op.get('checks'):
+                    last['checks'] = last['checks'] + op['checks']
+            else:
+                merged.append(dict(op))
+        return merged
+
+    def _column_a(self, title):
+        """Column A of a worksheet (header included) as strings"""
+        return [str(v) for v in self._worksheet(title).col_values(1)]
+
+    def _append(self, op):
+        """Append rows not already in the sheet and report where they landed"""
+        rows = op['rows']
+        rows_at = {}
+
+        if op.get('verify'):
+            # A timed-out or replayed append may have been applied already
+            existing = {}
+            for i, key in enumerate(self._column_a(op['sheet'])):
+                existing.setdefault(key, i + 1)
+            rows_at = {str(r[0]): existing[str(r[0])] for r in rows if str(r[0]) in existing}
+            rows = [r for r in rows if str(r[0]) not in existing]
+            if rows_at:
+                print(f"  ↩️ {len(rows_at)} row(s) already in '{op['sheet']}' - not appended again")
+
+        if rows:
+            first = _first_row(self._worksheet(op['sheet']).append_rows(rows))
+            if first is not None:
+                rows_at.update({str(r[0]): first + i for i, r in enumerate(rows)})
+
+        if rows_at and self.on_rows:
+            self.on_rows(op['sheet'], rows_at)
+
+    def _locate_exits(self, op):
+        """
+        Check that each exit's row still holds its ID in column A; re-find
+        the row if it does not, drop the exit if the ID is not in the sheet
+
+        Returns:
+            (data, formats) to send - also stored back on op, so a retry
+            does not check (or drop) the same exits again
+        """
+        columns = {}
+        moved = {}
+        data, formats, checks = [], [], []
+
+        for value_range, fmt, check in zip(op['data'], op['formats'], op['checks']):
+            title, position_id, row = check['sheet'], str(check['id']), check['row']
+            if title not in columns:
+                columns[title] = self._column_a(title)
+            column = columns[title]
+
+            if not (0 < row <= len(column) and column[row - 1] == position_id):
+                if position_id not in column:
+                    print(f"  ❌ Exit for {position_id} not written - ID not in '{title}'")
+                    self._drop({'op': 'exits', 'data': [value_range]})
+                    continue
+                row = column.index(position_id) + 1
+                value_range = dict(value_range, range=_with_row(value_range['range'], row))
+                cells = fmt['repeatCell']['range']
+                cells['startRowIndex'], cells['endRowIndex'] = row - 1, row
+                moved.setdefault(title, {})[position_id] = row
+
+            data.append(value_range)
+            formats.append(fmt)
+            checks.append(dict(check, row=row))
+
+        op['data'], op['formats'], op['checks'] = data, formats, checks
+
+        if self.on_rows:
+            for title, rows_at in moved.items():
+                self.on_rows(title, rows_at)
+        return data, formats
+
+    def _send(self, op):
+        """One API round-trip (two for exits, plus a column A read to check rows)"""
+        if op['op'] == 'append':
+            self._append(op)
+
+        elif op['op'] == 'exits':
+            data, formats = op['data'], op['formats']
+            if op.get('checks'):  # journal entries from older versions have none
+                data, formats = self._locate_exits(op)
+            if data:
+                self.spreadsheet.values_batch_update({'valueInputOption': 'RAW', 'data': data})
+            if formats:
+                self.spreadsheet.batch_update({'requests': formats})
+
+        elif op['op'] == 'values':
+            self.spreadsheet.values_batch_update({'valueInputOption': 'RAW', 'data': op['data']})
+
+        else:
+            raise ValueError(f"unknown sheet op {op['op']!r}")
+
+    def _send_with_retry(self, op):
+        """Retry quota errors until they clear, other errors max_retries times"""
+        attempt = 0
+        while True:
+            try:
+                with STAGE_SECONDS.time(stage='sheet_write'):
+                    self._send(op)
+                self.calls += 1
+                return True
+            except Exception as e:
+                attempt += 1
+                # The failed request may still have been applied - check before re-appending
+                op['verify'] = True
+                quota = is_rate_limit_error(e)
+                if not quota and attempt >= self.max_retries:
+                    print(f"  ❌ Sheet write dropped ({op['op']}): {e}")
+                    return False
+
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                self.retries += 1
+                print(f"  ⚠️ Sheet write failed ({op['op']}{', quota' if quota else ''}) - retry in {delay:.0f}s")
+                time.sleep(delay)
+
+    def _drop(self, op):
+        """Count a write that was given up on and tell the owner its copy is stale"""
+        self.dropped += 1
+        if self.on_drop:
+            try:
+                self.on_drop(op)
+            except Exception as e:
+                print(f"  ⚠️ on_drop failed: {e}")
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                for op in self._coalesce(batch):
+                    if not self._send_with_retry(op):
+                        self._drop(op)
+            except Exception as e:
+                # Never let one bad op kill the worker - flush() would block forever
+                print(f"  ❌ Sheet writer error: {e}")
+                self._drop({'op': 'batch', 'size': len(batch)})
+            finally:
+                with self._idle:
+                    sent = {id(op) for op in batch}
+                    self._pending = [op for op in self._pending if id(op) not in sent]
+                    self.sent += len(batch)
+                    try:
+                        self._rewrite_journal()
+                    except OSError as e:
+                        print(f"  ⚠️ Sheet journal not rewritten: {e}")
+                    self._idle.notify_all()
@@ -3,10 +3,25 @@ Google Sheets Handler - Dual Tracking System
 Bot_Alerts: All bot signals (automatic)
 My_Trades: Only your actual entries (manual)
 """
-import gspread
-from google.oauth2.service_account import Credentials
+from concurrent.futures import ThreadPoolExecutor
 from config import get_google_creds, SHEET_ID
 from datetime import datetime
+from lazy import lazy_import
+from position_store import PositionStore, POSITION_HEADERS
+from sheet_writer import SheetWriter
+from performance import PerformanceAggregator, PERFORMANCE_HEADERS
+
+# Imported on first connect (slow imports, not needed until then)
+gspread = lazy_import('gspread')
+service_account = lazy_import('google.oauth2.service_account')
+
+# (attribute, title, header row, columns, header range)
+SHEET_LAYOUT = [
+    ('bot_alerts', 'Bot_Alerts', POSITION_HEADERS, 25, 'A1:U1'),
+    ('my_trades', 'My_Trades', POSITION_HEADERS, 25, 'A1:U1'),
+    ('bot_performance', 'Bot_Performance', PERFORMANCE_HEADERS, 10, 'A1:H1'),
+    ('my_performance', 'My_Performance', PERFORMANCE_HEADERS, 10, 'A1:H1'),
+]
 
 class PositionSheet:
     def __init__(self):
@@ -20,66 +35,51 @@ class PositionSheet:
             'https://www.googleapis.com/auth/drive'
         ]
         
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
+        creds = service_account.Credentials.from_service_account_info(creds_dict, scopes=scopes)
         self.gc = gspread.authorize(creds)
         self.sheet = self.gc.open_by_key(SHEET_ID)
         
         print(f"✅ Connected to: {self.sheet.title}\n")
         self.setup_sheets()
+        
+        # Local copy of the position sheets - all reads are served from here,
+        # writes go to the store immediately and to Google Sheets in the background
+        self.store = PositionStore()
+        self.performance = PerformanceAggregator()
+        
+        # All mutations go through the background writer
+        self.writer = SheetWriter(self.sheet, on_rows=self.rows_confirmed, on_drop=self.write_dropped)
+        if self.writer.replayed:
+            self.writer.flush()
+        
+        self.reload()
     
     def setup_sheets(self):
-        """Create all required sheets"""
-        headers = [
-            'ID', 'Entry_Date', 'Ticker', 'Direction', 'Type',
-            'Entry_Price', 'Stop', 'Target', 'Quantity',
-            'Strike', 'Expiry', 'Premium', 'Score', 'Status',
-            'Exit_Price', 'Exit_Date', 'Exit_Reason',
-            'PnL_Dollar', 'PnL_Percent', 'Days_Held', 'Reasons'
-        ]
+        """Find all required sheets with one listing request; create missing ones concurrently"""
+        existing = {ws.title: ws for ws in self.sheet.worksheets()}
+        missing = []
+        
+        for layout in SHEET_LAYOUT:
+            attr, title = layout[0], layout[1]
+            if title in existing:
+                setattr(self, attr, existing[title])
+                print(f"✓ Found '{title}' sheet")
+            else:
+                missing.append(layout)
         
-        # Bot Alerts sheet
-        try:
-            self.bot_alerts = self.sheet.worksheet('Bot_Alerts')
-            print("✓ Found 'Bot_Alerts' sheet")
-        except:
-            print("Creating 'Bot_Alerts' sheet...")
-            self.bot_alerts = self.sheet.add_worksheet(title='Bot_Alerts', rows=1000, cols=25)
-            self.bot_alerts.append_row(headers)
-            self.format_header(self.bot_alerts, 'A1:U1')
-        
-        # My Trades sheet
-        try:
-            self.my_trades = self.sheet.worksheet('My_Trades')
-            print("✓ Found 'My_Trades' sheet")
-        except:
-            print("Creating 'My_Trades' sheet...")
-            self.my_trades = self.sheet.add_worksheet(title='My_Trades', rows=1000, cols=25)
-            self.my_trades.append_row(headers)
-            self.format_header(self.my_trades, 'A1:U1')
-        
-        # Bot Performance sheet
-        try:
-            self.bot_performance = self.sheet.worksheet('Bot_Performance')
-            print("✓ Found 'Bot_Performance' sheet")
-        except:
-            print("Creating 'Bot_Performance' sheet...")
-            self.bot_performance = self.sheet.add_worksheet(title='Bot_Performance', rows=1000, cols=10)
-            perf_headers = ['Date', 'Total_Trades', 'Wins', 'Losses', 'Win_Rate%',
-                          'Gross_Profit', 'Gross_Loss', 'Net_PnL']
-            self.bot_performance.append_row(perf_headers)
-            self.format_header(self.bot_performance, 'A1:H1')
-        
-        # My Performance sheet
-        try:
-            self.my_performance = self.sheet.worksheet('My_Performance')
-            print("✓ Found 'My_Performance' sheet")
-        except:
-            print("Creating 'My_Performance' sheet...")
-            self.my_performance = self.sheet.add_worksheet(title='My_Performance', rows=1000, cols=10)
-            perf_headers = ['Date', 'Total_Trades', 'Wins', 'Losses', 'Win_Rate%',
-                          'Gross_Profit', 'Gross_Loss', 'Net_PnL']
-            self.my_performance.append_row(perf_headers)
-            self.format_header(self.my_performance, 'A1:H1')
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                for layout, worksheet in zip(missing, pool.map(self.create_sheet, missing)):
+                    setattr(self, layout[0], worksheet)
+    
+    def create_sheet(self, layout):
+        """Add one sheet with its formatted header row"""
+        _, title, headers, cols, header_range = layout
+        print(f"Creating '{title}' sheet...")
+        worksheet = self.sheet.add_worksheet(title=title, rows=1000, cols=cols)
+        worksheet.append_row(headers)
+        self.format_header(worksheet, header_range)
+        return worksheet
     
     def format_header(self, worksheet, range_str):
         """Format header row"""
@@ -89,6 +89,48 @@ class PositionSheet:
             'textFormat': {'foregroundColor': {'red': 1, 'green': 1, 'blue': 1}}
         })
     
+    def reload(self):
+        """Re-read Bot_Alerts and My_Trades into the local store"""
+        # Four independent reads - issued together
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            bot_records = pool.submit(self.bot_alerts.get_all_records)
+            my_records = pool.submit(self.my_trades.get_all_records)
+            bot_dates = pool.submit(self.bot_performance.col_values, 1)
+            my_dates = pool.submit(self.my_performance.col_values, 1)
+        
+        self.store.load('bot', bot_records.result())
+        self.store.load('my', my_records.result())
+        
+        # Daily totals are rebuilt from the closed positions already in memory
+        self.performance.load('bot', self.store.closed('bot'), bot_dates.result())
+        self.performance.load('my', self.store.closed('my'), my_dates.result())
+        self.performance.dirty.clear()
+        print(f"📦 Position store loaded: {len(self.store.open_positions())} open")
+    
+    def flush(self):
+        """Block until all queued writes have been sent"""
+        self.writer.flush()
+    
+    def rows_confirmed(self, title, rows_at):
+        """Writer callback - rows as they really landed in a sheet"""
+        position_sheets = {self.bot_alerts.title: 'bot', self.my_trades.title: 'my'}
+        perf_sheets = {self.bot_performance.title: 'bot', self.my_performance.title: 'my'}
+        if title in position_sheets:
+            self.store.confirm_rows(position_sheets[title], rows_at)
+        elif title in perf_sheets:
+            self.performance.confirm_rows(perf_sheets[title], rows_at)
+    
+    def write_dropped(self, op):
+        """Writer callback - a write was given up on, so the local copy is wrong"""
+        self.store.stale = True
+        print(f"  ⚠️ Sheet write dropped ({op['op']}) - positions will be re-read")
+    
+    def reload_if_stale(self):
+        """Re-read the sheets after a dropped write (queued writes are sent first)"""
+        if self.store.stale:
+            self.flush()
+            self.reload()
+    
     def add_position(self, pos, sheet_type='bot'):
         """Add position to specified sheet"""
         row = [
@@ -99,117 +141,135 @@ class PositionSheet:
             '', '', '', '', '', '', pos.get('reasons', '')
         ]
         
+        self.store.add(sheet_type, row)
+        
+        worksheet = self.bot_alerts if sheet_type == 'bot' else self.my_trades
+        self.writer.submit({'op': 'append', 'sheet': worksheet.title, 'rows': [row]})
+        
         if sheet_type == 'bot':
-            self.bot_alerts.append_row(row)
             print(f"  📝 Bot tracked: {pos['ticker']} {pos['direction']}")
         else:
-            self.my_trades.append_row(row)
             print(f"  📝 Your trade tracked: {pos['ticker']} {pos['direction']}")
     
     def get_open_positions(self, sheet_type='both'):
         """Get open positions from specified sheet(s)"""
-        positions = []
-        
-        if sheet_type in ['bot', 'both']:
-            bot_records = self.bot_alerts.get_all_records()
-            bot_open = [r for r in bot_records if r.get('Status') == 'OPEN']
-            for pos in bot_open:
-                pos['sheet_type'] = 'bot'
-            positions.extend(bot_open)
-        
-        if sheet_type in ['my', 'both']:
-            my_records = self.my_trades.get_all_records()
-            my_open = [r for r in my_records if r.get('Status') == 'OPEN']
-            for pos in my_open:
-                pos['sheet_type'] = 'my'
-            positions.extend(my_open)
-        
-        return positions
+        self.reload_if_stale()
+        return self.store.open_positions(sheet_type)
     
     def update_exit(self, position_id, exit_data, sheet_type='bot'):
         """Update position with exit info"""
-        try:
-            worksheet = self.bot_alerts if sheet_type == 'bot' else self.my_trades
-            
-            cell = worksheet.find(position_id)
-            row = cell.row
-            
-            # Calculate days held
-            entry_date = worksheet.cell(row, 2).value
-            try:
-                entry = datetime.strptime(entry_date, '%Y-%m-%d %H:%M')
-                exit_dt = datetime.strptime(exit_data['exit_date'], '%Y-%m-%d %H:%M')
-                days = (exit_dt - entry).days
-            except:
-                days = 0
-            
-            # Update columns
-            worksheet.update(f'N{row}', exit_data['status'])
-            worksheet.update(f'O{row}', exit_data['exit_price'])
-            worksheet.update(f'P{row}', exit_data['exit_date'])
-            worksheet.update(f'Q{row}', exit_data['exit_reason'])
-            worksheet.update(f'R{row}', exit_data['pnl_dollar'])
-            worksheet.update(f'S{row}', exit_data['pnl_percent'])
-            worksheet.update(f'T{row}', days)
-            
-            # Color code
-            if exit_data['pnl_dollar'] > 0:
-                bg = {'red': 0.85, 'green': 0.95, 'blue': 0.85}
-            else:
-                bg = {'red': 0.95, 'green': 0.85, 'blue': 0.85}
-            worksheet.format(f'A{row}:U{row}', {'backgroundColor': bg})
-            
-            sheet_name = "Bot_Alerts" if sheet_type == 'bot' else "My_Trades"
-            print(f"  ✅ Closed in {sheet_name}: {position_id}")
-            return True
-        except Exception as e:
-            print(f"  ❌ Error updating: {e}")
-            return False
+        return self.update_exits_batch([(position_id, exit_data, sheet_type)])[0]
     
-    def find_position_by_ticker(self, ticker, sheet_type='my'):
-        """Find open position by ticker"""
-        try:
-            worksheet = self.bot_alerts if sheet_type == 'bot' else self.my_trades
-            all_records = worksheet.get_all_records()
-            
-            for record in all_records:
-                if record['Ticker'] == ticker and record['Status'] == 'OPEN':
-                    return record
-            
-            return None
-        except:
-            return None
-    
-    def update_performance(self, sheet_type='bot'):
-        """Update daily performance stats"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        worksheet = self.bot_alerts if sheet_type == 'bot' else self.my_trades
-        perf_sheet = self.bot_performance if sheet_type == 'bot' else self.my_performance
+    def update_exits_batch(self, exits):
+        """
+        Record many exits with one values request and one format request
         
-        all_records = worksheet.get_all_records()
+        Args:
+            exits: [(position_id, exit_data, sheet_type)]
         
-        today_closed = [r for r in all_records 
-                       if r.get('Exit_Date', '').startswith(today) and r.get('Status') != 'OPEN']
+        Returns:
+            [bool] - one success flag per exit
+        """
+        results = []
+        value_ranges = []
+        format_requests = []
+        checks = []
         
-        if not today_closed:
-            return
+        for position_id, exit_data, sheet_type in exits:
+            try:
+                worksheet = self.bot_alerts if sheet_type == 'bot' else self.my_trades
+                
+                # Row comes from the store's ID index - no worksheet.find()
+                record = self.store.get(position_id, sheet_type)
+                if record is None:
+                    print(f"  ❌ Error updating: {position_id} not found")
+                    results.append(False)
+                    continue
+                row = record['_row']
+                
+                # Re-closing a position replaces its earlier P&L in the daily totals
+                if record.get('Status') != 'OPEN' and record.get('Exit_Date'):
+                    try:
+                        self.performance.record_exit(sheet_type, record['Exit_Date'],
+                                                     record['PnL_Dollar'], undo=True)
+                    except (TypeError, ValueError):
+                        pass
+                
+                # Calculate days held
+                entry_date = record.get('Entry_Date')
+                try:
+                    entry = datetime.strptime(entry_date, '%Y-%m-%d %H:%M')
+                    exit_dt = datetime.strptime(exit_data['exit_date'], '%Y-%m-%d %H:%M')
+                    days = (exit_dt - entry).days
+                except:
+                    days = 0
+                
+                self.store.update(position_id, {
+                    'Status': exit_data['status'],
+                    'Exit_Price': exit_data['exit_price'],
+                    'Exit_Date': exit_data['exit_date'],
+                    'Exit_Reason': exit_data['exit_reason'],
+                    'PnL_Dollar': exit_data['pnl_dollar'],
+                    'PnL_Percent': exit_data['pnl_percent'],
+                    'Days_Held': days
+                }, sheet_type)
+                self.performance.record_exit(sheet_type, exit_data['exit_date'], exit_data['pnl_dollar'])
+                
+                # Color code
+                if exit_data['pnl_dollar'] > 0:
+                    bg = {'red': 0.85, 'green': 0.95, 'blue': 0.85}
+                else:
+                    bg = {'red': 0.95, 'green': 0.85, 'blue': 0.85}
+                
+                # Columns N:T
+                value_ranges.append({
+                    'range': f"'{worksheet.title}'!N{row}:T{row}",
+                    'values': [[exit_data['status'], exit_data['exit_price'], exit_data['exit_date'],
+                                exit_data['exit_reason'], exit_data['pnl_dollar'],
+                                exit_data['pnl_percent'], days]]
+                })
+                # Row colour A:U
+                format_requests.append({
+                    'repeatCell': {
+                        'range': {
+                            'sheetId': worksheet.id,
+                            'startRowIndex': row - 1, 'endRowIndex': row,
+                            'startColumnIndex': 0, 'endColumnIndex': len(POSITION_HEADERS)
+                        },
+                        'cell': {'userEnteredFormat': {'backgroundColor': bg}},
+                        'fields': 'userEnteredFormat.backgroundColor'
+                    }
+                })
+                # The writer checks column A still holds this ID before writing
+                checks.append({'sheet': worksheet.title, 'id': str(position_id), 'row': row})
+                
+                sheet_name = "Bot_Alerts" if sheet_type == 'bot' else "My_Trades"
+                print(f"  ✅ Closed in {sheet_name}: {position_id}")
+                results.append(True)
+            except Exception as e:
+                print(f"  ❌ Error updating: {e}")
+                results.append(False)
         
-        wins = [r for r in today_closed if r.get('PnL_Dollar', 0) > 0]
-        losses = [r for r in today_closed if r.get('PnL_Dollar', 0) <= 0]
+        if value_ranges:
+            self.writer.submit({'op': 'exits', 'data': value_ranges, 'formats': format_requests,
+                                'checks': checks})
         
-        gross_profit = sum(r.get('PnL_Dollar', 0) for r in wins)
-        gross_loss = sum(r.get('PnL_Dollar', 0) for r in losses)
+        return results
+    
+    def find_position_by_ticker(self, ticker, sheet_type='my'):
+        """Find open position by ticker"""
+        return self.store.find_open_by_ticker(ticker, sheet_type)
+    
+    def flush_performance(self):
+        """Write every changed day to Bot_Performance / My_Performance"""
+        updates, appends = self.performance.drain()
+        perf_sheets = {'bot': self.bot_performance, 'my': self.my_performance}
         
-        row = [
-            today, len(today_closed), len(wins), len(losses),
-            f"{len(wins)/len(today_closed)*100:.1f}%" if today_closed else "0%",
-            f"${gross_profit:.2f}", f"${gross_loss:.2f}",
-            f"${gross_profit + gross_loss:.2f}"
-        ]
+        if updates:
+            self.writer.submit({'op': 'values', 'data': [
+                {'range': f"'{perf_sheets[sheet_type].title}'!A{row_num}:H{row_num}", 'values': [row]}
+                for sheet_type, row_num, row in updates
+            ]})
         
-        dates = perf_sheet.col_values(1)
-        if today in dates:
-            row_num = dates.index(today) + 1
-            perf_sheet.update(f'A{row_num}:H{row_num}', [row])
-        else:
-            perf_sheet.append_row(row)
\ No newline at end of file
+        for sheet_type, rows in appends.items():
+            self.writer.submit({'op': 'append', 'sheet': perf_sheets[sheet_type].title, 'rows': rows})
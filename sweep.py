@@ -0,0 +1,125 @@
+"""
+Parameter Sweep - Grid search over the signal thresholds
+Indicators and scores are computed once per ticker (backtest.prepare);
+every parameter combination reuses them, fanned out across a process pool
+
+Usage:
+    python sweep.py --grid bull_min=60,65,70 adx_min=15,20,25 --start 2025-01-01
+    python sweep.py --grid bull_stop_atr=2,2.5,3 bull_target_atr=3,3.5,4 --rank win_rate
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from backtest import DEFAULT_PARAMS, load_prepared, run_backtest, stored_tickers
+from bar_store import BarStore
+
+SUMMARY_COLUMNS = ['trades', 'win_rate', 'return_pct', 'max_drawdown_pct',
+                   'avg_win', 'avg_loss', 'net_profit']
+
+# Set in the parent before the pool forks - workers read it without any pickling
+_prepared = {}
+
+
+def parse_grid(pairs):
+    """['bull_min=60,65', 'adx_min=20'] -> {'bull_min': [60.0, 65.0], 'adx_min': [20.0]}"""
+    grid = {}
+    for pair in pairs:
+        key, _, values = pair.partition('=')
+        if key not in DEFAULT_PARAMS:
+            raise SystemExit(f"Unknown parameter: {key} (choose from {', '.join(DEFAULT_PARAMS)})")
+        grid[key] = [float(v) for v in values.split(',') if v]
+    return grid
+
+
+def combinations(grid):
+    """Every combination of the grid values as a params dict"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _run_chunk(combos, start, end, capital):
+    """Worker: one summary row per combination"""
+    rows = []
+    for params in combos:
+        _, _, summary = run_backtest(_prepared, params, start, end, capital)
+        rows.append(dict(params, **{k: summary[k] for k in SUMMARY_COLUMNS}))
+    return rows
+
+
+def run_sweep(prepared, grid, start=None, end=None, capital=25000, workers=None):
+    """
+    Backtest every grid combination
+
+    Args:
+        prepared: {ticker: backtest.prepare() output}
+        grid: {param: [values]}
+        workers: Processes (default: CPU count; 1 runs in-process)
+
+    Returns:
+        DataFrame - one row per combination (params + summary columns)
+    """
+    global _prepared
+    _prepared = prepared
+
+    combos = combinations(grid)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(combos)))
+
+    if workers == 1:
+        return pd.DataFrame(_run_chunk(combos, start, end, capital))
+
+    n_chunks = min(len(combos), workers * 4)
+    chunks = [combos[i::n_chunks] for i in range(n_chunks)]
+
+    # fork: workers inherit the prepared arrays instead of receiving copies
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('fork')) as pool:
+        futures = [pool.submit(_run_chunk, chunk, start, end, capital) for chunk in chunks]
+        rows = [row for future in futures for row in future.result()]
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid search over backtest parameters")
+    parser.add_argument('--grid', nargs='+', required=True, metavar='KEY=V1,V2,...')
+    parser.add_argument('--start', help="First entry date (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last entry date (YYYY-MM-DD)")
+    parser.add_argument('--tickers', nargs='*', help="Tickers to test (default: all stored)")
+    parser.add_argument('--store', default=None, help="Bar store directory")
+    parser.add_argument('--capital', type=float, default=25000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank', default='return_pct', choices=SUMMARY_COLUMNS)
+    parser.add_argument('--top', type=int, default=10, help="Rows to print")
+    parser.add_argument('--out', default='sweep_results.csv')
+    args = parser.parse_args()
+
+    grid = parse_grid(args.grid)
+    store = BarStore(args.store) if args.store else BarStore()
+    tickers = args.tickers or stored_tickers(store)
+    if not tickers:
+        print(f"❌ No stored history in {store.root}/ - run the scanner once to fill it")
+        return
+
+    t0 = time.perf_counter()
+    prepared = load_prepared(store, tickers)
+    t1 = time.perf_counter()
+    results = run_sweep(prepared, grid, args.start, args.end, args.capital, args.workers)
+    t2 = time.perf_counter()
+
+    results = results.sort_values(args.rank, ascending=args.rank == 'max_drawdown_pct')
+    results.round(4).to_csv(args.out, index=False)
+
+    print(f"\n🔬 SWEEP: {len(results)} combinations × {len(prepared)} tickers "
+          f"(indicators once: {t1 - t0:.1f}s, combinations: {t2 - t1:.1f}s)")
+    print(results.head(args.top).round(2).to_string(index=False))
+    print(f"💾 Results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
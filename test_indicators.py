@@ -0,0 +1,103 @@
+"""
+Equivalence checks - the fast indicator/scoring paths against the reference
+calculate_indicators() / calculate_scores() on synthetic bars
+
+Run: python -m pytest -q test_indicators.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import (calculate_indicators, lean_indicators, IncrementalIndicators,
+                        IndicatorEngine, LEAN_COLUMNS)
+from scoring import (SCORE_COLUMNS, BULL_REASONS, BEAR_REASONS, calculate_scores,
+                     score_universe, render_reasons)
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+RTOL = 1e-7
+ATOL = 1e-8
+
+
+def synthetic_bars(n_bars=400, seed=0, flat_from=None):
+    """Random-walk daily bars (flat_from: bars from there on repeat one price)"""
+    rng = np.random.default_rng(seed)
+    close = rng.uniform(20, 400) * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_bars)))
+    spread = rng.uniform(0, 0.02, (2, n_bars))
+    df = pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, n_bars)),
+        'High': close * (1 + spread[0]),
+        'Low': close * (1 - spread[1]),
+        'Close': close,
+        'Volume': rng.uniform(1e6, 8e6, n_bars)
+    }, index=pd.bdate_range('2022-01-03', periods=n_bars, name='Date'))
+    if flat_from is not None:
+        df.iloc[flat_from:, :4] = close[flat_from]
+    return df
+
+
+def reference(df):
+    return calculate_indicators(df.copy())[LEAN_COLUMNS].to_numpy(dtype='f8')
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_lean_matches_reference(seed):
+    df = synthetic_bars(seed=seed)
+    np.testing.assert_allclose(lean_indicators(df), reference(df),
+                               rtol=RTOL, atol=ATOL, equal_nan=True)
+
+
+def test_lean_flat_prices():
+    # A window of equal closes has std exactly 0 in pandas -> BB_Position NaN
+    df = synthetic_bars(seed=3, flat_from=300)
+    np.testing.assert_allclose(lean_indicators(df), reference(df),
+                               rtol=RTOL, atol=ATOL, equal_nan=True)
+
+
+@pytest.mark.parametrize('seed, flat_from', [(0, None), (1, None), (3, 300)])
+def test_incremental_matches_reference_every_bar(seed, flat_from):
+    df = synthetic_bars(seed=seed, flat_from=flat_from)
+    expected = reference(df)
+    state = IncrementalIndicators()
+
+    for i, bar in enumerate(df[OHLCV].to_numpy(dtype='f8')):
+        row = state.update(bar, ts=df.index[i])
+        got = np.array([row[c] for c in LEAN_COLUMNS], dtype='f8')
+        np.testing.assert_allclose(got, expected[i], rtol=RTOL, atol=ATOL, equal_nan=True,
+                                   err_msg=f"bar {i}")
+
+
+def test_engine_latest_tracks_new_and_readjusted_bars():
+    df = synthetic_bars(seed=4)
+    engine = IndicatorEngine()
+
+    # Warm on all but the last 5 bars, then advance one bar at a time
+    for end in range(len(df) - 5, len(df) + 1):
+        row = engine.latest('SYN', df.iloc[:end])
+        got = np.array([row[c] for c in LEAN_COLUMNS], dtype='f8')
+        np.testing.assert_allclose(got, reference(df.iloc[:end])[-1],
+                                   rtol=RTOL, atol=ATOL, equal_nan=True)
+
+    # Re-adjusted history (e.g. a split) re-seeds the state
+    adjusted = df.copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] /= 2
+    row = engine.latest('SYN', adjusted)
+    got = np.array([row[c] for c in LEAN_COLUMNS], dtype='f8')
+    np.testing.assert_allclose(got, reference(adjusted)[-1], rtol=RTOL, atol=ATOL, equal_nan=True)
+
+
+def test_score_universe_matches_calculate_scores():
+    rows = []
+    for seed in range(5):
+        ind = calculate_indicators(synthetic_bars(seed=seed))
+        rows.append(ind[SCORE_COLUMNS].dropna())
+    rows = pd.concat(rows)
+
+    values = rows.to_numpy(dtype='f8')
+    bull, bear, confirms, bull_mask, bear_mask = score_universe(values)
+
+    for i, (_, row) in enumerate(rows.iterrows()):
+        expected = calculate_scores(row)
+        got = (bull[i], bear[i], confirms[i],
+               render_reasons(bull_mask[i], values[i], BULL_REASONS),
+               render_reasons(bear_mask[i], values[i], BEAR_REASONS))
+        assert got == expected, f"row {i}"
@@ -0,0 +1,141 @@
+"""
+SheetWriter against an in-memory spreadsheet - journal replay, append
+coalescing and dropped writes
+
+Run: python -m pytest -q test_sheet_writer.py
+"""
+import json
+import os
+import threading
+
+import pytest
+
+from sheet_writer import SheetWriter
+
+
+class FakeWorksheet:
+    def __init__(self, title, rows=()):
+        self.title = title
+        self.rows = [list(r) for r in rows]
+        self.calls = []
+        self.fail = None        # exception every append_rows raises
+        self.gate = None        # threading.Event the next append waits on
+        self.entered = threading.Event()
+
+    def append_rows(self, rows):
+        self.entered.set()
+        if self.gate is not None:
+            gate, self.gate = self.gate, None
+            gate.wait(5)
+        if self.fail is not None:
+            raise self.fail
+        self.calls.append([r[0] for r in rows])
+        first = len(self.rows) + 1
+        self.rows.extend(list(r) for r in rows)
+        return {'updates': {'updatedRange': f"'{self.title}'!A{first}:U{len(self.rows)}"}}
+
+    def col_values(self, col):
+        return [r[col - 1] for r in self.rows]
+
+
+class FakeSpreadsheet:
+    def __init__(self, *worksheets):
+        self.sheets = {ws.title: ws for ws in worksheets}
+        self.value_updates = []
+
+    def worksheet(self, title):
+        return self.sheets[title]
+
+    def values_batch_update(self, body):
+        self.value_updates.append(body)
+
+    def batch_update(self, body):
+        pass
+
+
+def row(position_id):
+    return [position_id, 'NVDA', 'BULL', 100.0]
+
+
+def append(sheet, *ids):
+    return {'op': 'append', 'sheet': sheet, 'rows': [row(i) for i in ids]}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return str(tmp_path / 'sheet_journal.jsonl')
+
+
+def test_replay_after_crash_skips_rows_already_in_the_sheet(journal):
+    # Crash after Google applied id1/id2 but before the journal was rewritten
+    ws = FakeWorksheet('Bot_Alerts', [['ID'], row('id1'), row('id2')])
+    with open(journal, 'w') as f:
+        f.write(json.dumps(append('Bot_Alerts', 'id1', 'id2')) + '\n')
+        f.write(json.dumps(append('Bot_Alerts', 'id3')) + '\n')
+        f.write('{"op": "append", "sheet": "Bot_Al')  # torn last line
+
+    reported = {}
+    writer = SheetWriter(FakeSpreadsheet(ws), journal_path=journal, base_delay=0,
+                         on_rows=lambda title, rows_at: reported.update(rows_at))
+    assert writer.replayed == 2
+    assert writer.flush(5)
+
+    assert [r[0] for r in ws.rows] == ['ID', 'id1', 'id2', 'id3']
+    assert reported == {'id1': 2, 'id2': 3, 'id3': 4}
+    assert not os.path.exists(journal)
+
+
+def test_coalesced_appends_keep_their_order(journal):
+    alerts, trades = FakeWorksheet('Bot_Alerts', [['ID']]), FakeWorksheet('My_Trades', [['ID']])
+    reported = []
+    writer = SheetWriter(FakeSpreadsheet(alerts, trades), journal_path=journal, base_delay=0,
+                         on_rows=lambda title, rows_at: reported.append((title, rows_at)))
+
+    # Hold the worker on the first append so the rest queue up behind it
+    alerts.gate = release = threading.Event()
+    writer.submit(append('Bot_Alerts', 'a0'))
+    assert alerts.entered.wait(5)
+    for op in (append('Bot_Alerts', 'a1', 'a2'), append('Bot_Alerts', 'a3'),
+               append('My_Trades', 't1'), append('Bot_Alerts', 'a4'), append('Bot_Alerts', 'a5')):
+        writer.submit(op)
+    release.set()
+    assert writer.flush(5)
+
+    assert alerts.calls == [['a0'], ['a1', 'a2', 'a3'], ['a4', 'a5']]
+    assert trades.calls == [['t1']]
+    assert [r[0] for r in alerts.rows] == ['ID', 'a0', 'a1', 'a2', 'a3', 'a4', 'a5']
+    assert reported == [('Bot_Alerts', {'a0': 2}), ('Bot_Alerts', {'a1': 3, 'a2': 4, 'a3': 5}),
+                        ('My_Trades', {'t1': 2}), ('Bot_Alerts', {'a4': 6, 'a5': 7})]
+    assert writer.stats()['sent'] == 6
+
+
+def test_dropped_write_calls_on_drop(journal):
+    ws = FakeWorksheet('Bot_Alerts', [['ID']])
+    ws.fail = RuntimeError('invalid range')
+    dropped = []
+    writer = SheetWriter(FakeSpreadsheet(ws), journal_path=journal, max_retries=2,
+                         base_delay=0, on_drop=dropped.append)
+
+    writer.submit(append('Bot_Alerts', 'id1'))
+    assert writer.flush(5)
+
+    assert [op['rows'][0][0] for op in dropped] == ['id1']
+    assert writer.stats()['dropped'] == 1
+    assert writer.stats()['retries'] == 1
+    assert not os.path.exists(journal)  # given up on - not replayed next start
+
+
+def test_exit_for_missing_id_is_dropped(journal):
+    ws = FakeWorksheet('Bot_Alerts', [['ID'], row('id1')])
+    ss = FakeSpreadsheet(ws)
+    dropped = []
+    writer = SheetWriter(ss, journal_path=journal, base_delay=0, on_drop=dropped.append)
+
+    writer.submit({'op': 'exits',
+                   'data': [{'range': "'Bot_Alerts'!N7:T7", 'values': [['CLOSED']]}],
+                   'formats': [{'repeatCell': {'range': {'startRowIndex': 6, 'endRowIndex': 7}}}],
+                   'checks': [{'sheet': 'Bot_Alerts', 'id': 'gone', 'row': 7}]})
+    assert writer.flush(5)
+
+    assert len(dropped) == 1 and dropped[0]['data'][0]['range'] == "'Bot_Alerts'!N7:T7"
+    assert ss.value_updates == []
@@ -0,0 +1,102 @@
+"""
+Equivalence checks - TriggerIndex bisect hits against the linear
+PositionTracker.check_exits() comparison on random stop/target sets
+
+Run: python -m pytest -q test_trigger_index.py
+"""
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from position_tracker import PositionTracker
+from trigger_index import TriggerIndex, position_key
+
+TICKERS = ['AAA', 'BBB', 'CCC', 'DDD']
+
+
+def random_positions(rng, n_per_ticker=25):
+    """Open positions with cent-rounded levels around 100, some sharing a level"""
+    positions = []
+    for ticker in TICKERS:
+        for n in range(n_per_ticker):
+            direction = 'BULL' if rng.random() < 0.5 else 'BEAR'
+            near, far = np.round(rng.uniform(0.5, 10, 2), 1)
+            stop, target = (100 - near, 100 + far) if direction == 'BULL' else (100 + near, 100 - far)
+            positions.append({'ID': f"{ticker}-{n}", 'Ticker': ticker, 'Direction': direction,
+                              'Stop': round(stop, 2), 'Target': round(target, 2),
+                              'sheet_type': 'bot' if n % 2 else 'manual'})
+    # A few blank/garbled cells - never trigger on either path
+    positions[0]['Stop'] = ''
+    positions[1]['Target'] = 'n/a'
+    return positions
+
+
+def random_prices(rng, positions):
+    """{ticker: {'high', 'low'}}; about half land exactly on an open level"""
+    prices = {}
+    for ticker in TICKERS:
+        levels = [float(p[k]) for p in positions if p['Ticker'] == ticker
+                  for k in ('Stop', 'Target') if isinstance(p[k], float)]
+        high, low = np.round(100 + rng.uniform(0, 10), 2), np.round(100 - rng.uniform(0, 10), 2)
+        if rng.random() < 0.5:
+            high = max(l for l in levels if l >= 100)
+            low = min(l for l in levels if l <= 100)
+        prices[ticker] = {'current': 100.0, 'high': float(high), 'low': float(low)}
+    return prices
+
+
+def linear_hits(positions, prices):
+    tracker = PositionTracker.__new__(PositionTracker)  # no sheet connection needed
+    with contextlib.redirect_stdout(io.StringIO()):
+        exits = tracker.check_exits(prices, open_positions=positions, verbose=False)
+    return sorted((position_key(e['position']), e['exit_reason'], e['exit_price']) for e in exits)
+
+
+def index_hits(positions, prices):
+    index = TriggerIndex()
+    index.sync(positions)
+    hits = []
+    for ticker, p in prices.items():
+        for pos, is_stop, level in index.crossed(ticker, p['high'], p['low']):
+            hits.append((position_key(pos), 'STOP' if is_stop else 'TARGET', float(level)))
+    return sorted(hits)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_crossed_matches_check_exits(seed):
+    rng = np.random.default_rng(seed)
+    positions = random_positions(rng)
+    prices = random_prices(rng, positions)
+    assert index_hits(positions, prices) == linear_hits(positions, prices)
+
+
+def test_ties_at_the_level_fire_on_both_paths():
+    positions = [
+        {'ID': 1, 'Ticker': 'AAA', 'Direction': 'BULL', 'Stop': 95.0, 'Target': 110.0},
+        {'ID': 2, 'Ticker': 'AAA', 'Direction': 'BULL', 'Stop': 95.0, 'Target': 105.0},
+        {'ID': 3, 'Ticker': 'AAA', 'Direction': 'BEAR', 'Stop': 105.0, 'Target': 95.0},
+        {'ID': 4, 'Ticker': 'AAA', 'Direction': 'BEAR', 'Stop': 110.0, 'Target': 90.0},
+    ]
+    prices = {'AAA': {'current': 100.0, 'high': 105.0, 'low': 95.0}}
+
+    expected = [(('1', 'bot'), 'STOP', 95.0), (('2', 'bot'), 'STOP', 95.0),
+                (('3', 'bot'), 'STOP', 105.0)]
+    assert linear_hits(positions, prices) == expected
+    assert index_hits(positions, prices) == expected
+
+
+def test_removed_positions_stop_firing():
+    rng = np.random.default_rng(7)
+    positions = random_positions(rng)
+    prices = random_prices(rng, positions)
+    index = TriggerIndex()
+    index.sync(positions)
+
+    still_open = positions[::2]
+    index.sync(still_open)
+    hits = sorted((position_key(pos), 'STOP' if is_stop else 'TARGET', float(level))
+                  for ticker, p in prices.items()
+                  for pos, is_stop, level in index.crossed(ticker, p['high'], p['low']))
+    assert hits == linear_hits(still_open, prices)
@@ -0,0 +1,119 @@
+"""
+Trigger Index - Sorted stop/target levels per ticker
+A new high/low finds every crossed trigger with one bisect per side
+instead of comparing against each open position
+
+Per ticker there are two sorted level lists:
+    down: fire when price falls to the level (BULL stops, BEAR targets)
+    up:   fire when price rises to the level (BULL targets, BEAR stops)
+"""
+import math
+import threading
+from bisect import bisect_left, bisect_right
+
+
+def _level(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def position_key(pos):
+    """Positions are unique per (ID, sheet)"""
+    return (str(pos['ID']), pos.get('sheet_type', 'bot'))
+
+
+class TriggerIndex:
+    def __init__(self):
+        self.sides = {}       # ticker -> {side: ([levels ascending], [(key, is_stop)])}
+        self.positions = {}   # key -> position record
+        self._lock = threading.Lock()
+
+    def _triggers(self, pos):
+        """[(side, level, is_stop)] for one position"""
+        stop = _level(pos.get('Stop'))
+        target = _level(pos.get('Target'))
+        if pos.get('Direction') == 'BULL':
+            triggers = [('down', stop, True), ('up', target, False)]
+        elif pos.get('Direction') == 'BEAR':
+            triggers = [('up', stop, True), ('down', target, False)]
+        else:
+            return []
+        return [t for t in triggers if t[1] is not None]
+
+    def add(self, pos):
+        key = position_key(pos)
+        with self._lock:
+            if key in self.positions:
+                return
+            self.positions[key] = pos
+            sides = self.sides.setdefault(pos['Ticker'], {'down': ([], []), 'up': ([], [])})
+            for side, level, is_stop in self._triggers(pos):
+                levels, entries = sides[side]
+                i = bisect_right(levels, level)
+                levels.insert(i, level)
+                entries.insert(i, (key, is_stop))
+
+    def remove(self, key):
+        with self._lock:
+            pos = self.positions.pop(key, None)
+            if pos is None:
+                return
+            sides = self.sides.get(pos['Ticker'])
+            for side, level, _ in self._triggers(pos):
+                levels, entries = sides[side]
+                for i in range(bisect_left(levels, level), bisect_right(levels, level)):
+                    if entries[i][0] == key:
+                        del levels[i]
+                        del entries[i]
+                        break
+            if not sides['down'][0] and not sides['up'][0]:
+                del self.sides[pos['Ticker']]
+
+    def sync(self, open_positions):
+        """Match the index to the current open positions (adds new, drops closed)"""
+        wanted = {position_key(p): p for p in open_positions}
+        for key in set(self.positions) - set(wanted):
+            self.remove(key)
+        for key, pos in wanted.items():
+            if key not in self.positions:
+                self.add(pos)
+
+    def crossed(self, ticker, high, low):
+        """
+        Triggers crossed by a price update
+
+        Args:
+            high: Highest price since the last update (NaN/None to skip)
+            low: Lowest price since the last update
+
+        Returns:
+            [(position, is_stop, level)] - a stop beats a target hit in the same update
+        """
+        with self._lock:
+            sides = self.sides.get(ticker)
+            if not sides:
+                return []
+
+            hits = []
+            if low is not None and not math.isnan(low):
+                levels, entries = sides['down']
+                i = bisect_left(levels, low)
+                hits += zip(levels[i:], entries[i:])
+            if high is not None and not math.isnan(high):
+                levels, entries = sides['up']
+                i = bisect_right(levels, high)
+                hits += zip(levels[:i], entries[:i])
+
+            stopped = {key for _, (key, is_stop) in hits if is_stop}
+            return [(self.positions[key], is_stop, level) for level, (key, is_stop) in hits
+                    if is_stop or key not in stopped]
+
+    def tickers(self):
+        with self._lock:
+            return list(self.sides)
+
+    def __len__(self):
+        return len(self.positions)
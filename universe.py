@@ -0,0 +1,351 @@
+"""
+Universe Manager - Named ticker universes with a persistent local cache
+Index lists (S&P 500, Nasdaq 100, Russell 1000, custom) are refreshed
+daily, Yahoo's most-active movers on their own cadence - both in the
+background, so get_scan_tickers() never waits on a web request.
+Average dollar volume and price recorded from each scan's history filter
+out illiquid names before anything is downloaded for them (off by default).
+
+SCAN_UNIVERSES examples:
+    sp300                              (default - the original S&P 300)
+    sp500,nasdaq100
+    russell1000,file:watchlist.txt,custom:PLTR+ARM
+"""
+import argparse
+import io
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import requests
+
+from config import (SCAN_UNIVERSES, UNIVERSE_CACHE, UNIVERSE_TTL, MOVERS_COUNT,
+                    MOVERS_REFRESH, MIN_DOLLAR_VOLUME, MIN_PRICE, LIQUIDITY_TTL)
+from lazy import lazy_import
+
+yf = lazy_import('yfinance')
+
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+LEGACY_SP300_CACHE = 'sp300_cache.txt'  # written by earlier versions - seeds 'sp300'
+
+# name -> (Wikipedia page, symbol column, how many to keep)
+INDEX_SOURCES = {
+    'sp500': ('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', 'Symbol', None),
+    'sp300': ('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', 'Symbol', 300),
+    'nasdaq100': ('https://en.wikipedia.org/wiki/Nasdaq-100', 'Ticker', None),
+    'russell1000': ('https://en.wikipedia.org/wiki/Russell_1000_Index', 'Symbol', None),
+}
+
+# Used only when a universe has never been fetched and the fetch fails
+FALLBACK = ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "TSLA",
+            "AMD", "NFLX", "SPY", "QQQ"]
+
+
+# ==========================================
+# SOURCES
+# ==========================================
+def _clean(symbols):
+    """Yahoo-style symbols (BRK.B -> BRK-B), order kept, duplicates dropped"""
+    out = [str(s).strip().upper().replace('.', '-') for s in symbols if isinstance(s, str) and s.strip()]
+    return list(dict.fromkeys(out))
+
+
+def fetch_index(name):
+    """Constituents of a built-in index from its Wikipedia table"""
+    url, column, limit = INDEX_SOURCES[name]
+    r = requests.get(url, headers=HEADERS, timeout=20)
+    r.raise_for_status()
+
+    for table in pd.read_html(io.StringIO(r.text)):
+        if column in table.columns:
+            tickers = _clean(table[column].tolist())
+            return tickers[:limit] if limit else tickers
+
+    raise ValueError(f"no '{column}' table on {url}")
+
+
+def fetch_custom(name):
+    """'custom:AAPL+MSFT' or 'file:path' (tickers separated by newlines, commas or spaces)"""
+    kind, _, value = name.partition(':')
+    if kind == 'file':
+        with open(value) as f:
+            value = f.read()
+    return _clean(value.replace('+', ' ').replace(',', ' ').split())
+
+
+def fetch_movers(count=MOVERS_COUNT):
+    """
+    Yahoo most-active stocks
+
+    Returns:
+        ([tickers], {ticker: {'avg_volume', 'price'}}) - quotes seed the liquidity cache
+    """
+    quotes = yf.screen('most_actives', count=count).get('quotes', [])
+    tickers = []
+    liquidity = {}
+
+    for q in quotes:
+        symbol = q.get('symbol', '')
+        if not symbol or '-' in symbol or len(symbol) >= 6:
+            continue
+        tickers.append(symbol)
+        volume = q.get('averageDailyVolume3Month')
+        price = q.get('regularMarketPrice')
+        if volume and price:
+            liquidity[symbol] = {'avg_volume': float(volume), 'price': float(price)}
+
+    return tickers[:count], liquidity
+
+
+# ==========================================
+# MANAGER
+# ==========================================
+class UniverseManager:
+    def __init__(self, names=SCAN_UNIVERSES, path=UNIVERSE_CACHE, ttl=UNIVERSE_TTL,
+                 movers_refresh=MOVERS_REFRESH, movers_count=MOVERS_COUNT,
+                 min_dollar_volume=MIN_DOLLAR_VOLUME, min_price=MIN_PRICE,
+                 liquidity_ttl=LIQUIDITY_TTL):
+        """
+        Args:
+            names: Comma-separated universes (INDEX_SOURCES keys, custom:..., file:...)
+            path: JSON cache file
+            ttl: Seconds before an index list is refreshed
+            movers_refresh: Seconds between most-active refreshes (0 = no movers)
+            min_dollar_volume: 20-day average volume x price needed to be scanned (0 = off)
+            min_price: Last close needed to be scanned (0 = off)
+            liquidity_ttl: Seconds a liquidity reading is trusted - older ones no
+                           longer skip the ticker, so its next scan refreshes them
+        """
+        self.names = [n.strip() for n in names.split(',') if n.strip()]
+        self.path = path
+        self.ttl = ttl
+        self.movers_refresh = movers_refresh
+        self.movers_count = movers_count
+        self.min_dollar_volume = min_dollar_volume
+        self.min_price = min_price
+        self.liquidity_ttl = liquidity_ttl
+
+        self.cache = {'universes': {}, 'movers': {'tickers': [], 'updated': 0}, 'liquidity': {}}
+        self.skipped = []
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        self._saved_at = 0
+        self._load()
+        self._seed_legacy()
+
+    # ---------- persistence ----------
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+            for key in self.cache:
+                self.cache[key] = cached.get(key, self.cache[key])
+        except Exception as e:
+            print(f"⚠️ Universe cache unreadable ({e}) - starting fresh")
+
+    def _seed_legacy(self):
+        if 'sp300' in self.cache['universes'] or not os.path.exists(LEGACY_SP300_CACHE):
+            return
+        with open(LEGACY_SP300_CACHE) as f:
+            tickers = _clean(f.read().split(','))
+        if tickers:
+            self.cache['universes']['sp300'] = {'tickers': tickers,
+                                                'updated': os.path.getmtime(LEGACY_SP300_CACHE)}
+
+    def save(self):
+        """Atomically rewrite the cache file"""
+        with self._lock:
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self.cache, f)
+            os.replace(tmp, self.path)
+            self._saved_at = time.time()
+
+    # ---------- refresh ----------
+    def refresh(self, name):
+        """Re-fetch one universe; the cached list is kept if the fetch fails"""
+        try:
+            tickers = fetch_custom(name) if ':' in name else fetch_index(name)
+        except Exception as e:
+            print(f"⚠️ Universe '{name}' refresh failed: {e}")
+            return False
+
+        with self._lock:
+            old = set(self.cache['universes'].get(name, {}).get('tickers', []))
+            self.cache['universes'][name] = {'tickers': tickers, 'updated': time.time()}
+
+        added, removed = set(tickers) - old, old - set(tickers)
+        if old and (added or removed):
+            print(f"🔄 Universe '{name}': +{len(added)} -{len(removed)} "
+                  f"({', '.join(sorted(added)[:5])}{'...' if len(added) > 5 else ''})")
+        self.save()
+        return True
+
+    def refresh_movers(self):
+        try:
+            tickers, liquidity = fetch_movers(self.movers_count)
+        except Exception as e:
+            print(f"⚠️ Movers refresh failed: {e}")
+            return False
+
+        now = time.time()
+        with self._lock:
+            self.cache['movers'] = {'tickers': tickers, 'updated': now}
+            for ticker, stats in liquidity.items():
+                self.cache['liquidity'][ticker] = dict(stats, updated=now)
+        self.save()
+        return True
+
+    def _in_background(self, key, target):
+        """Run one refresh per key at a time, off the caller's thread"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                target()
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"universe-{key}", daemon=True).start()
+
+    def _stale(self, entry, ttl):
+        return time.time() - entry.get('updated', 0) >= ttl
+
+    # ---------- lookups ----------
+    def tickers(self, name):
+        """
+        Cached universe - fetched inline only the very first time;
+        a stale list is returned as-is and refreshed in the background
+        """
+        with self._lock:
+            entry = self.cache['universes'].get(name)
+        if entry is None:
+            if not self.refresh(name):
+                return list(FALLBACK)
+            with self._lock:
+                entry = self.cache['universes'][name]
+        elif self._stale(entry, self.ttl):
+            self._in_background(name, lambda: self.refresh(name))
+        return list(entry['tickers'])
+
+    def movers(self):
+        """Cached most-active list (never blocks - empty until the first refresh lands)"""
+        if not self.movers_refresh:
+            return []
+        with self._lock:
+            entry = self.cache['movers']
+        if self._stale(entry, self.movers_refresh):
+            self._in_background('movers', self.refresh_movers)
+        return list(entry['tickers'])
+
+    def liquid(self, tickers):
+        """
+        Drop tickers whose cached dollar volume/price is below the minimums
+        (tickers never seen, or last seen over liquidity_ttl ago, are kept -
+        the history downloaded for them fills or refreshes the cache)
+
+        Returns:
+            (kept, skipped)
+        """
+        kept, skipped = [], []
+        if not (self.min_dollar_volume or self.min_price):
+            return list(tickers), skipped
+
+        stats = self.cache['liquidity']
+        for ticker in tickers:
+            s = stats.get(ticker)
+            if (s and not self._stale(s, self.liquidity_ttl)
+                    and (s['avg_volume'] * s['price'] < self.min_dollar_volume
+                         or s['price'] < self.min_price)):
+                skipped.append(ticker)
+            else:
+                kept.append(ticker)
+        return kept, skipped
+
+    def scan_tickers(self):
+        """All configured universes + movers, liquidity-filtered"""
+        combined = []
+        for name in self.names:
+            combined += self.tickers(name)
+        combined = list(dict.fromkeys(combined + self.movers()))
+
+        kept, self.skipped = self.liquid(combined)
+        return kept
+
+    def record_liquidity(self, histories, window=20):
+        """
+        Update the cached average volume/price from this scan's daily history
+
+        The cache file is rewritten when a ticker gets its first reading, or
+        when changed readings have gone unsaved for half of liquidity_ttl -
+        universe/movers refreshes save them in between
+        """
+        now = time.time()
+        new = changed = False
+        with self._lock:
+            liquidity = self.cache['liquidity']
+            for ticker, df in histories.items():
+                if len(df) == 0:
+                    continue
+                reading = {
+                    'avg_volume': float(df['Volume'].iloc[-window:].mean()),
+                    'price': float(df['Close'].iat[-1])
+                }
+                old = liquidity.get(ticker)
+                if old is None:
+                    new = True
+                elif (old['avg_volume'], old['price']) != (reading['avg_volume'], reading['price']):
+                    changed = True
+                liquidity[ticker] = dict(reading, updated=now)
+            due = changed and now - self._saved_at >= self.liquidity_ttl / 2
+        if new or due:
+            self.save()
+
+    def start(self):
+        """Refresh stale universes and the movers in the background (at startup)"""
+        for name in self.names:
+            entry = self.cache['universes'].get(name)
+            if entry is not None and self._stale(entry, self.ttl):
+                self._in_background(name, lambda n=name: self.refresh(n))
+        self.movers()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'universes': {n: len(self.cache['universes'].get(n, {}).get('tickers', []))
+                              for n in self.names},
+                'movers': len(self.cache['movers']['tickers']),
+                'liquidity_known': len(self.cache['liquidity']),
+                'skipped_illiquid': len(self.skipped)
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh and inspect the scan universes")
+    parser.add_argument('--universes', default=SCAN_UNIVERSES)
+    parser.add_argument('--refresh', action='store_true', help="Re-fetch every universe and the movers now")
+    args = parser.parse_args()
+
+    manager = UniverseManager(args.universes)
+    if args.refresh:
+        for name in manager.names:
+            manager.refresh(name)
+        manager.refresh_movers()
+
+    tickers = manager.scan_tickers()
+    print(f"🌐 {len(tickers)} tickers to scan ({len(manager.skipped)} skipped as illiquid)")
+    for name, count in manager.stats()['universes'].items():
+        print(f"   {name}: {count}")
+    print(f"   movers: {len(manager.cache['movers']['tickers'])}")
+
+
+if __name__ == "__main__":
+    main()